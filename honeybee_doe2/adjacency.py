@@ -0,0 +1,168 @@
+# coding=utf-8
+"""Index of the adjacencies between the Rooms of a Model that is translated to INP."""
+from honeybee.boundarycondition import Surface
+from honeybee.facetype import Wall, Floor, RoofCeiling
+
+
+class AdjacencyIndex(object):
+    """Index of the adjacent Faces and Rooms of Faces and which Faces are written.
+
+    The index is built once for all of the Rooms that are translated to INP
+    such that the adjacent Face and Room of any Face and whether the Face is
+    written to the INP can be looked up without reference to the other Rooms.
+    This allows the Rooms to be translated independently of one another and
+    in any order (eg. in parallel or from a cache).
+
+    Interior Faces are only written once for each pair of adjacent Faces and
+    the Face that is written is the one belonging to the Room that comes first
+    in the input rooms. Both Faces of each pair are not written when the
+    adjacent Rooms belong to the same group of the similar_room_groups.
+
+    Args:
+        rooms: A list of Honeybee Rooms in the order that they are translated.
+        exclude_interior_walls: Boolean to note whether interior wall Faces
+            are excluded from the INP. (Default: False).
+        exclude_interior_ceilings: Boolean to note whether interior ceiling
+            Faces are excluded from the INP. (Default: False).
+        similar_room_groups: An optional list of lists where each sub-list
+            contains Rooms with the same thermal conditions, such as the output
+            of the group_rooms_by_thermal_conditions function. If None, interior
+            Faces between Rooms are only excluded according to the other
+            inputs. (Default: None).
+        export_view: An optional ExportView of the Model, which will be used
+            to get the boundary conditions of the Faces. Faces whose boundary
+            condition is overridden to be non-Surface by the ExportView are
+            always written. (Default: None).
+
+    Properties:
+        * face_count
+        * unwritten_faces
+    """
+    __slots__ = ('_face_rooms', '_adjacencies', '_room_adjacencies', '_unwritten')
+
+    def __init__(self, rooms, exclude_interior_walls=False,
+                 exclude_interior_ceilings=False, similar_room_groups=None,
+                 export_view=None):
+        room_group_ids = {}
+        if similar_room_groups is not None:
+            for i, group_rooms in enumerate(similar_room_groups):
+                for room in group_rooms:
+                    room_group_ids[room.identifier] = i
+        self._face_rooms, self._adjacencies, self._room_adjacencies = {}, {}, {}
+        claimed, self._unwritten = set(), set()
+        for room in rooms:
+            room_group_id = room_group_ids.get(room.identifier)
+            adj_rooms = []
+            for face in room.faces:
+                self._face_rooms[face.identifier] = room.identifier
+                # use the boundary condition that is written to the INP
+                bc = face.boundary_condition if export_view is None \
+                    else export_view.face_boundary_condition(face)
+                if not isinstance(bc, Surface):
+                    continue
+                excluded = \
+                    (exclude_interior_walls and isinstance(face.type, Wall)) or \
+                    (exclude_interior_ceilings and
+                     isinstance(face.type, (Floor, RoofCeiling)))
+                if excluded:
+                    self._unwritten.add(face.identifier)
+                adj_face, adj_room = bc.boundary_condition_objects[0], \
+                    bc.boundary_condition_objects[-1]
+                self._adjacencies[face.identifier] = (adj_face, adj_room)
+                if adj_room not in adj_rooms:
+                    adj_rooms.append(adj_room)
+                # decide whether the face is written to the INP
+                if room_group_id is not None and \
+                        room_group_id == room_group_ids.get(adj_room):
+                    self._unwritten.add(face.identifier)
+                elif not excluded:
+                    if face.identifier in claimed:  # adjacent face already written
+                        self._unwritten.add(face.identifier)
+                    else:
+                        claimed.add(adj_face)
+            self._room_adjacencies[room.identifier] = tuple(adj_rooms)
+
+    @property
+    def face_count(self):
+        """Get an integer for the number of Faces in the index."""
+        return len(self._face_rooms)
+
+    @property
+    def unwritten_faces(self):
+        """Get a frozenset with the identifiers of the Faces not written to the INP."""
+        return frozenset(self._unwritten)
+
+    def face_room(self, face_identifier):
+        """Get the identifier of the Room to which a Face belongs.
+
+        Args:
+            face_identifier: Text for the identifier of a Face in the index.
+
+        Returns:
+            Text for the identifier of the Room or None if the Face is not
+            in the index.
+        """
+        return self._face_rooms.get(face_identifier)
+
+    def adjacent_face(self, face_identifier):
+        """Get the identifier of the Face that is adjacent to a Face.
+
+        Args:
+            face_identifier: Text for the identifier of a Face in the index.
+
+        Returns:
+            Text for the identifier of the adjacent Face or None if the Face
+            does not have a Surface boundary condition.
+        """
+        try:
+            return self._adjacencies[face_identifier][0]
+        except KeyError:  # not an interior face
+            return None
+
+    def adjacent_room(self, face_identifier):
+        """Get the identifier of the Room that is adjacent to a Face.
+
+        Args:
+            face_identifier: Text for the identifier of a Face in the index.
+
+        Returns:
+            Text for the identifier of the adjacent Room or None if the Face
+            does not have a Surface boundary condition.
+        """
+        try:
+            return self._adjacencies[face_identifier][1]
+        except KeyError:  # not an interior face
+            return None
+
+    def adjacent_rooms(self, room_identifier):
+        """Get the identifiers of all Rooms that are adjacent to a Room.
+
+        Args:
+            room_identifier: Text for the identifier of a Room in the index.
+
+        Returns:
+            A tuple with the identifiers of the adjacent Rooms in the order
+            that their Faces are encountered. Will be empty if the Room is
+            not in the index or has no adjacent Rooms.
+        """
+        return self._room_adjacencies.get(room_identifier, ())
+
+    def is_written(self, face_identifier):
+        """Check whether a Face is written to the INP.
+
+        Args:
+            face_identifier: Text for the identifier of a Face.
+
+        Returns:
+            False if the Face is an interior Face that is excluded from the INP
+            or whose adjacent Face is written in its place. True otherwise.
+        """
+        return face_identifier not in self._unwritten
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'AdjacencyIndex: [{} faces, {} adjacencies]'.format(
+            len(self._face_rooms), len(self._adjacencies))
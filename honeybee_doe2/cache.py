@@ -0,0 +1,133 @@
+# coding=utf-8
+"""On-disk cache of the INP blocks of Rooms for incremental translation."""
+from __future__ import division
+import os
+import json
+
+from .config import ROOM_CACHE_SIZE
+
+# version of the cached INP blocks, which should be incremented whenever a change
+# to the translation of Rooms makes the previously cached blocks invalid
+ROOM_CACHE_VERSION = 1
+
+
+class RoomBlockCache(object):
+    """On-disk cache of the INP polygons and definitions of Rooms.
+
+    Each entry of the cache is a JSON file in the cache folder, which is named
+    by the key of the Room that produced it. The keys should be hashes of
+    everything that affects the INP of the Room such that entries are only
+    reused when the Room has not changed. The modified time of each file is
+    updated whenever the entry is used and the least recently used entries
+    are removed whenever the cache is evicted.
+
+    Args:
+        folder: Path to a folder in which the cache entries are stored. The
+            folder will be created if it does not exist.
+        max_size: A number for the maximum size of the cache folder in
+            megabytes. (Default: 200).
+
+    Properties:
+        * folder
+        * max_size
+    """
+    __slots__ = ('_folder', '_max_size')
+
+    def __init__(self, folder, max_size=ROOM_CACHE_SIZE):
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        self._folder = os.path.abspath(folder)
+        assert max_size >= 0, 'RoomBlockCache max_size must be positive. ' \
+            'Got {}.'.format(max_size)
+        self._max_size = max_size
+
+    @property
+    def folder(self):
+        """Get the path to the folder in which the cache entries are stored."""
+        return self._folder
+
+    @property
+    def max_size(self):
+        """Get the maximum size of the cache folder in megabytes."""
+        return self._max_size
+
+    def get(self, key):
+        """Get the INP polygons and definitions of a Room from the cache.
+
+        Args:
+            key: Text for the key of the Room.
+
+        Returns:
+            A tuple with the list of INP polygons and the list of INP definitions
+            of the Room. Will be None if the key is not in the cache.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path) as entry_file:
+                room_polygons, room_defs = json.load(entry_file)
+            os.utime(entry_path, None)  # mark the entry as recently used
+        except (IOError, OSError, ValueError):  # missing or corrupted entry
+            return None
+        return room_polygons, room_defs
+
+    def set(self, key, room_polygons, room_defs):
+        """Add the INP polygons and definitions of a Room to the cache.
+
+        Args:
+            key: Text for the key of the Room.
+            room_polygons: A list of text strings for the INP polygons of the Room.
+            room_defs: A list of text strings for the INP definitions of the Room.
+        """
+        entry_path = self._entry_path(key)
+        # write to a temporary file first so that entries are never partially read
+        temp_path = '{}.{}.tmp'.format(entry_path, os.getpid())
+        with open(temp_path, 'w') as entry_file:
+            json.dump([room_polygons, room_defs], entry_file)
+        if os.name == 'nt' and os.path.isfile(entry_path):  # rename cannot overwrite
+            os.remove(entry_path)
+        os.rename(temp_path, entry_path)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is below max_size.
+
+        Returns:
+            An integer for the number of entries that were removed.
+        """
+        entries, total_size = [], 0
+        for f_name in os.listdir(self._folder):
+            if not f_name.endswith('.json'):
+                continue
+            f_path = os.path.join(self._folder, f_name)
+            try:
+                f_stat = os.stat(f_path)
+            except OSError:  # entry removed by another process
+                continue
+            entries.append((f_stat.st_mtime, f_stat.st_size, f_path))
+            total_size += f_stat.st_size
+        max_bytes = self._max_size * 1024 ** 2
+        removed_count = 0
+        for _, f_size, f_path in sorted(entries):
+            if total_size <= max_bytes:
+                break
+            try:
+                os.remove(f_path)
+            except OSError:  # entry removed by another process
+                pass
+            total_size -= f_size
+            removed_count += 1
+        return removed_count
+
+    def _entry_path(self, key):
+        """Get the path to the file of a cache entry."""
+        return os.path.join(self._folder, '{}.json'.format(key))
+
+    def __contains__(self, key):
+        return os.path.isfile(self._entry_path(key))
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'RoomBlockCache: {}'.format(self._folder)
+
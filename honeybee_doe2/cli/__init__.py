@@ -3,6 +3,7 @@ import click
 from honeybee.cli import main
 
 from .translate import translate
+from .edit import edit
 
 
 @click.group(help='honeybee doe2 commands.')
@@ -12,6 +13,7 @@ def doe2():
 
 
 doe2.add_command(translate)
+doe2.add_command(edit)
 
 # add doe2 sub-commands
 main.add_command(doe2)
@@ -0,0 +1,67 @@
+"""honeybee-doe2 commands for editing Honeybee Models."""
+import sys
+import json
+import logging
+import click
+
+from ladybug.commandutil import process_content_to_output
+from honeybee.model import Model
+
+_logger = logging.getLogger(__name__)
+
+
+@click.group(help='Commands for editing Honeybee Models for DOE-2.')
+def edit():
+    pass
+
+
+@edit.command('precompute')
+@click.argument('model-file', type=click.Path(
+    exists=True, file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--compute/--clear', ' /-c', help='Flag to note whether the precomputed '
+    'geometry should be removed from the Model instead of being computed.',
+    default=True, show_default=True)
+@click.option(
+    '--output-file', '-f', help='Optional HBJSON file to output the JSON string '
+    'of the Model with its precomputed geometry. By default this will be printed '
+    'out to stdout', type=click.File('w'), default='-', show_default=True)
+def precompute_cli(model_file, compute, output_file):
+    """Precompute the analysis of the Model geometry that is needed for INP export.
+
+    The results include the DOE-2 level of each Room, the SPACE polygon of
+    each Room and the LOCATION of each Face in the SPACE polygon. They are
+    stored in the DOE-2 properties of the output Model such that every later
+    translation of the Model to INP skips the analysis of the geometry.
+
+    \b
+    Args:
+        model_file: Full path to a Honeybee Model file.
+    """
+    try:
+        clear = not compute
+        precompute(model_file, clear, output_file)
+    except Exception as e:
+        _logger.exception('Model precomputation failed.\n{}'.format(e))
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
+def precompute(model_file, clear=False, output_file=None):
+    """Precompute the analysis of the Model geometry that is needed for INP export.
+
+    Args:
+        model_file: Full path to a Honeybee Model file.
+        clear: Boolean to note whether the precomputed geometry should be
+            removed from the Model instead of being computed. (Default: False).
+        output_file: Optional HBJSON file path to output the JSON string of the
+            Model. If None, the string will be returned from this function.
+    """
+    model = Model.from_file(model_file)
+    if clear:
+        model.properties.doe2.clear_precomputed()
+    else:
+        model.properties.doe2.precompute()
+    model_str = json.dumps(model.to_dict())
+    return process_content_to_output(model_str, output_file)
@@ -1,4 +1,5 @@
 """honeybee-doe2 translation commands."""
+import os
 import sys
 import json
 import logging
@@ -11,9 +12,11 @@ from honeybee_energy.schedule.ruleset import ScheduleRuleset
 from honeybee_energy.schedule.dictutil import dict_to_schedule
 
 from honeybee_doe2.config import RES_CHARS
-from honeybee_doe2.util import header_comment_minor
+from honeybee_doe2.util import header_comment_minor, GZIP_EXTENSIONS, ZSTD_EXTENSIONS
 from honeybee_doe2.schedule import extract_all_schedule_ruleset_from_inp_file
 from honeybee_doe2.simulation import SimulationPar
+from honeybee_doe2.writer import write_model_inp
+from honeybee_doe2.profiling import StageProfiler
 
 _logger = logging.getLogger(__name__)
 
@@ -46,18 +49,86 @@ def translate():
     '--include-interior-ceilings/--exclude-interior-ceilings', ' /-xc', help='Flag to '
     'note whether interior ceilings should be excluded from the export.',
     default=True, show_default=True)
+@click.option(
+    '--include-similar-interior-faces/--exclude-similar-interior-faces', ' /-xs',
+    help='Flag to note whether interior walls, floors and ceilings between Rooms '
+    'with the same HVAC system, program, setpoints and schedules should be '
+    'excluded from the export.', default=True, show_default=True)
 @click.option(
     '--equest-version', '-eq', help='Optional text string to denote the version '
     'of eQuest for which the INP definition will be generated. If unspecified '
     'or unrecognized, the latest version of eQuest will be used.',
     default='3.65', show_default=True, type=str)
+@click.option(
+    '--workers', '-w', help='Integer for the number of processes to be used to '
+    'translate the Rooms of the model. The resulting INP is identical regardless '
+    'of the number of workers.', default=1, show_default=True, type=int)
+@click.option(
+    '--write-all-floors/--collapse-typical-floors', ' /-tf', help='Flag to note '
+    'whether identical stacked floors should be collapsed into a single typical '
+    'floor with a FLOOR MULTIPLIER.', default=True, show_default=True)
+@click.option(
+    '--write-all-rooms/--collapse-identical-rooms', ' /-ir', help='Flag to note '
+    'whether identical Rooms on the same floor should be collapsed into a single '
+    'SPACE with a MULTIPLIER.', default=True, show_default=True)
+@click.option(
+    '--zoning', '-z', help='Text to indicate how the Rooms of the model are zoned. '
+    'Room will write each Room as its own SPACE and ZONE. CorePerimeter will '
+    'replace the Rooms of each floor with perimeter zones for each orientation and '
+    'a core zone. Choose from: Room, CorePerimeter', default='Room',
+    show_default=True, type=str)
+@click.option(
+    '--write-all-windows/--aggregate-windows', ' /-aw', help='Flag to note '
+    'whether all windows of each wall should be aggregated into one '
+    'area-equivalent rectangular WINDOW for each window construction.',
+    default=True, show_default=True)
+@click.option(
+    '--shade-cutoff-angle', '-sc', help='Optional number from 0 up to (but not '
+    'including) 90 for the solar altitude in degrees below which the shadows of '
+    'context shades are neglected. Context shades that cannot cast a shadow on the '
+    'building with the sun above this altitude will not be written. If unspecified, '
+    'all shades will be written.', default=None, type=float)
+@click.option(
+    '--write-all-shades/--merge-shades', ' /-ms', help='Flag to note '
+    'whether adjacent coplanar context shades should be merged together into '
+    'larger FIXED-SHADEs, which reduces the number of shades written for '
+    'triangulated context geometry.', default=True, show_default=True)
+@click.option(
+    '--room-cache', '-rc', help='Optional path to a folder in which the INP of '
+    'each Room will be cached. When the same model is translated again, only the '
+    'Rooms that have changed and their neighbors will be translated while all '
+    'other Rooms will use their cached INP.', default=None,
+    type=click.Path(file_okay=False, dir_okay=True, resolve_path=True))
+@click.option(
+    '--in-memory/--spool', ' /-sp', help='Flag to note whether the POLYGONs and '
+    'definitions of the building geometry should be spooled to temporary files '
+    'as they are generated instead of being held in memory. This keeps the memory '
+    'of very large models bounded when the INP is written to an output file.',
+    default=True, show_default=True)
+@click.option(
+    '--profile-file', '-pf', help='Optional path to a JSON file to which the wall '
+    'time and the number of objects of each stage of the translation will be '
+    'written. This is useful for finding the stages that slow down the export '
+    'of large models.', default=None,
+    type=click.Path(file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--name-map-file', '-nm', help='Optional path to a JSON file to which the '
+    'mapping between the identifiers of the Model objects and their names in the '
+    'INP will be written. This can be used to map simulation results back to the '
+    'Model.', default=None,
+    type=click.Path(file_okay=True, dir_okay=False, resolve_path=True))
 @click.option(
     '--output-file', '-o', help='Optional INP file path to output the INP string '
-    'of the translation. By default this will be printed out to stdout.',
+    'of the translation. Files ending in .gz are compressed with gzip and files '
+    'ending in .zst are compressed with zstd (which requires the zstandard package '
+    'before Python 3.14). By default this will be printed out to stdout.',
     type=click.File('w'), default='-', show_default=True)
 def model_to_inp_cli(
     model_file, sim_par_json, hvac_mapping, include_interior_walls,
-    include_interior_ceilings, equest_version, output_file
+    include_interior_ceilings, include_similar_interior_faces, equest_version,
+    workers, write_all_floors, write_all_rooms, zoning, write_all_windows,
+    shade_cutoff_angle, write_all_shades, room_cache, in_memory, profile_file,
+    name_map_file, output_file
 ):
     """Translate a Honeybee Model to an INP file.
 
@@ -68,10 +139,23 @@ def model_to_inp_cli(
     try:
         exclude_interior_walls = not include_interior_walls
         exclude_interior_ceilings = not include_interior_ceilings
+        collapse_typical_floors = not write_all_floors
+        collapse_identical_rooms = not write_all_rooms
+        aggregate_windows = not write_all_windows
+        exclude_similar_interior_faces = not include_similar_interior_faces
+        merge_shades = not write_all_shades
+        spool = not in_memory
         model_to_inp(
             model_file, sim_par_json, hvac_mapping,
             exclude_interior_walls, exclude_interior_ceilings,
-            equest_version, output_file)
+            equest_version, output_file, workers=workers,
+            collapse_typical_floors=collapse_typical_floors,
+            collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+            aggregate_windows=aggregate_windows,
+            exclude_similar_interior_faces=exclude_similar_interior_faces,
+            shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+            room_cache=room_cache, spool=spool, profile_file=profile_file,
+            name_map_file=name_map_file)
     except Exception as e:
         _logger.exception(f'Model translation failed:\n{e}')
         sys.exit(1)
@@ -83,7 +167,11 @@ def model_to_inp(
         model_file, sim_par_json=None, hvac_mapping='Story',
         exclude_interior_walls=False, exclude_interior_ceilings=False,
         equest_version='3.65', output_file=None,
-        include_interior_walls=True, include_interior_ceilings=True):
+        include_interior_walls=True, include_interior_ceilings=True, workers=1,
+        collapse_typical_floors=False, collapse_identical_rooms=False, zoning='Room',
+        aggregate_windows=False, exclude_similar_interior_faces=False,
+        shade_cutoff_angle=None, merge_shades=False, room_cache=None,
+        spool=False, profile_file=None, name_map_file=None):
     """Translate a Honeybee Model to an INP file.
 
     Args:
@@ -111,6 +199,47 @@ def model_to_inp(
             unrecognized, the latest version of eQuest will be used. (Default: False).
         output_file: Optional INP file path to output the INP string of the
             translation. If None, the string will be returned from this function.
+            When specified, the INP is streamed to the file block by block
+            without building the full INP string in memory.
+            Paths ending in .gz are compressed with gzip and paths ending
+            in .zst are compressed with zstd.
+        workers: Integer for the number of processes to be used to translate
+            the Rooms of the model. The resulting INP is identical regardless
+            of the number of workers. (Default: 1).
+        collapse_typical_floors: Boolean to note whether identical stacked floors
+            should be collapsed into a single typical floor with a FLOOR
+            MULTIPLIER. (Default: False).
+        collapse_identical_rooms: Boolean to note whether identical Rooms on the
+            same floor should be collapsed into a single SPACE with a
+            MULTIPLIER. (Default: False).
+        zoning: Text to indicate how the Rooms of the model are zoned. Room
+            will write each Room as its own SPACE and ZONE. CorePerimeter will
+            replace the Rooms of each floor with perimeter zones for each
+            orientation and a core zone. (Default: Room).
+        aggregate_windows: Boolean to note whether all windows of each wall
+            should be aggregated into one area-equivalent rectangular WINDOW
+            for each window construction. (Default: False).
+        exclude_similar_interior_faces: Boolean to note whether interior Faces
+            between Rooms with the same HVAC system, program, setpoints and
+            schedules should be excluded from the export. (Default: False).
+        shade_cutoff_angle: Optional number from 0 up to (but not including) 90
+            for the solar altitude in degrees below which the shadows of context
+            shades are neglected. If None, all shades will be written.
+            (Default: None).
+        merge_shades: Boolean to note whether adjacent coplanar context shades
+            should be merged together into larger FIXED-SHADEs. (Default: False).
+        room_cache: Optional path to a folder in which the INP of each Room
+            will be cached such that only the Rooms that have changed are
+            translated the next time. If None, no cache is used. (Default: None).
+        spool: Boolean to note whether the POLYGONs and definitions of the
+            building geometry should be spooled to temporary files instead of
+            being held in memory. (Default: False).
+        profile_file: Optional path to a JSON file to which the wall time and
+            the number of objects of each stage of the translation will be
+            written. If None, the translation is not profiled. (Default: None).
+        name_map_file: Optional path to a JSON file to which the mapping between
+            the identifiers of the Model objects and their names in the INP
+            will be written. If None, no mapping is written. (Default: None).
     """
     # load simulation parameters if specified
     sim_par = None
@@ -121,14 +250,68 @@ def model_to_inp(
 
     # re-serialize the Model to Python
     model = Model.from_file(model_file)
+    profiler = StageProfiler() if profile_file is not None else None
+    name_map = {} if name_map_file is not None else None
 
-    # create the strings for the model
-    inp_str = model.to.inp(
-        model, sim_par, hvac_mapping,
-        exclude_interior_walls, exclude_interior_ceilings, equest_version)
+    # return the INP string if no output file is specified
+    if output_file is None:
+        inp_str = model.to.inp(
+            model, sim_par, hvac_mapping,
+            exclude_interior_walls, exclude_interior_ceilings, equest_version,
+            workers=workers, collapse_typical_floors=collapse_typical_floors,
+            collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+            aggregate_windows=aggregate_windows,
+            exclude_similar_interior_faces=exclude_similar_interior_faces,
+            shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+            room_cache=room_cache, spool=spool, profiler=profiler,
+            name_map=name_map)
+        _write_profile_and_name_map(profiler, profile_file, name_map, name_map_file)
+        return inp_str
 
-    # write out the INP file
-    return process_content_to_output(inp_str, output_file)
+    # otherwise, stream the INP blocks directly to the output file
+    if isinstance(output_file, str):
+        dir_name = os.path.dirname(os.path.abspath(output_file))
+        if not os.path.isdir(dir_name):
+            os.makedirs(dir_name)
+        write_model_inp(
+            model, output_file, sim_par, hvac_mapping,
+            exclude_interior_walls, exclude_interior_ceilings, equest_version,
+            workers=workers, collapse_typical_floors=collapse_typical_floors,
+            collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+            aggregate_windows=aggregate_windows,
+            exclude_similar_interior_faces=exclude_similar_interior_faces,
+            shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+            room_cache=room_cache, spool=spool, profiler=profiler,
+            name_map=name_map)
+    else:
+        if 'stdout' not in str(output_file):
+            dir_name = os.path.dirname(os.path.abspath(output_file.name))
+            if not os.path.isdir(dir_name):
+                os.makedirs(dir_name)
+            # compressed files are opened from their path by write_model_inp
+            ext = os.path.splitext(output_file.name)[1].lower()
+            if ext in GZIP_EXTENSIONS + ZSTD_EXTENSIONS:
+                output_file = output_file.name
+        write_model_inp(
+            model, output_file, sim_par, hvac_mapping,
+            exclude_interior_walls, exclude_interior_ceilings, equest_version,
+            workers=workers, collapse_typical_floors=collapse_typical_floors,
+            collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+            aggregate_windows=aggregate_windows,
+            exclude_similar_interior_faces=exclude_similar_interior_faces,
+            shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+            room_cache=room_cache, spool=spool, profiler=profiler,
+            name_map=name_map)
+    _write_profile_and_name_map(profiler, profile_file, name_map, name_map_file)
+
+
+def _write_profile_and_name_map(profiler, profile_file, name_map, name_map_file):
+    """Write the profile and the name map of a translation to JSON files."""
+    if profiler is not None:
+        profiler.to_json(profile_file)
+    if name_map is not None:
+        with open(name_map_file, 'w') as json_file:
+            json.dump(name_map, json_file, indent=4)
 
 
 @translate.command('schedules-to-inp')
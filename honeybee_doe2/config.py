@@ -6,6 +6,9 @@ DOE2_ANGLE_TOL = 1.0  # current best guess for DOE-2 angle tolerance in degrees
 FLOOR_LEVEL_TOL = 0.1  # tolerance for grouping Rooms by floor elevations in Feet
 GEO_DEC_COUNT = 4  # number of decimal places that all geometry will be rounded
 RECT_WIN_SUBD = 0.5  # subdivision distance to rectangularize windows in Feet
+DOE2_MAX_VERTICES = 120  # maximum number of vertices in a DOE-2 POLYGON
+ROOM_CACHE_SIZE = 200  # maximum size of the folder of cached Room INP blocks in MB
+SHADE_GRID_CELLS = 32  # grid cells along the longest building side for shade culling
 DOE2_INTERIOR_BCS = ('Surface', 'Adiabatic', 'OtherSideTemperature')
 MIN_LAYER_THICKNESS = 0.003  # the minimum thickness for a material to be valid in meters
 GEO_CHARS = 24  # number of original characters used in names of geometry
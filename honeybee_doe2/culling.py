@@ -0,0 +1,199 @@
+# coding=utf-8
+"""Methods for culling context shades that cannot shade the building."""
+from __future__ import division
+import math
+
+from ladybug_geometry.geometry3d import Mesh3D
+from honeybee.shademesh import ShadeMesh
+from honeybee.boundarycondition import Outdoors
+
+from .config import SHADE_GRID_CELLS
+
+
+def cull_shades(model, cutoff_angle, tolerance=0.01):
+    """Get the shades of a Model that can cast a shadow on the exterior of its Rooms.
+
+    Only orphaned Shades and the faces of ShadeMeshes are culled since shades
+    assigned to Rooms, Faces and Apertures are in direct contact with the
+    building. A shade can only cast a shadow on an exterior Face of a Room
+    when the sun is higher than the angle between the top of the shade and
+    that Face. So shades that are below the lowest exterior Face or that are
+    far enough away from all exterior Faces that the sun would have to be lower
+    than the cutoff_angle to cast their shadow on the building are removed.
+
+    The exterior Faces are gathered into a grid over the plan of the building,
+    which stores the lowest elevation of the Faces in each cell. Shades that
+    are near the building are checked against the cells within their reach,
+    which allows the culling to scale to large context meshes.
+
+    Args:
+        model: A Honeybee Model with the Rooms that receive shadows and the
+            shades to be culled.
+        cutoff_angle: A number from 0 up to (but not including) 90 for the solar
+            altitude in degrees below which the shadows of context shades are
+            neglected. When 0, only the shades below the lowest exterior Face
+            are removed.
+        tolerance: The maximum difference between values at which point they
+            are considered equivalent. (Default: 0.01).
+
+    Returns:
+        A tuple with three elements.
+
+        -   shades: A list of the Shades of the Model that can shade the building.
+
+        -   shade_meshes: A list of the ShadeMeshes of the Model that can shade
+            the building. ShadeMeshes where only some of the faces can shade
+            the building are replaced by a ShadeMesh with only those faces.
+
+        -   removed_count: An integer for the number of Shades and ShadeMesh
+            faces that were removed.
+    """
+    if not 0 <= cutoff_angle < 90:
+        raise ValueError('Shade cutoff_angle must be from 0 up to (but not '
+                         'including) 90. Got {}.'.format(cutoff_angle))
+    grid = _ReceiverGrid(model.rooms)
+    if grid.is_empty:  # no exterior faces to receive shadows
+        return list(model.shades), list(model.shade_meshes), 0
+    slope = math.tan(math.radians(cutoff_angle))
+
+    # cull the orphaned shades, keeping all shades assigned to other objects
+    shades, removed_count = [shd for shd in model.shades if shd.has_parent], 0
+    for shade in model.orphaned_shades:
+        if grid.can_shade(shade.geometry, slope, tolerance):
+            shades.append(shade)
+        else:
+            removed_count += 1
+
+    # cull the faces of the shade meshes
+    shade_meshes = []
+    for shade_mesh in model.shade_meshes:
+        mesh = shade_mesh.geometry
+        kept_faces = [
+            face for face, f_verts in zip(mesh.faces, mesh.face_vertices)
+            if grid.can_shade(f_verts, slope, tolerance)
+        ]
+        removed_count += len(mesh.faces) - len(kept_faces)
+        if len(kept_faces) == len(mesh.faces):
+            shade_meshes.append(shade_mesh)
+        elif len(kept_faces) != 0:
+            shade_meshes.append(_sub_shade_mesh(shade_mesh, kept_faces))
+    return shades, shade_meshes, removed_count
+
+
+def _sub_shade_mesh(shade_mesh, faces):
+    """Get a copy of a ShadeMesh with only some of the faces of its Mesh3D."""
+    mesh = shade_mesh.geometry
+    vert_indices = sorted(set(i for face in faces for i in face))
+    vert_map = {old_i: new_i for new_i, old_i in enumerate(vert_indices)}
+    vertices = tuple(mesh.vertices[i] for i in vert_indices)
+    faces = tuple(tuple(vert_map[i] for i in face) for face in faces)
+    new_mesh = ShadeMesh(
+        shade_mesh.identifier, Mesh3D(vertices, faces), shade_mesh.is_detached)
+    new_mesh._display_name = shade_mesh._display_name
+    new_mesh._user_data = None if shade_mesh.user_data is None \
+        else shade_mesh.user_data.copy()
+    new_mesh._properties._duplicate_extension_attr(shade_mesh._properties)
+    return new_mesh
+
+
+class _ReceiverGrid(object):
+    """Grid over the plan of a building with the lowest exterior Face in each cell.
+
+    Args:
+        rooms: A list of Honeybee Rooms with the exterior Faces that can
+            receive shadows.
+    """
+    __slots__ = ('_cells', '_min_x', '_min_y', '_cell_size', '_bounds', '_min_z')
+
+    def __init__(self, rooms):
+        # gather the bounding boxes of all exterior faces
+        face_bounds = []
+        for room in rooms:
+            for face in room.faces:
+                if isinstance(face.boundary_condition, Outdoors):
+                    f_min, f_max = face.geometry.min, face.geometry.max
+                    face_bounds.append((f_min.x, f_min.y, f_max.x, f_max.y, f_min.z))
+        self._cells = {}
+        if len(face_bounds) == 0:
+            return
+
+        # set up the grid to cover the bounding box of all faces
+        self._min_x = min(b[0] for b in face_bounds)
+        self._min_y = min(b[1] for b in face_bounds)
+        max_x = max(b[2] for b in face_bounds)
+        max_y = max(b[3] for b in face_bounds)
+        self._bounds = (self._min_x, self._min_y, max_x, max_y)
+        self._min_z = min(b[4] for b in face_bounds)
+        longest_side = max(max_x - self._min_x, max_y - self._min_y)
+        self._cell_size = longest_side / SHADE_GRID_CELLS if longest_side > 0 else 1
+
+        # record the lowest elevation of the faces that overlap each cell
+        cells = self._cells
+        for f_min_x, f_min_y, f_max_x, f_max_y, f_min_z in face_bounds:
+            i_st, j_st = self._cell_index(f_min_x, f_min_y)
+            i_end, j_end = self._cell_index(f_max_x, f_max_y)
+            for i in range(i_st, i_end + 1):
+                for j in range(j_st, j_end + 1):
+                    if cells.get((i, j), f_min_z + 1) > f_min_z:
+                        cells[(i, j)] = f_min_z
+
+    @property
+    def is_empty(self):
+        """Get a boolean for whether the grid has no exterior Faces."""
+        return len(self._cells) == 0
+
+    def can_shade(self, points, slope, tolerance=0.01):
+        """Check whether a shade with a list of vertices can shade any exterior Face.
+
+        Args:
+            points: A list of Point3D for the vertices of the shade.
+            slope: The tangent of the cutoff solar altitude.
+            tolerance: The maximum difference between values at which point they
+                are considered equivalent. (Default: 0.01).
+        """
+        s_min_x = min(pt.x for pt in points)
+        s_min_y = min(pt.y for pt in points)
+        s_max_x = max(pt.x for pt in points)
+        s_max_y = max(pt.y for pt in points)
+        s_max_z = max(pt.z for pt in points)
+        height = s_max_z - self._min_z
+        if height <= tolerance:  # shade is entirely below the building
+            return False
+        if slope == 0:  # any shade above the lowest exterior face can shade it
+            return True
+
+        # check the distance to the bounding box of the building
+        shd_bounds = (s_min_x, s_min_y, s_max_x, s_max_y)
+        reach = height / slope + tolerance
+        if self._distance(shd_bounds, self._bounds) > reach:
+            return False
+
+        # check the distance to each of the cells within reach of the shade
+        i_st, j_st = self._cell_index(s_min_x - reach, s_min_y - reach)
+        i_end, j_end = self._cell_index(s_max_x + reach, s_max_y + reach)
+        cell_count = (i_end - i_st + 1) * (j_end - j_st + 1)
+        if cell_count < len(self._cells):
+            cells = ((i, j) for i in range(i_st, i_end + 1)
+                     for j in range(j_st, j_end + 1) if (i, j) in self._cells)
+        else:
+            cells = self._cells
+        size = self._cell_size
+        for i, j in cells:
+            cell_x, cell_y = self._min_x + i * size, self._min_y + j * size
+            cell_bounds = (cell_x, cell_y, cell_x + size, cell_y + size)
+            dist = self._distance(shd_bounds, cell_bounds)
+            if s_max_z - self._cells[(i, j)] >= slope * dist - tolerance:
+                return True
+        return False
+
+    def _cell_index(self, x, y):
+        """Get the (i, j) index of the grid cell that contains a point."""
+        return (int(math.floor((x - self._min_x) / self._cell_size)),
+                int(math.floor((y - self._min_y) / self._cell_size)))
+
+    @staticmethod
+    def _distance(bounds_1, bounds_2):
+        """Get the horizontal distance between two (min_x, min_y, max_x, max_y)."""
+        d_x = max(0, bounds_2[0] - bounds_1[2], bounds_1[0] - bounds_2[2])
+        d_y = max(0, bounds_2[1] - bounds_1[3], bounds_1[1] - bounds_2[3])
+        return math.sqrt(d_x ** 2 + d_y ** 2)
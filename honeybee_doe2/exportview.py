@@ -0,0 +1,574 @@
+# coding=utf-8
+"""View of a Honeybee Model that is prepared for translation to INP."""
+from __future__ import division
+import math
+
+from ladybug_geometry.geometry2d import Point2D
+from ladybug_geometry.geometry3d import Vector3D, Plane, Face3D
+from honeybee.model import Model
+from honeybee.aperture import Aperture
+from honeybee.boundarycondition import Outdoors, Surface, boundary_conditions
+from honeybee.typing import clean_doe2_string, clean_string, clean_and_number_string
+from honeybee.units import conversion_factor_to_meters
+
+from .config import DOE2_TOLERANCE, DOE2_ANGLE_TOL, RECT_WIN_SUBD, GEO_CHARS, \
+    RES_CHARS
+
+
+class ExportView(object):
+    """View of a Honeybee Model that is prepared for translation to INP.
+
+    Preparing a Model for DOE-2 requires converting it to Feet, removing
+    degenerate geometry, rectangularizing the Apertures and assigning valid
+    DOE-2 U-Names to all objects. Instead of making these edits to a duplicate
+    of the entire Model, this view records the U-Names and Room multipliers
+    as an overlay and it only copies the Rooms that must be edited. All other
+    objects are read directly from the original Model, which is never mutated.
+
+    Optionally, all Apertures of each Face can be aggregated into one
+    rectangular Aperture per window construction before they are rectangularized.
+    The aggregated Apertures have the same total area, sill height and head
+    height as the original Apertures of the Face, which avoids writing many
+    WINDOW objects for curtain walls and other heavily-subdivided glazing.
+
+    Rooms are copied whenever the Model is not in Feet, whenever they have
+    Apertures or Doors, or whenever their Faces have colinear vertices or
+    degenerate geometry. The Apertures and Doors of copied Rooms are renamed
+    to their U-Names in place since they only exist within this view.
+
+    Note that Rooms that are read from the original Model keep their own interior
+    Face geometry rather than the flipped geometry of the adjacent Face. This
+    is equivalent within the DOE-2 tolerance since such Rooms have no colinear
+    vertices and only the first Face of each adjacent pair is written to the INP.
+
+    Args:
+        model: A Honeybee Model to be viewed for translation to INP.
+        aggregate_windows: Boolean to note whether the Apertures of each Face
+            should be aggregated into one rectangular Aperture for each window
+            construction on the Face. Faces where the aggregated Apertures
+            do not fit within the Face geometry keep their original
+            Apertures. (Default: False).
+
+    Properties:
+        * host
+        * model
+        * scale_factor
+        * identifier_map
+        * aggregate_windows
+        * simplified_polygons
+    """
+    __slots__ = ('_host', '_model', '_scale_factor', '_room_ids', '_face_ids',
+                 '_aperture_ids', '_door_ids', '_shade_ids', '_shade_mesh_ids',
+                 '_doe2_names', '_multipliers', '_face_geometries',
+                 '_room_prototypes', '_boundary_conditions', '_aggregate_windows',
+                 '_simplified_polygons')
+
+    def __init__(self, model, aggregate_windows=False):
+        assert isinstance(model, Model), \
+            'Expected Honeybee Model for ExportView. Got {}.'.format(type(model))
+        self._host = model
+        self._aggregate_windows = bool(aggregate_windows)
+        self._multipliers = {}
+        self._face_geometries = {}
+        self._room_prototypes = {}
+        self._boundary_conditions = {}
+        self._doe2_names = {}
+        self._simplified_polygons = {}
+
+        # determine the factor needed to scale the model to feet
+        if model.units == 'Feet':
+            self._scale_factor = 1
+        else:
+            self._scale_factor = conversion_factor_to_meters(model.units) / \
+                conversion_factor_to_meters('Feet')
+        tolerance = model.tolerance * self._scale_factor
+
+        # gather the Rooms and orphaned objects that belong in the view
+        rooms = self._export_rooms(tolerance)
+        orphaned_faces = self._export_orphaned(model.orphaned_faces)
+        for i, face in enumerate(orphaned_faces):
+            if face.has_sub_faces:  # rectangularize the apertures like those of Rooms
+                if self._scale_factor == 1:  # face has not yet been copied
+                    face = face.duplicate()
+                if self._aggregate_windows:
+                    self._aggregate_face_apertures(
+                        face, tolerance, model.angle_tolerance)
+                self._rectangularize_face_apertures(
+                    face, tolerance, model.angle_tolerance)
+                orphaned_faces[i] = face
+        orphaned_apertures = self._export_orphaned(model.orphaned_apertures)
+        orphaned_doors = self._export_orphaned(model.orphaned_doors)
+        orphaned_shades = self._export_orphaned(model.orphaned_shades)
+        shade_meshes = []
+        for shade_mesh in model.shade_meshes:
+            new_mesh = shade_mesh.duplicate()
+            if self._scale_factor != 1:
+                new_mesh.scale(self._scale_factor)
+            try:
+                new_mesh.triangulate_and_remove_degenerate_faces(DOE2_TOLERANCE)
+            except AssertionError:  # completely degenerate Shade Mesh
+                continue
+            shade_meshes.append(new_mesh)
+        self._model = Model(
+            model.identifier, rooms, orphaned_faces, orphaned_shades,
+            orphaned_apertures, orphaned_doors, shade_meshes,
+            units='Feet', tolerance=tolerance, angle_tolerance=model.angle_tolerance)
+        self._model._display_name = model._display_name
+
+        # assign valid DOE-2 U-Names to all of the objects in the view
+        self._assign_doe2_names()
+
+    @property
+    def host(self):
+        """Get the original Honeybee Model, which is not mutated by this view."""
+        return self._host
+
+    @property
+    def model(self):
+        """Get a Honeybee Model with all of the Rooms and Shades prepared for INP.
+
+        This Model is in Feet and it contains copies of any Rooms that had to be
+        edited alongside the original Rooms that did not require any edits.
+        """
+        return self._model
+
+    @property
+    def scale_factor(self):
+        """Get a number for the factor used to convert the original Model to Feet."""
+        return self._scale_factor
+
+    @property
+    def aggregate_windows(self):
+        """Get a boolean for whether the Apertures of each Face are aggregated."""
+        return self._aggregate_windows
+
+    @property
+    def identifier_map(self):
+        """Get a dictionary that maps the identifiers of the Model objects to U-Names.
+
+        The dictionary has the following keys, each of which has a dictionary
+        with the original object identifiers as keys and the U-Names as values.
+
+        * rooms
+        * faces
+        * apertures
+        * doors
+        * shades
+        * shade_meshes
+        """
+        return {
+            'rooms': self._room_ids,
+            'faces': self._face_ids,
+            'apertures': self._aperture_ids,
+            'doors': self._door_ids,
+            'shades': self._shade_ids,
+            'shade_meshes': self._shade_mesh_ids
+        }
+
+    @property
+    def simplified_polygons(self):
+        """Get a dictionary of the POLYGONs that were simplified to meet the DOE-2 limit.
+
+        The keys of the dictionary are the names of the POLYGONs in the INP
+        and each value is a dictionary with the following keys.
+
+        * deviation - The maximum distance between the original vertices
+          and the simplified POLYGON in Feet.
+        * area_change - The fractional change in the area of the POLYGON.
+        """
+        return dict(self._simplified_polygons)
+
+    def inp_name_map(self):
+        """Get a dictionary that maps the identifiers of the Model objects to INP names.
+
+        This is the same as the identifier_map but the U-Names are cleaned
+        in the same way as they are when they are written to the INP. It also
+        includes the names of the constructions, materials and schedules
+        under the following keys. Note that the FIXED-SHADEs written for each
+        face of a ShadeMesh start with the name of the ShadeMesh.
+
+        * constructions
+        * materials
+        * schedules
+        """
+        name_map = {}
+        for key, id_map in self.identifier_map.items():
+            name_map[key] = {obj_id: self.doe2_name(u_name, GEO_CHARS)
+                             for obj_id, u_name in id_map.items()}
+        energy_prop = self._model.properties.energy
+        for key, resources in (('constructions', energy_prop.constructions),
+                               ('materials', energy_prop.materials),
+                               ('schedules', energy_prop.schedules)):
+            name_map[key] = {res.identifier: self.doe2_name(res.identifier, RES_CHARS)
+                             for res in resources}
+        return name_map
+
+    def doe2_name(self, identifier, char_limit=RES_CHARS):
+        """Get a valid DOE-2 name from an identifier or a U-Name.
+
+        The names are computed with the clean_doe2_string function the first
+        time that they are requested and they are looked up in a table of
+        previously-cleaned names after that. So the same identifiers can be
+        requested for every object that references them without cleaning
+        them more than once during an export.
+
+        Args:
+            identifier: Text for the identifier or U-Name to be cleaned.
+            char_limit: An integer for the maximum number of characters in
+                the name. (Default: 30).
+        """
+        try:
+            return self._doe2_names[(identifier, char_limit)]
+        except KeyError:  # first time that the name is requested
+            name = self._doe2_names[(identifier, char_limit)] = \
+                clean_doe2_string(identifier, char_limit)
+            return name
+
+    def record_simplified_polygon(self, polygon_name, deviation, area_change):
+        """Record that a POLYGON was simplified to meet the DOE-2 vertex limit.
+
+        Args:
+            polygon_name: Text for the name of the POLYGON in the INP.
+            deviation: A number for the maximum distance between the original
+                vertices and the simplified POLYGON.
+            area_change: A number for the fractional change in the area of
+                the POLYGON.
+        """
+        self._simplified_polygons[polygon_name] = \
+            {'deviation': deviation, 'area_change': area_change}
+
+    def room_identifier(self, identifier):
+        """Get the U-Name of a Room in the view from its original identifier."""
+        return self._room_ids.get(identifier, identifier)
+
+    def face_identifier(self, identifier):
+        """Get the U-Name of a Face in the view from its original identifier."""
+        return self._face_ids.get(identifier, identifier)
+
+    def shade_identifier(self, identifier):
+        """Get the U-Name of a Shade in the view from its original identifier."""
+        return self._shade_ids.get(identifier, identifier)
+
+    def shade_mesh_identifier(self, identifier):
+        """Get the U-Name of a ShadeMesh in the view from its original identifier."""
+        return self._shade_mesh_ids.get(identifier, identifier)
+
+    def room_multiplier(self, room):
+        """Get the multiplier of a Room in the view."""
+        try:
+            return self._multipliers[room.identifier]
+        except KeyError:  # the multiplier has not been overridden
+            return room.multiplier
+
+    def set_room_multiplier(self, room, multiplier):
+        """Override the multiplier of a Room in the view without mutating the Room.
+
+        Args:
+            room: A Honeybee Room in the view.
+            multiplier: An integer for the new multiplier of the Room.
+        """
+        self._multipliers[room.identifier] = multiplier
+
+    def face_boundary_condition(self, face):
+        """Get the boundary condition of a Face in the view."""
+        try:
+            return self._boundary_conditions[face.identifier]
+        except KeyError:  # the boundary condition has not been overridden
+            return face.boundary_condition
+
+    def set_face_boundary_condition(self, face, boundary_condition):
+        """Override the boundary condition of a Face in the view without mutating it.
+
+        Args:
+            face: A Honeybee Face in the view.
+            boundary_condition: A Honeybee boundary condition object to be used
+                for the Face in the INP.
+        """
+        self._boundary_conditions[face.identifier] = boundary_condition
+
+    def face_geometry_cache(self, face):
+        """Get a dictionary to cache geometry that is derived from a Face in the view.
+
+        The INP writer functions store values like the cleaned Face3D, the
+        lower-left corner and the reference plane of sub-faces in this dictionary
+        such that they are only computed once for each Face during an export.
+
+        Args:
+            face: A Honeybee Face in the view.
+        """
+        try:
+            return self._face_geometries[face.identifier]
+        except KeyError:  # first time that the face is requested
+            cache = self._face_geometries[face.identifier] = {}
+            return cache
+
+    def room_prototype_cache(self, key):
+        """Get a dictionary to cache the INP geometry shared by congruent Rooms.
+
+        Rooms that are exact translations of one another have the same SPACE
+        and Face POLYGONs. So the INP writer functions store these POLYGONs
+        in this dictionary for the first of these Rooms (the prototype) and
+        the other Rooms only need new names and origins.
+
+        Args:
+            key: A hashable object, which is the same for all Rooms in the
+                view that are translations of one another.
+        """
+        try:
+            return self._room_prototypes[key]
+        except KeyError:  # first Room with this geometry
+            cache = self._room_prototypes[key] = {}
+            return cache
+
+    def _export_rooms(self, tolerance):
+        """Get a list of Rooms that are ready for translation to INP."""
+        rooms, adj_dict = [], {}
+        for room in self._host.rooms:
+            if self._scale_factor == 1 and self._is_room_valid(room, adj_dict):
+                for face in room.faces:
+                    if isinstance(face.boundary_condition, Surface):
+                        adj_dict[face.boundary_condition.boundary_condition_object] = face
+                rooms.append(room)
+                continue
+            # copy the room and edit it so that it is ready for translation
+            new_room = room.duplicate()
+            if self._scale_factor != 1:
+                new_room.scale(self._scale_factor)
+            try:  # remove degenerate geometry within native DOE-2 tolerance
+                adj_dict.update(new_room.clean_envelope(adj_dict, DOE2_TOLERANCE))
+            except AssertionError:  # room removed; likely wrong units
+                error = 'Failed to remove degenerate Rooms.\nYour Model units ' \
+                    'system is: {}. Is this correct?'.format(self._host.units)
+                raise ValueError(error)
+            # remove interior sub-faces as they cannot be placed in INP extrusion walls
+            for face in new_room.faces:
+                if isinstance(face.boundary_condition, Surface) and face.has_sub_faces:
+                    face.remove_sub_faces()
+            # convert all of the Aperture geometries to rectangles
+            for face in new_room.faces:
+                if self._aggregate_windows:
+                    self._aggregate_face_apertures(
+                        face, tolerance, self._host.angle_tolerance)
+                self._rectangularize_face_apertures(
+                    face, tolerance, self._host.angle_tolerance)
+            rooms.append(new_room)
+        return rooms
+
+    def _export_orphaned(self, objects):
+        """Get a list of orphaned objects without any degenerate geometry."""
+        export_objs = []
+        for obj in objects:
+            if self._scale_factor != 1:
+                obj = obj.duplicate()
+                obj.scale(self._scale_factor)
+            try:
+                obj.geometry.remove_colinear_vertices(DOE2_TOLERANCE)
+            except AssertionError:  # degenerate object to ignore
+                continue
+            export_objs.append(obj)
+        return export_objs
+
+    def _assign_doe2_names(self):
+        """Assign U-Names to all objects that are derived from their display names.
+
+        U-Names are numbered in the same way as the Model.reset_ids method so
+        that they are unique within each type of object.
+        """
+        self._room_ids, self._face_ids = {}, {}
+        self._aperture_ids, self._door_ids = {}, {}
+        self._shade_ids, self._shade_mesh_ids = {}, {}
+        room_dict, face_dict, ap_dict, dr_dict, shd_dict, sm_dict = \
+            {}, {}, {}, {}, {}, {}
+        model = self._model
+        for room in model.rooms:
+            self._room_ids[room.identifier] = clean_and_number_string(
+                self._base_name(room), room_dict, 'Room identifier')
+        for face in model.faces:
+            self._face_ids[face.identifier] = clean_and_number_string(
+                self._base_name(face), face_dict, 'Face identifier')
+        for room in model.rooms:  # rooms with sub-faces are copies that can be renamed
+            for face in room.faces:
+                for ap in face.apertures:
+                    ap.display_name = self._base_name(ap)
+                    ap_id = clean_and_number_string(
+                        ap.display_name, ap_dict, 'Aperture identifier')
+                    self._aperture_ids[ap.identifier] = ap_id
+                    ap.identifier = ap_id
+        for room in model.rooms:
+            for face in room.faces:
+                for dr in face.doors:
+                    dr.display_name = self._base_name(dr)
+                    dr_id = clean_and_number_string(
+                        dr.display_name, dr_dict, 'Door identifier')
+                    self._door_ids[dr.identifier] = dr_id
+                    dr.identifier = dr_id
+        for shade in model.shades:
+            self._shade_ids[shade.identifier] = clean_and_number_string(
+                self._base_name(shade), shd_dict, 'Shade identifier')
+        for shade_mesh in model.shade_meshes:
+            self._shade_mesh_ids[shade_mesh.identifier] = clean_and_number_string(
+                self._base_name(shade_mesh), sm_dict, 'ShadeMesh identifier')
+
+    @staticmethod
+    def _rectangularize_face_apertures(face, tolerance, angle_tolerance):
+        """Convert all Apertures of a Face to rectangles that can be written to INP.
+
+        Apertures are merged with any Apertures that they touch and the merged
+        geometries are subdivided into rectangles. However, this is expensive
+        and most Faces have a single Aperture that is already a rectangle,
+        which the merging and subdivision would not change. So, for such Faces,
+        the Aperture is directly replaced with the same Aperture that would
+        result from the merging and subdivision. Faces with several Apertures
+        always go through the merging, which sets the order and names of the
+        resulting Apertures.
+
+        Args:
+            face: A Honeybee Face with Apertures to be rectangularized.
+            tolerance: The maximum difference between point values for them to be
+                considered equivalent.
+            angle_tolerance: The max angle difference in degrees that the corners
+                of the rectangles can differ from a right angle.
+        """
+        apertures = face.apertures
+        if len(apertures) == 0:
+            return
+        if len(apertures) == 1:  # check whether the aperture is a rectangle
+            ap = apertures[0]
+            try:
+                clean_geo = ap.geometry.remove_colinear_vertices(tolerance)
+                is_rect = not clean_geo.has_holes and \
+                    clean_geo.polygon2d.is_rectangle(math.radians(angle_tolerance))
+            except AssertionError:  # degenerate aperture to be removed
+                is_rect = False
+            if is_rect:  # no need to merge or subdivide the aperture
+                if not isinstance(face.boundary_condition, Outdoors):
+                    face.boundary_condition = boundary_conditions.outdoors
+                new_ap = Aperture(ap.identifier, clean_geo, is_operable=ap.is_operable)
+                new_ap.display_name = '{}_0'.format(ap.display_name)
+                face.remove_apertures()
+                face.add_aperture(new_ap)
+                return
+        face.rectangularize_apertures(
+            subdivision_distance=RECT_WIN_SUBD, max_separation=0.0,
+            merge_all=True, tolerance=tolerance, angle_tolerance=angle_tolerance
+        )
+
+    @staticmethod
+    def _aggregate_face_apertures(face, tolerance, angle_tolerance):
+        """Replace the Apertures of a Face with one rectangle per window construction.
+
+        The rectangles span the full height of the bounding rectangle around
+        all of the original Apertures such that the sill and head heights are
+        preserved. Their widths are set to match the total area of the original
+        Apertures with each construction and they are placed side by side in
+        the middle of the bounding rectangle. The first Aperture with each
+        construction is used for the identifier and properties of the new
+        Aperture and the shades of all original Apertures are transferred to it.
+
+        Args:
+            face: A Honeybee Face with Apertures to be aggregated.
+            tolerance: The maximum difference between point values for them to be
+                considered equivalent.
+            angle_tolerance: The max angle difference in degrees that vertices
+                are allowed to differ from one another in order to consider
+                them colinear.
+        """
+        if len(face.apertures) == 0:
+            return
+        # get a plane in the face where the X axis is horizontal like the INP WINDOWs
+        normal = face.normal
+        if DOE2_ANGLE_TOL <= face.tilt <= 180 - DOE2_ANGLE_TOL:  # vertical or tilted
+            proj_y = Vector3D(0, 0, 1).project(normal)
+            proj_x = proj_y.rotate(normal, math.pi / -2)
+        else:  # located within the XY plane
+            proj_x = Vector3D(1, 0, 0)
+        plane = Plane(normal, face.geometry.lower_left_corner, proj_x)
+
+        # group the apertures by construction and get their bounding rectangle
+        con_ids, groups, areas = [], {}, {}
+        min_x = min_y = float('inf')
+        max_x = max_y = float('-inf')
+        for ap in face.apertures:
+            con_id = ap.properties.energy.construction.identifier
+            try:
+                groups[con_id].append(ap)
+                areas[con_id] += ap.area
+            except KeyError:  # first aperture with the construction
+                con_ids.append(con_id)
+                groups[con_id], areas[con_id] = [ap], ap.area
+            for pt in ap.geometry.boundary:
+                pt_2d = plane.xyz_to_xy(pt)
+                min_x, max_x = min(min_x, pt_2d.x), max(max_x, pt_2d.x)
+                min_y, max_y = min(min_y, pt_2d.y), max(max_y, pt_2d.y)
+        height = max_y - min_y
+        if height <= tolerance:  # degenerate apertures; leave them as they are
+            return
+
+        # create the aggregated rectangles in the middle of the bounding rectangle
+        widths = [areas[con_id] / height for con_id in con_ids]
+        x_st = min_x + ((max_x - min_x) - sum(widths)) / 2
+        new_aps = []
+        for con_id, width in zip(con_ids, widths):
+            apertures = groups[con_id]
+            pts_2d = (Point2D(x_st, min_y), Point2D(x_st + width, min_y),
+                      Point2D(x_st + width, max_y), Point2D(x_st, max_y))
+            geo = Face3D(tuple(plane.xy_to_xyz(pt) for pt in pts_2d), plane)
+            if not face.geometry.is_sub_face(geo, tolerance, angle_tolerance):
+                return  # the aggregated apertures do not fit; keep the originals
+            base_ap = apertures[0]
+            new_ap = Aperture(base_ap.identifier, geo, is_operable=base_ap.is_operable)
+            new_ap._display_name = base_ap._display_name
+            new_ap._user_data = None if base_ap.user_data is None \
+                else base_ap.user_data.copy()
+            new_ap._properties._duplicate_extension_attr(base_ap._properties)
+            for ap in apertures:
+                for shd in ap.outdoor_shades:
+                    new_ap.add_outdoor_shade(shd.duplicate())
+                for shd in ap.indoor_shades:
+                    new_ap.add_indoor_shade(shd.duplicate())
+            new_aps.append(new_ap)
+            x_st += width
+        face.remove_apertures()
+        face.add_apertures(new_aps)
+
+    @staticmethod
+    def _is_room_valid(room, adjacency_dict):
+        """Check whether a Room can be translated to INP without any edits.
+
+        Args:
+            room: A Honeybee Room to be checked.
+            adjacency_dict: A dictionary with the identifiers of Room Faces as
+                keys and their already-processed adjacent Faces as values.
+                Rooms with Faces that do not exactly match the flipped geometry
+                of these adjacent Faces are not valid.
+        """
+        for face in room.faces:
+            if face.has_sub_faces:
+                return False
+            try:
+                clean_geo = face.geometry.remove_colinear_vertices(DOE2_TOLERANCE)
+            except AssertionError:  # degenerate face to be removed
+                return False
+            if len(clean_geo.vertices) != len(face.geometry.vertices):
+                return False
+            try:
+                adj_geo = adjacency_dict[face.identifier].geometry
+            except KeyError:  # not an interior face or adjacent face is not yet found
+                continue
+            if adj_geo.flip().vertices != face.geometry.vertices:
+                return False
+        return True
+
+    @staticmethod
+    def _base_name(hb_obj):
+        """Get a base name for a U-Name that is derived from an object display name."""
+        base_name = clean_doe2_string(hb_obj.display_name, GEO_CHARS - 2)
+        return clean_string(base_name)
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'ExportView: {}'.format(self._host.display_name)
+
@@ -0,0 +1,191 @@
+# coding=utf-8
+"""Methods for analyzing the geometry of Rooms for translation to INP."""
+from __future__ import division
+import math
+import hashlib
+
+from ladybug_geometry.geometry3d import Vector3D
+
+from .config import DOE2_TOLERANCE, DOE2_ANGLE_TOL, DOE2_MAX_VERTICES
+
+
+def face_geometry_cache(face, export_view=None):
+    """Get a dictionary to cache geometry derived from a Face during an export."""
+    if export_view is None:
+        return {}
+    return export_view.face_geometry_cache(face)
+
+
+def clean_face_geometry(face, export_view=None):
+    """Get the geometry of a Face with colinear vertices removed.
+
+    An AssertionError will be raised if the Face geometry is degenerate.
+    """
+    cache = face_geometry_cache(face, export_view)
+    try:
+        clean_geo = cache['clean_geometry']
+    except KeyError:  # first time that the geometry is requested
+        try:
+            clean_geo = face.geometry.remove_colinear_vertices(DOE2_TOLERANCE)
+        except AssertionError:  # degenerate geometry
+            clean_geo = None
+        cache['clean_geometry'] = clean_geo
+    assert clean_geo is not None, 'Face "{}" is degenerate.'.format(face.display_name)
+    return clean_geo
+
+
+def face_lower_left_corner(face, export_view=None):
+    """Get the lower-left corner of a Face geometry."""
+    cache = face_geometry_cache(face, export_view)
+    try:
+        return cache['lower_left_corner']
+    except KeyError:  # first time that the corner is requested
+        llc = cache['lower_left_corner'] = face.geometry.lower_left_corner
+        return llc
+
+
+def room_geometry_analysis(room, floor_height=None, export_view=None):
+    """Analyze the geometry of a Room to determine how it is written to INP.
+
+    Args:
+        room: A Honeybee Room, which should be in an ExportView of its Model
+            such that it is in Feet.
+        floor_height: The SPACE-HEIGHT of the parent story or None. Rooms with
+            a height that differs from it are never written as extrusions.
+        export_view: The ExportView to which the Room belongs, which is used to
+            cache the clean geometry of the Room Faces. (Default: None).
+
+    Returns:
+        A tuple with three elements.
+
+        -   is_extrusion: A boolean for whether the Room is an extrusion, which
+            can be written without a POLYGON for each of its Faces.
+
+        -   face_locations: A list that aligns with the Room.faces and contains
+            the LOCATION of each Face in the SPACE polygon or None if the Face
+            must be written with its own POLYGON.
+
+        -   r_geo: A Face3D for the SPACE polygon of the Room or None if the
+            Room must be written with NO-SHAPE.
+    """
+    def _is_room_3d_extruded(hb_room):
+        """Test if a Room is a pure extrusion.
+
+        Args:
+            hb_room: The Honeybee Room to be tested.
+
+        Returns:
+            A tuple with two elements.
+
+            -   is_extrusion: True if the geometry is an extrusion. False if not.
+
+            -   face_orientations: A list of integers that aligns with the Room.faces
+                and denotes whether each face is downward (-1), vertical (0) or
+                upward (+1).
+        """
+        # first check if we have to use POLYGONS because of the parent SPACE-HEIGHT
+        if floor_height is not None:
+            room_height = room.max.z - room.min.z
+            if abs(room_height - floor_height) > DOE2_TOLERANCE:
+                return False, []
+
+        # set up the parameters for evaluating vertical or horizontal
+        vert_vec = Vector3D(0, 0, 1)
+        min_v_ang = math.radians(DOE2_ANGLE_TOL)
+        max_v_ang = math.pi - min_v_ang
+        min_h_ang = (math.pi / 2) - min_v_ang
+        max_h_ang = (math.pi / 2) + min_v_ang
+
+        # loop through the Room faces and test them
+        face_orientations = []
+        for face in hb_room.faces:
+            try:  # first make sure that the geometry is not degenerate
+                clean_geo = clean_face_geometry(face, export_view)
+                v_ang = clean_geo.normal.angle(vert_vec)
+                if v_ang <= min_v_ang:
+                    face_orientations.append(1)
+                    continue
+                elif v_ang >= max_v_ang:
+                    face_orientations.append(-1)
+                    continue
+                elif min_h_ang <= v_ang <= max_h_ang:
+                    face_orientations.append(0)
+                    continue
+                return False, []
+            except AssertionError:  # degenerate face to ignore
+                pass
+        return True, face_orientations
+
+    # if the room is extruded, determine the locations of each face
+    face_locations = []
+    is_extrusion, face_orientations = _is_room_3d_extruded(room)
+    if is_extrusion:  # try to translate without using POLYGON for the Room faces
+        if room.properties.doe2.space_polygon_geometry is not None:
+            r_geo = room.properties.doe2.space_polygon_geometry
+        else:
+            try:
+                r_geo = room.properties.doe2.horizontal_boundary(
+                    match_walls=True, tolerance=DOE2_TOLERANCE)
+            except Exception:  # we may need to write it with NO-SHAPE
+                r_geo = None
+        if r_geo is not None:
+            r_geo = r_geo if r_geo.normal.z >= 0 else r_geo.flip()
+            r_geo = r_geo.remove_duplicate_vertices(DOE2_TOLERANCE)
+            rm_pts = r_geo.lower_left_counter_clockwise_boundary
+            rm_height = room.max.z - room.min.z
+            ceil_count = len([orient for orient in face_orientations if orient == 1])
+            floor_count = len([orient for orient in face_orientations if orient == -1])
+            for face, orient in zip(room.faces, face_orientations):
+                if orient == 0:  # wall to associate with a room vertex
+                    clean_geo = clean_face_geometry(face, export_view)
+                    face_height = face.max.z - face.min.z
+                    if clean_geo.boundary_polygon2d.is_rectangle(DOE2_ANGLE_TOL) and \
+                            abs(rm_height - face_height) <= DOE2_TOLERANCE:
+                        f_origin = face_lower_left_corner(face, export_view)
+                        for i, r_pt in enumerate(rm_pts):
+                            if f_origin.is_equivalent(r_pt, DOE2_TOLERANCE):
+                                face_locations.append('SPACE-V{}'.format(i + 1))
+                                break
+                        else:  # not associated with any Room vertex
+                            face_locations.append(None)
+                    else:  # not a rectangular geometry
+                        face_locations.append(None)
+                elif orient == 1:
+                    loc = 'TOP' if ceil_count == 1 and not r_geo.has_holes else None
+                    face_locations.append(loc)
+                else:
+                    loc = 'BOTTOM' if floor_count == 1 else None
+                    face_locations.append(loc)
+
+    # if the room is not extruded, just use the generic horizontal boundary
+    if len(face_locations) == 0:
+        if room.properties.doe2.space_polygon_geometry is not None:
+            r_geo = room.properties.doe2.space_polygon_geometry
+        else:
+            try:
+                r_geo = room.properties.doe2.horizontal_boundary(
+                    match_walls=False, tolerance=DOE2_TOLERANCE)
+                r_geo = r_geo if r_geo.normal.z >= 0 else r_geo.flip()
+                r_geo = r_geo.remove_colinear_vertices(tolerance=DOE2_TOLERANCE)
+            except Exception:  # we may need to write it with NO-SHAPE
+                r_geo = None
+        face_locations = [None] * len(room.faces)
+    elif r_geo is not None and len(r_geo.boundary) > DOE2_MAX_VERTICES:
+        # the SPACE polygon will be simplified and its vertices will not match walls
+        face_locations = [None] * len(room.faces)
+    return is_extrusion, face_locations, r_geo
+
+
+def room_precomputed_geometry(room):
+    """Get the precomputed_geometry of a Room if it still applies to its geometry."""
+    pre_geo = room.properties.doe2.precomputed_geometry
+    if pre_geo is not None and \
+            pre_geo['geometry_stamp'] == room.properties.doe2.geometry_stamp:
+        return pre_geo
+    return None
+
+
+def level_geometry_stamp(rooms):
+    """Get text for a hash of the geometry_stamp of each Room on a level."""
+    stamps = '|'.join(room.properties.doe2.geometry_stamp for room in rooms)
+    return hashlib.sha256(stamps.encode('utf-8')).hexdigest()
@@ -8,7 +8,7 @@ from ladybug_geometry.geometry3d import Vector3D, Point3D, Face3D
 from honeybee.typing import clean_doe2_string
 from honeybee.room import Room
 
-from .config import DOE2_TOLERANCE, FLOOR_LEVEL_TOL, RES_CHARS
+from .config import DOE2_TOLERANCE, FLOOR_LEVEL_TOL, RES_CHARS, GEO_DEC_COUNT
 
 
 def group_rooms_by_doe2_level(rooms, model_tolerance):
@@ -79,9 +79,11 @@ def group_rooms_by_doe2_level(rooms, model_tolerance):
                 floor_geos.append(room.properties.doe2.space_polygon_geometry)
             else:
                 try:
-                    flr_geo = room.horizontal_floor_boundaries(tolerance=model_tolerance)
+                    flr_geo = room.properties.doe2.horizontal_floor_boundaries(
+                        tolerance=model_tolerance)
                     if len(flr_geo) == 0:  # possible when Rooms have no floors
-                        flr_geo = room.horizontal_boundary(tolerance=model_tolerance)
+                        flr_geo = room.properties.doe2.horizontal_boundary(
+                            tolerance=model_tolerance)
                         floor_geos.append(flr_geo)
                     else:
                         floor_geos.extend(flr_geo)
@@ -207,6 +209,104 @@ def group_rooms_by_doe2_hvac(model, hvac_mapping):
     return room_groups, hvac_names
 
 
+def group_rooms_by_thermal_conditions(hvac_room_groups):
+    """Group Honeybee Rooms that share the same thermal conditions.
+
+    Rooms share the same thermal conditions when they are served by the same
+    DOE-2 HVAC system, they are both conditioned or unconditioned and they
+    have the same program, setpoint schedules and load schedules. Heat transfer
+    through interior Faces between such Rooms is negligible since both sides
+    of the Faces are at nearly the same temperature throughout the simulation.
+
+    Args:
+        hvac_room_groups: A list of lists where each sub-list contains Honeybee
+            Rooms that have the same DOE-2 HVAC system. This should be the
+            room_groups output of the group_rooms_by_doe2_hvac function.
+
+    Returns:
+        A list of lists where each sub-list contains Honeybee Rooms that share
+        the same thermal conditions. The groups are in the order that their
+        first Room appears in the hvac_room_groups.
+    """
+    room_groups, group_dict = [], {}
+    for hvac_i, rooms in enumerate(hvac_room_groups):
+        for room in rooms:
+            room_key = (hvac_i, _thermal_room_key(room))
+            try:
+                group_dict[room_key].append(room)
+            except KeyError:  # first room with these thermal conditions
+                group_dict[room_key] = [room]
+                room_groups.append(group_dict[room_key])
+    return room_groups
+
+
+def typical_floor_multipliers(room_groups, level_geometries):
+    """Get multipliers that collapse repeated DOE-2 levels into typical floors.
+
+    Two levels are considered identical when they have the same footprint and
+    their Rooms have the same geometry relative to the level elevation as well
+    as the same programs, loads, HVAC, multipliers and constructions. When
+    identical levels are stacked directly on top of one another, only the
+    lowest of them needs to be written to the INP with a FLOOR MULTIPLIER.
+
+    Args:
+        room_groups: A list of lists where each sub-list contains Honeybee
+            Rooms on the same DOE-2 level. This should be the room_groups output
+            of the group_rooms_by_doe2_level function.
+        level_geometries: A list of Face3D with the same length as the
+            room_groups, which contains the geometry of each floor level (or None
+            for levels without geometry).
+
+    Returns:
+        A list of integers that aligns with the room_groups. The lowest level of
+        each stack of identical levels gets the number of levels in the stack
+        and the other levels of the stack get 0. All other levels get 1.
+    """
+    multipliers, stacks = [1] * len(room_groups), {}
+    for i, (rooms, flr_geo) in enumerate(zip(room_groups, level_geometries)):
+        flr_z = min(room.min.z for room in rooms)
+        top_z = max(room.max.z for room in rooms)
+        level_key = _typical_level_key(rooms, flr_geo, flr_z)
+        try:  # see if the level is stacked on top of an identical level
+            base_i, last_top_z = stacks[level_key]
+            if abs(flr_z - last_top_z) <= FLOOR_LEVEL_TOL:
+                multipliers[base_i] += 1
+                multipliers[i] = 0
+                stacks[level_key] = (base_i, top_z)
+                continue
+        except KeyError:  # first level with this layout
+            pass
+        stacks[level_key] = (i, top_z)
+    return multipliers
+
+
+def group_identical_rooms(rooms):
+    """Group the Rooms of a DOE-2 level that can be written as a single SPACE.
+
+    Two Rooms are considered identical when they are translations of one
+    another (so they face the same way) and they have the same boundary
+    conditions, programs, loads, HVAC, multipliers and constructions. Only
+    the first Room of each group needs to be written to the INP with a
+    SPACE MULTIPLIER for the number of Rooms in the group.
+
+    Args:
+        rooms: A list of Honeybee Rooms on the same DOE-2 level.
+
+    Returns:
+        A list of lists where each sub-list contains identical Rooms. The
+        groups are in the order that their first Room appears in the input rooms.
+    """
+    room_groups, room_dict = [], {}
+    for room in rooms:
+        room_key = _typical_room_key(room, room.min)
+        try:  # see if the room is identical to a previous room
+            room_dict[room_key].append(room)
+        except KeyError:  # first room with this layout
+            room_dict[room_key] = [room]
+            room_groups.append(room_dict[room_key])
+    return room_groups
+
+
 def _grouped_floor_boundary(floor_geos, tolerance=0.01):
     """Get a list of Face3D for the boundary around several horizontal Face3Ds.
 
@@ -262,3 +362,113 @@ def _grouped_floor_boundary(floor_geos, tolerance=0.01):
             pts3d = tuple(Point3D(pt.x, pt.y, z_min) for pt in poly)
             bound_faces.append(Face3D(pts3d))
         return Face3D.merge_faces_to_holes(bound_faces, tolerance)
+
+
+def _typical_level_key(rooms, level_geometry, floor_z):
+    """Get a hashable key that is the same for identical DOE-2 levels.
+
+    Args:
+        rooms: A list of Honeybee Rooms on the level.
+        level_geometry: A Face3D for the geometry of the level or None.
+        floor_z: A number for the elevation of the level.
+    """
+    origin = Point3D(0, 0, floor_z)
+    room_keys = [_typical_room_key(room, origin) for room in rooms]
+    level_key = None if level_geometry is None else \
+        tuple((round(pt.x, GEO_DEC_COUNT), round(pt.y, GEO_DEC_COUNT))
+              for pt in level_geometry.boundary)
+    return level_key, tuple(sorted(room_keys))
+
+
+def hvac_grouping_key(hvac):
+    """Get a hashable key that is the same for HVACs that can serve grouped Rooms.
+
+    Ideal air systems are created for each Room and so they are compared by
+    their settings. All other HVACs are shared between the Rooms that they
+    serve and so they are compared by their identifier and display name.
+
+    Args:
+        hvac: A honeybee-energy HVAC object or None.
+    """
+    # imported here to avoid a circular import when honeybee loads this extension
+    from honeybee_energy.hvac.idealair import IdealAirSystem
+    if hvac is None:
+        return None
+    if isinstance(hvac, IdealAirSystem):
+        hvac_dict = hvac.to_dict()
+        hvac_dict.pop('identifier')
+        hvac_dict.pop('display_name', None)
+        return str(hvac_dict)
+    return (hvac.identifier, hvac.display_name)
+
+
+def _typical_room_key(room, origin):
+    """Get a hashable key that is the same for identical Rooms.
+
+    Args:
+        room: A Honeybee Room.
+        origin: A Point3D to which the vertices of the Room geometry are relative.
+    """
+    def _pts_key(pts):
+        return tuple((round(pt.x - origin.x, GEO_DEC_COUNT),
+                      round(pt.y - origin.y, GEO_DEC_COUNT),
+                      round(pt.z - origin.z, GEO_DEC_COUNT)) for pt in pts)
+
+    def _constr_id(hb_obj):
+        return hb_obj.properties.energy.construction.identifier
+
+    energy = room.properties.energy
+    loads = (
+        energy._program_type, energy._people, energy._lighting,
+        energy._electric_equipment, energy._gas_equipment,
+        energy._service_hot_water, energy._infiltration, energy._ventilation,
+        energy._setpoint
+    )
+    load_ids = tuple('' if load is None else load.identifier for load in loads)
+    hvac_key = hvac_grouping_key(energy._hvac)
+    face_keys = []
+    for face in room.faces:
+        sub_faces = tuple((_pts_key(sf.geometry.vertices), _constr_id(sf))
+                          for sf in face.apertures + face.doors)
+        face_keys.append((
+            _pts_key(face.geometry.vertices), str(face.type),
+            str(face.boundary_condition), _constr_id(face), sub_faces
+        ))
+    doe2_dict = room.properties.doe2.to_dict()['doe2']
+    doe2_dict.pop('precomputed_geometry', None)  # relates to specific Face identifiers
+    doe2_props = str(doe2_dict)
+    user_data = str(room.user_data)
+    return (tuple(face_keys), load_ids, hvac_key, room.multiplier,
+            doe2_props, user_data)
+
+
+def _thermal_room_key(room):
+    """Get a hashable key that is the same for Rooms with the same thermal conditions.
+
+    Args:
+        room: A Honeybee Room.
+    """
+    def _sch_id(schedule):
+        return '' if schedule is None else schedule.identifier
+
+    energy = room.properties.energy
+    if not energy.is_conditioned:
+        stp_key = None
+    else:
+        stp = energy.setpoint
+        stp_key = (
+            _sch_id(stp.heating_schedule), _sch_id(stp.cooling_schedule),
+            _sch_id(stp.humidifying_schedule), _sch_id(stp.dehumidifying_schedule)
+        )
+    people, vent = energy.people, energy.ventilation
+    load_schs = (
+        None if people is None else
+        (_sch_id(people.occupancy_schedule), _sch_id(people.activity_schedule)),
+        None if energy.lighting is None else _sch_id(energy.lighting.schedule),
+        None if energy.electric_equipment is None else
+        _sch_id(energy.electric_equipment.schedule),
+        None if energy.gas_equipment is None else _sch_id(energy.gas_equipment.schedule),
+        None if energy.infiltration is None else _sch_id(energy.infiltration.schedule),
+        None if vent is None else _sch_id(vent.schedule)
+    )
+    return energy.program_type.identifier, stp_key, load_schs
@@ -0,0 +1,226 @@
+# coding=utf-8
+"""Methods for merging coplanar shade geometry before translation to INP."""
+from __future__ import division
+import math
+
+from ladybug_geometry.geometry3d import Face3D
+from honeybee.shade import Shade
+
+
+def merge_coplanar_faces(face_3ds, tolerance=0.01, angle_tolerance=1):
+    """Merge adjacent coplanar Face3Ds into as few Face3Ds as possible.
+
+    Faces are merged when they lie in the same plane, they point in the same
+    direction and they are connected to one another through shared edges. A
+    group of connected faces is only merged when the result is a single Face3D
+    without holes that covers the same area as the original faces. Otherwise,
+    the original faces are kept since DOE-2 polygons cannot have holes.
+
+    Args:
+        face_3ds: A list of Face3Ds to be merged.
+        tolerance: The maximum difference between point values for them to be
+            considered equivalent. (Default: 0.01).
+        angle_tolerance: The max angle difference in degrees that the normals of
+            the faces can differ from one another for them to be considered
+            coplanar. (Default: 1).
+
+    Returns:
+        A tuple with two elements.
+
+        -   merged_faces: A list of Face3Ds for the merged faces. Any of the
+            input face_3ds that were not merged are included as they are.
+
+        -   face_indices: A list of lists that aligns with the merged_faces. Each
+            sub-list has the indices of the face_3ds that make up the merged face.
+            The merged_faces are sorted by the first index of these sub-lists.
+    """
+    ang_tol = math.radians(angle_tolerance)
+    merged_faces, face_indices = [], []
+    for plane_indices in _coplanar_groups(face_3ds, tolerance, ang_tol):
+        for indices in _connected_groups(face_3ds, plane_indices, tolerance):
+            merged = _join_faces([face_3ds[i] for i in indices], tolerance)
+            if merged is None:  # keep the original faces
+                merged_faces.extend(face_3ds[i] for i in indices)
+                face_indices.extend([i] for i in indices)
+            else:
+                merged_faces.append(merged)
+                face_indices.append(indices)
+    sort_i = sorted(range(len(face_indices)), key=lambda i: face_indices[i][0])
+    return [merged_faces[i] for i in sort_i], [face_indices[i] for i in sort_i]
+
+
+def merge_coplanar_shades(shades, tolerance=0.01, angle_tolerance=1):
+    """Merge adjacent coplanar orphaned Shades into as few Shades as possible.
+
+    Only orphaned Shades with the same transmittance schedule and the same
+    is_detached value are merged together. Each merged Shade has the identifier
+    and the properties of the first Shade that was merged into it. Shades
+    assigned to a parent object are always kept as they are.
+
+    Args:
+        shades: A list of Honeybee Shades to be merged.
+        tolerance: The maximum difference between point values for them to be
+            considered equivalent. (Default: 0.01).
+        angle_tolerance: The max angle difference in degrees that the normals of
+            the shades can differ from one another for them to be considered
+            coplanar. (Default: 1).
+
+    Returns:
+        A list of Honeybee Shades after merging. Shades that were not merged
+        are the original Shade objects.
+    """
+    # group the orphaned shades by their properties
+    shd_groups, group_keys = {}, []
+    for i, shade in enumerate(shades):
+        if shade.has_parent:
+            key = i
+        else:
+            t_sch = shade.properties.energy.transmittance_schedule
+            key = (shade.is_detached, None if t_sch is None else t_sch.identifier)
+        try:
+            shd_groups[key].append(i)
+        except KeyError:
+            shd_groups[key] = [i]
+            group_keys.append(key)
+
+    # merge the shades of each group
+    new_shades = [None] * len(shades)
+    for key in group_keys:
+        indices = shd_groups[key]
+        if len(indices) == 1:
+            new_shades[indices[0]] = shades[indices[0]]
+            continue
+        geos = [shades[i].geometry for i in indices]
+        merged_faces, face_indices = \
+            merge_coplanar_faces(geos, tolerance, angle_tolerance)
+        for merged_face, f_indices in zip(merged_faces, face_indices):
+            shade = shades[indices[f_indices[0]]]
+            if len(f_indices) != 1:
+                shade = _merged_shade(shade, merged_face)
+            new_shades[indices[f_indices[0]]] = shade
+    return [shd for shd in new_shades if shd is not None]
+
+
+def _merged_shade(shade, geometry):
+    """Get a copy of a Shade with a new geometry."""
+    new_shade = Shade(shade.identifier, geometry, shade.is_detached)
+    new_shade._display_name = shade._display_name
+    new_shade._user_data = None if shade.user_data is None \
+        else shade.user_data.copy()
+    new_shade._properties._duplicate_extension_attr(shade._properties)
+    return new_shade
+
+
+def _coplanar_groups(face_3ds, tolerance, angle_tolerance):
+    """Get lists of indices for the face_3ds that are coplanar with one another.
+
+    The faces are first sorted into buckets using their rounded normals and
+    then each face in a bucket is compared to the planes already in that bucket.
+    """
+    buckets, planes, groups = {}, [], []
+    for i, face in enumerate(face_3ds):
+        normal = face.normal
+        key = tuple(int(round(c / angle_tolerance)) for c in normal)
+        bucket = buckets.setdefault(key, [])
+        for group_i in bucket:
+            plane = planes[group_i]
+            if plane.n.angle(normal) <= angle_tolerance and \
+                    all(abs(plane.distance_to_point(pt)) <= tolerance
+                        for pt in face.boundary):
+                groups[group_i].append(i)
+                break
+        else:  # start a new plane
+            bucket.append(len(groups))
+            planes.append(face.plane)
+            groups.append([i])
+    return groups
+
+
+def _connected_groups(face_3ds, indices, tolerance):
+    """Get lists of the indices for faces that are connected through shared edges."""
+    # map each edge of the faces to the faces that use it
+    edge_faces = {}
+    for i in indices:
+        keys = [tuple(int(round(c / tolerance)) for c in pt)
+                for pt in face_3ds[i].boundary]
+        for pt_1, pt_2 in zip(keys, keys[1:] + keys[:1]):
+            edge = (pt_1, pt_2) if pt_1 < pt_2 else (pt_2, pt_1)
+            edge_faces.setdefault(edge, []).append(i)
+
+    # union the faces that share an edge
+    parents = {i: i for i in indices}
+
+    def _root(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for f_indices in edge_faces.values():
+        root_1 = _root(f_indices[0])
+        for i in f_indices[1:]:
+            root_2 = _root(i)
+            if root_1 != root_2:
+                parents[max(root_1, root_2)] = min(root_1, root_2)
+                root_1 = min(root_1, root_2)
+    groups = {}
+    for i in indices:
+        groups.setdefault(_root(i), []).append(i)
+    return [groups[i] for i in sorted(groups)]
+
+
+def _join_faces(faces, tolerance):
+    """Join a list of connected coplanar Face3Ds into a single Face3D.
+
+    The faces are joined by removing the edges that they share with one another
+    and chaining the remaining edges into a boundary. This is much faster than
+    a boolean union for the many faces of a triangulated mesh.
+
+    Will be None if the remaining edges do not form a single boundary (eg. the
+    joined face has holes or the faces only touch along part of an edge) or
+    the joined face does not have the same area as the faces.
+    """
+    if len(faces) == 1:
+        return None
+    # get the edges of the faces that are not shared with another face
+    points, edges = {}, set()
+    for face in faces:
+        keys = []
+        for pt in face.boundary:
+            key = tuple(int(round(c / tolerance)) for c in pt)
+            points.setdefault(key, pt)
+            keys.append(key)
+        for pt_1, pt_2 in zip(keys, keys[1:] + keys[:1]):
+            if pt_1 == pt_2:
+                continue
+            if (pt_2, pt_1) in edges:
+                edges.remove((pt_2, pt_1))
+            elif (pt_1, pt_2) in edges:  # overlapping faces
+                return None
+            else:
+                edges.add((pt_1, pt_2))
+
+    # chain the edges into a single boundary
+    next_pts = {}
+    for pt_1, pt_2 in edges:
+        if pt_1 in next_pts:  # more than one boundary meets at this point
+            return None
+        next_pts[pt_1] = pt_2
+    start = min(next_pts)
+    boundary, key = [points[start]], next_pts[start]
+    while key != start and len(boundary) <= len(edges):
+        boundary.append(points[key])
+        key = next_pts.get(key, start)
+    if len(boundary) != len(edges) or len(boundary) < 3:
+        return None
+
+    # check that the joined face covers the same area as the faces
+    face = Face3D(boundary, faces[0].plane)
+    area = sum(f.area for f in faces)
+    if abs(face.area - area) > tolerance * face.perimeter:
+        return None
+    try:
+        face = face.remove_colinear_vertices(tolerance)
+    except AssertionError:  # degenerate geometry
+        return None
+    return face
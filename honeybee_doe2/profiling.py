@@ -0,0 +1,190 @@
+# coding=utf-8
+"""Instrumentation of the stages of the translation of a Model to INP."""
+from __future__ import division
+import json
+import time
+try:  # tracemalloc is not available in IronPython
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# use the highest resolution clock that is available for timing the stages
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class StageProfiler(object):
+    """Collector of the wall time, object counts and memory of translation stages.
+
+    The profiler is passed to the model_to_inp functions, which mark the start
+    of each stage of the translation (eg. export_view, schedules, levels, rooms).
+    Once a stage ends, an event is recorded with its wall time, the number of
+    objects processed in the stage and, optionally, the peak memory allocated
+    during the stage. When the INP blocks are generated through the
+    profile_blocks method, the time spent by the consumer of the blocks (eg.
+    writing them to a file) is excluded from the stages.
+
+    Args:
+        callback: An optional function that will be called with the dictionary
+            of each stage event as soon as the stage ends. This can be used to
+            report the progress of long translations. (Default: None).
+        trace_memory: Boolean to note whether tracemalloc should be used to
+            record the peak memory allocated during each stage. Note that
+            tracing memory slows down the translation considerably and it is
+            not available in IronPython. (Default: False).
+
+    Properties:
+        * callback
+        * trace_memory
+        * stages
+        * total_time
+    """
+    __slots__ = ('_callback', '_trace_memory', '_stages', '_stage', '_resume',
+                 '_mem_start', '_started_trace')
+
+    def __init__(self, callback=None, trace_memory=False):
+        self._callback = callback
+        self._trace_memory = bool(trace_memory) and tracemalloc is not None
+        self._stages = []
+        self._stage = None  # event of the stage that is currently running
+        self._resume = None  # time at which the current stage last resumed
+        self._mem_start = 0
+        self._started_trace = False
+
+    @property
+    def callback(self):
+        """Get the function that is called with each stage event."""
+        return self._callback
+
+    @property
+    def trace_memory(self):
+        """Get a boolean for whether the peak memory of each stage is recorded."""
+        return self._trace_memory
+
+    @property
+    def stages(self):
+        """Get a list of dictionaries for the events of the completed stages.
+
+        Each dictionary has the following keys.
+
+        * name -- Text for the name of the stage.
+        * time -- A number for the wall time of the stage in seconds.
+        * count -- An integer for the number of objects processed in the stage,
+          which is None when the stage does not process a set of objects.
+        * memory -- An integer for the peak memory allocated during the stage
+          in bytes, which is None when memory is not traced.
+
+        Stages can have additional keys for the values that were recorded
+        with the record method during the stage.
+        """
+        return tuple(self._stages)
+
+    @property
+    def total_time(self):
+        """Get a number for the total wall time of all completed stages in seconds."""
+        return sum(stage['time'] for stage in self._stages)
+
+    def start_stage(self, name, count=None):
+        """Start a new stage of the translation, ending the current stage if any.
+
+        Args:
+            name: Text for the name of the stage.
+            count: An optional integer for the number of objects processed
+                in the stage. (Default: None).
+        """
+        now = _timer()
+        self.end_stage(now)
+        self._stage = {'name': name, 'time': 0, 'count': count, 'memory': None}
+        self._resume = now
+        if self._trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_trace = True
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self._mem_start = tracemalloc.get_traced_memory()[0]
+
+    def end_stage(self, now=None):
+        """End the current stage of the translation and record its event.
+
+        Args:
+            now: An optional number for the time at which the stage ended. If
+                None, the current time will be used. (Default: None).
+        """
+        if self._stage is None:
+            return
+        self._pause(_timer() if now is None else now)
+        if self._trace_memory and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            self._stage['memory'] = max(peak - self._mem_start, 0)
+        event, self._stage = self._stage, None
+        self._stages.append(event)
+        if self._callback is not None:
+            self._callback(event)
+
+    def record(self, key, value):
+        """Record an additional value in the event of the current stage.
+
+        Args:
+            key: Text for the key of the value in the stage event (eg.
+                removed_shades). This should not be one of the standard keys
+                of the event (name, time, count, memory).
+            value: A JSON-serializable value to be recorded for the stage.
+        """
+        if self._stage is not None:
+            self._stage[key] = value
+
+    def profile_blocks(self, blocks):
+        """Get a generator of INP blocks that excludes the consumer from the stages.
+
+        Args:
+            blocks: An iterable of INP blocks, which calls the start_stage
+                method of this profiler as it is generated.
+
+        Returns:
+            A generator of the same INP blocks. The last stage is ended and
+            any memory tracing started by the profiler is stopped once all
+            of the blocks have been generated.
+        """
+        blocks = iter(blocks)
+        while True:
+            self._resume = _timer()
+            block = next(blocks, None)
+            self._pause(_timer())
+            if block is None:
+                break
+            yield block
+        self.end_stage()
+        if self._started_trace:
+            tracemalloc.stop()
+            self._started_trace = False
+
+    def to_dict(self):
+        """Get the stages recorded by the profiler as a dictionary."""
+        return {
+            'type': 'StageProfiler',
+            'total_time': self.total_time,
+            'stages': [dict(stage) for stage in self._stages]
+        }
+
+    def to_json(self, file_path, indent=4):
+        """Write the stages recorded by the profiler to a JSON file.
+
+        Args:
+            file_path: Text for the path to the JSON file.
+            indent: An integer for the indentation of the JSON. (Default: 4).
+        """
+        with open(file_path, 'w') as json_file:
+            json.dump(self.to_dict(), json_file, indent=indent)
+
+    def _pause(self, now):
+        """Add the time since the current stage last resumed to the stage."""
+        if self._stage is not None and self._resume is not None:
+            self._stage['time'] += now - self._resume
+        self._resume = None
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'StageProfiler: [{} stages]'.format(len(self._stages))
@@ -1,7 +1,14 @@
 # coding=utf-8
 """Model DOE-2 Properties."""
+from __future__ import division
+
+from ladybug_geometry.geometry3d import Face3D
 from honeybee.units import parse_distance_string
 
+from ..exportview import ExportView
+from ..grouping import group_rooms_by_doe2_level
+from ..geometry import room_geometry_analysis, level_geometry_stamp
+
 
 class ModelDoe2Properties(object):
     """DOE-2 Properties for Honeybee Model.
@@ -11,6 +18,7 @@ class ModelDoe2Properties(object):
 
     Properties:
         * host
+        * precomputed_levels
     """
     # dictionary mapping validation error codes to a corresponding check function
     ERROR_MAP = {
@@ -20,12 +28,141 @@ class ModelDoe2Properties(object):
     def __init__(self, host):
         """Initialize ModelDoe2Properties."""
         self._host = host
+        self._precomputed_levels = None
 
     @property
     def host(self):
         """Get the Model object hosting these properties."""
         return self._host
 
+    @property
+    def precomputed_levels(self):
+        """Get a tuple of dictionaries for the precomputed DOE-2 levels of the Model.
+
+        This will be None if the precompute method has not been run. Otherwise,
+        each dictionary represents one level and has the following keys.
+
+        * name -- Text for the name of the level.
+        * geometry -- A Face3D for the FLOOR polygon of the level or None if
+          the level is written with NO-SHAPE.
+        * rooms -- A tuple with the identifiers of the Rooms on the level.
+        * geometry_stamp -- Text for a hash of the geometry_stamp of each Room
+          on the level when it was analyzed. The precomputed levels are ignored
+          by the translation to INP once the stamp of any level no longer
+          matches the geometry of its Rooms.
+        """
+        return self._precomputed_levels
+
+    def precompute(self):
+        """Precompute the analysis of the Model geometry that is needed for INP export.
+
+        This includes the assignment of Rooms to DOE-2 levels and the FLOOR
+        polygon of each level, which are stored under the precomputed_levels
+        of these properties. For each Room, it also includes the SPACE polygon,
+        the extrusion classification and the LOCATION of each Face in the SPACE
+        polygon (eg. SPACE-V1, TOP, BOTTOM), which are stored under the
+        precomputed_geometry of the Room DOE-2 properties. All of these results
+        are serialized with the Model such that later translations to INP can
+        skip the analysis of the geometry.
+
+        The results are only used by the translation when they still apply to
+        the Model and its Rooms. They are stamped with the geometry of the Rooms
+        such that they are ignored after any edit to the Room geometry (eg.
+        moving a Room). They are also ignored if Rooms or Faces are added or
+        removed and when core/perimeter zoning is used. So this method should
+        be run again after any edits to the Model geometry.
+        """
+        export_view = ExportView(self.host)
+        model = export_view.model
+        inv_factor = 1 / export_view.scale_factor
+        host_rooms = {room.identifier: room for room in self.host.rooms}
+        room_groups, level_geos, level_names = \
+            group_rooms_by_doe2_level(model.rooms, model.tolerance)
+        levels = []
+        for flr_rooms, flr_geo, flr_name in zip(room_groups, level_geos, level_names):
+            if flr_geo is not None and inv_factor != 1:
+                flr_geo = flr_geo.scale(inv_factor)
+            levels.append({
+                'name': flr_name,
+                'geometry': flr_geo,
+                'rooms': tuple(room.identifier for room in flr_rooms),
+                'geometry_stamp': level_geometry_stamp(flr_rooms)
+            })
+            # analyze each room using the SPACE-HEIGHT of the level
+            rooms_f2c = sorted(room.max.z - room.min.z for room in flr_rooms)
+            floor_height = rooms_f2c[int(len(rooms_f2c) / 2)]
+            for room in flr_rooms:
+                is_extrusion, face_locations, r_geo = \
+                    room_geometry_analysis(room, floor_height, export_view)
+                if r_geo is not None:  # order the polygon from the lower-left corner
+                    r_geo = Face3D(r_geo.lower_left_counter_clockwise_boundary)
+                    if inv_factor != 1:
+                        r_geo = r_geo.scale(inv_factor)
+                host_rooms[room.identifier].properties.doe2.precomputed_geometry = {
+                    'floor_height': floor_height * inv_factor,
+                    'is_extrusion': is_extrusion,
+                    'face_identifiers': [face.identifier for face in room.faces],
+                    'face_locations': face_locations,
+                    'space_polygon': r_geo,
+                    'geometry_stamp': room.properties.doe2.geometry_stamp
+                }
+        self._precomputed_levels = tuple(levels)
+
+    def clear_precomputed(self):
+        """Remove all precomputed geometry from the Model and its Rooms."""
+        self._precomputed_levels = None
+        for room in self.host.rooms:
+            room.properties.doe2.precomputed_geometry = None
+
+    def move(self, moving_vec):
+        """Clear the precomputed levels since they no longer match the Rooms.
+
+        Args:
+            moving_vec: A ladybug_geometry Vector3D with the direction and distance
+                to move the object.
+        """
+        self._precomputed_levels = None
+
+    def rotate(self, axis, angle, origin):
+        """Clear the precomputed levels since they depend on the orientation.
+
+        Args:
+            axis: Rotation axis as a Vector3D.
+            angle: An angle for rotation in degrees.
+            origin: A ladybug_geometry Point3D for the origin around which the
+                object will be rotated.
+        """
+        self._precomputed_levels = None
+
+    def rotate_xy(self, angle, origin):
+        """Clear the precomputed levels since they depend on the orientation.
+
+        Args:
+            angle: An angle in degrees.
+            origin: A ladybug_geometry Point3D for the origin around which the
+                object will be rotated.
+        """
+        self._precomputed_levels = None
+
+    def reflect(self, plane):
+        """Clear the precomputed levels since they depend on the orientation.
+
+        Args:
+            plane: A ladybug_geometry Plane across which the object will
+                be reflected.
+        """
+        self._precomputed_levels = None
+
+    def scale(self, factor, origin=None):
+        """Clear the precomputed levels since they no longer match the Rooms.
+
+        Args:
+            factor: A number representing how much the object should be scaled.
+            origin: A ladybug_geometry Point3D representing the origin from which
+                to scale. If None, it will be scaled from the World origin (0, 0, 0).
+        """
+        self._precomputed_levels = None
+
     def check_for_extension(self, raise_exception=True, detailed=False):
         """Check that the Model is valid for DOE-2 simulation.
 
@@ -177,7 +314,18 @@ class ModelDoe2Properties(object):
 
     def to_dict(self):
         """Return Model DOE-2 properties as a dictionary."""
-        return {'doe2': {'type': 'ModelDoe2Properties'}}
+        base = {'doe2': {'type': 'ModelDoe2Properties'}}
+        if self._precomputed_levels is not None:
+            base['doe2']['precomputed_levels'] = [
+                {
+                    'name': level['name'],
+                    'geometry': level['geometry'].to_dict()
+                    if level['geometry'] is not None else None,
+                    'rooms': list(level['rooms']),
+                    'geometry_stamp': level['geometry_stamp']
+                } for level in self._precomputed_levels
+            ]
+        return base
 
     def apply_properties_from_dict(self, data):
         """Apply the energy properties of a dictionary to the host Model of this object.
@@ -189,6 +337,17 @@ class ModelDoe2Properties(object):
         """
         assert 'doe2' in data['properties'], \
             'Dictionary possesses no ModelDoe2Properties.'
+        levels = data['properties']['doe2'].get('precomputed_levels')
+        if levels is not None:
+            self._precomputed_levels = tuple(
+                {
+                    'name': level['name'],
+                    'geometry': Face3D.from_dict(level['geometry'])
+                    if level['geometry'] is not None else None,
+                    'rooms': tuple(level['rooms']),
+                    'geometry_stamp': level['geometry_stamp']
+                } for level in levels
+            )
         room_doe2_dicts = []
         if 'rooms' in data and data['rooms'] is not None:
             for room_dict in data['rooms']:
@@ -200,6 +359,18 @@ class ModelDoe2Properties(object):
                 if r_dict is not None:
                     room.properties.doe2.apply_properties_from_dict(r_dict)
 
+    def duplicate(self, new_host=None):
+        """Get a copy of this object.
+
+        Args:
+            new_host: A new Model object that hosts these properties.
+                If None, the properties will be duplicated with the same host.
+        """
+        _host = new_host or self._host
+        new_prop = ModelDoe2Properties(_host)
+        new_prop._precomputed_levels = self._precomputed_levels
+        return new_prop
+
     def ToString(self):
         return self.__repr__()
 
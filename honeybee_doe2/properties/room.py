@@ -1,6 +1,7 @@
 # coding=utf-8
 """Room DOE-2 Properties."""
 import math
+import hashlib
 
 from ladybug_geometry.geometry3d import Face3D
 from honeybee.typing import float_in_range, float_positive
@@ -39,6 +40,12 @@ class RoomDoe2Properties(object):
             Specifying a geometry here can help overcome some limitations of
             this auto-calculation, particularly for cases where the floors
             of the Room are composed of AirBoundaries. (Default: None).
+        precomputed_geometry: An optional dictionary with the results of the
+            analysis of the Room geometry for translation to INP, which is
+            typically generated with the precompute method of the Model DOE-2
+            properties. When the results still apply to the Room, they are used
+            in place of the analysis during export to INP. If None, the Room
+            geometry will be analyzed during export. (Default: None).
 
     Properties:
         * host
@@ -48,15 +55,20 @@ class RoomDoe2Properties(object):
         * min_flow_per_area
         * hmax_flow_ratio
         * space_polygon_geometry
+        * precomputed_geometry
+        * geometry_version
+        * geometry_stamp
     """
     __slots__ = (
         '_host', '_assigned_flow', '_flow_per_area', '_min_flow_ratio',
-        '_min_flow_per_area', '_hmax_flow_ratio', '_space_polygon_geometry'
+        '_min_flow_per_area', '_hmax_flow_ratio', '_space_polygon_geometry',
+        '_precomputed_geometry', '_geometry_version', '_boundary_cache'
     )
 
     def __init__(
         self, host, assigned_flow=None, flow_per_area=None, min_flow_ratio=None,
-        min_flow_per_area=None, hmax_flow_ratio=None, space_polygon_geometry=None
+        min_flow_per_area=None, hmax_flow_ratio=None, space_polygon_geometry=None,
+        precomputed_geometry=None
     ):
         """Initialize Room DOE-2 properties."""
         # set the main properties of the Room
@@ -67,6 +79,10 @@ class RoomDoe2Properties(object):
         self.min_flow_per_area = min_flow_per_area
         self.hmax_flow_ratio = hmax_flow_ratio
         self.space_polygon_geometry = space_polygon_geometry
+        self.precomputed_geometry = precomputed_geometry
+        # set the properties used to cache the horizontal boundaries of the Room
+        self._geometry_version = 0
+        self._boundary_cache = {}
 
     @property
     def host(self):
@@ -145,6 +161,147 @@ class RoomDoe2Properties(object):
                 self._floor_geometry = value.flip()
         self._space_polygon_geometry = value
 
+    @property
+    def precomputed_geometry(self):
+        """Get or set a dictionary with the precomputed geometry of the Room for INP.
+
+        The dictionary has the following keys, which are all required.
+
+        * floor_height -- A number for the SPACE-HEIGHT of the parent story that
+          was used in the analysis or None if no height was used.
+        * is_extrusion -- A boolean for whether the Room is an extrusion that
+          can be written without a POLYGON for each Face.
+        * face_identifiers -- A tuple with the identifiers of the Room Faces
+          that were analyzed.
+        * face_locations -- A tuple that aligns with the face_identifiers and
+          contains the LOCATION of each Face in the SPACE polygon (eg. SPACE-V1,
+          TOP, BOTTOM) or None if the Face is written with its own POLYGON.
+        * space_polygon -- A Face3D for the SPACE polygon of the Room or None
+          if the Room is written with NO-SHAPE. The boundary of the Face3D
+          must start from its lower-left corner and be counterclockwise such
+          that it matches the SPACE-Vn of the face_locations.
+        * geometry_stamp -- Text for the geometry_stamp of the Room that was
+          analyzed, which is the Room prepared for INP (eg. converted to Feet).
+          The precomputed geometry is ignored by the translation to INP once
+          the stamp no longer matches the geometry of the prepared Room.
+        """
+        return self._precomputed_geometry
+
+    @precomputed_geometry.setter
+    def precomputed_geometry(self, value):
+        if value is not None:
+            assert isinstance(value, dict), 'Expected dictionary for Room ' \
+                'precomputed_geometry. Got {}.'.format(type(value))
+            spg = value['space_polygon']
+            assert spg is None or isinstance(spg, Face3D), \
+                'Expected ladybug_geometry Face3D. Got {}'.format(type(spg))
+            assert len(value['face_identifiers']) == len(value['face_locations']), \
+                'The precomputed face_identifiers and face_locations do not align.'
+            value = {
+                'floor_height': value['floor_height'],
+                'is_extrusion': bool(value['is_extrusion']),
+                'face_identifiers': tuple(value['face_identifiers']),
+                'face_locations': tuple(value['face_locations']),
+                'space_polygon': spg,
+                'geometry_stamp': value['geometry_stamp']
+            }
+        self._precomputed_geometry = value
+
+    @property
+    def geometry_version(self):
+        """Get an integer that increases each time the host Room is transformed.
+
+        The version is used along with the Face geometries of the host Room to
+        determine whether the cached horizontal boundaries are still valid.
+        """
+        return self._geometry_version
+
+    @property
+    def geometry_stamp(self):
+        """Get text for a hash of the vertices of the Faces of the host Room.
+
+        The stamp changes whenever the geometry of the Room changes (eg. when
+        the Room is moved) and it is stored with the precomputed_geometry in
+        order to check whether the precomputed geometry still applies to the
+        Room. Each loop of vertices starts from its lowest vertex such that the
+        stamp does not change when the Room is serialized and re-loaded. It is
+        cached as long as the geometry of the Room does not change.
+        """
+        try:
+            return self._cached_boundary('geometry_stamp')
+        except KeyError:  # stamp not yet computed for the current geometry
+            loops = []
+            for face in self.host.faces:
+                geo = face.geometry
+                for loop in (geo.boundary,) + (geo.holes or ()):
+                    pts = [(pt.x, pt.y, pt.z) for pt in loop]
+                    st_i = pts.index(min(pts))
+                    loops.append(';'.join(
+                        '%.6f,%.6f,%.6f' % pt for pt in pts[st_i:] + pts[:st_i]))
+            stamp = hashlib.sha256('|'.join(loops).encode('utf-8')).hexdigest()
+            self._boundary_cache['geometry_stamp'] = stamp
+            return stamp
+
+    def horizontal_boundary(self, match_walls=False, tolerance=0.01):
+        """Get a Face3D for the horizontal boundary around the host Room.
+
+        The result is the same as the horizontal_boundary method of the host
+        Room but it is cached such that it is only computed once for each
+        tolerance as long as the geometry of the Room does not change.
+
+        Args:
+            match_walls: Boolean to note whether vertices should be inserted into
+                the final Face3D that will help match the segments of the result
+                back to the walls that are adjacent to the floors. (Default: False).
+            tolerance: The minimum difference between x, y, and z coordinate values
+                at which points are considered distinct. (Default: 0.01,
+                suitable for objects in Meters).
+        """
+        key = ('horizontal_boundary', match_walls, tolerance)
+        try:
+            return self._cached_boundary(key)
+        except KeyError:  # boundary not yet computed for the current geometry
+            if match_walls:  # insert the wall vertices into the base boundary
+                base_bound = self.horizontal_boundary(False, tolerance)
+                bound = self.host._match_walls_to_horizontal_faces(
+                    [base_bound], tolerance)[0]
+            else:
+                bound = self.host.horizontal_boundary(False, tolerance)
+            self._boundary_cache[key] = bound
+            return bound
+
+    def horizontal_floor_boundaries(self, match_walls=False, tolerance=0.01):
+        """Get a list of horizontal Face3D for the boundaries around the Room's Floors.
+
+        The result is the same as the horizontal_floor_boundaries method of the
+        host Room but it is cached such that it is only computed once for each
+        tolerance as long as the geometry of the Room does not change.
+
+        Args:
+            match_walls: Boolean to note whether vertices should be inserted into
+                the final Face3Ds that will help match the segments of the result
+                back to the walls that are adjacent to the floors. (Default: False).
+            tolerance: The minimum difference between x, y, and z coordinate values
+                at which points are considered distinct. (Default: 0.01,
+                suitable for objects in Meters).
+        """
+        key = ('horizontal_floor_boundaries', match_walls, tolerance)
+        try:
+            return list(self._cached_boundary(key))
+        except KeyError:  # boundaries not yet computed for the current geometry
+            bounds = tuple(self.host.horizontal_floor_boundaries(match_walls, tolerance))
+            self._boundary_cache[key] = bounds
+            return list(bounds)
+
+    def reset_boundary_cache(self):
+        """Clear the cached horizontal boundaries and increase the geometry_version.
+
+        This is called whenever the host Room is transformed and it should be
+        called if the geometry of the host Room is edited in place.
+        """
+        self._geometry_version += 1
+        self._boundary_cache = {}
+
     def move(self, moving_vec):
         """Move this object along a vector.
 
@@ -152,8 +309,10 @@ class RoomDoe2Properties(object):
             moving_vec: A ladybug_geometry Vector3D with the direction and distance
                 to move the object.
         """
+        self.reset_boundary_cache()
         if self.space_polygon_geometry is not None:
             self._space_polygon_geometry = self.space_polygon_geometry.move(moving_vec)
+        self._precomputed_geometry = None  # no longer matches the geometry_stamp
 
     def rotate(self, angle, axis, origin):
         """Rotate this object by a certain angle around an axis and origin.
@@ -164,9 +323,11 @@ class RoomDoe2Properties(object):
             origin: A ladybug_geometry Point3D for the origin around which the
                 object will be rotated.
         """
+        self.reset_boundary_cache()
         if self.space_polygon_geometry is not None:
             self._space_polygon_geometry = \
                 self.space_polygon_geometry.rotate(math.radians(angle), axis, origin)
+        self._precomputed_geometry = None  # face locations depend on orientation
 
     def rotate_xy(self, angle, origin):
         """Rotate this object counterclockwise in the world XY plane by a certain angle.
@@ -176,9 +337,11 @@ class RoomDoe2Properties(object):
             origin: A ladybug_geometry Point3D for the origin around which the
                 object will be rotated.
         """
+        self.reset_boundary_cache()
         if self.space_polygon_geometry is not None:
             self._space_polygon_geometry = \
                 self.space_polygon_geometry.rotate_xy(math.radians(angle), origin)
+        self._precomputed_geometry = None  # face locations depend on orientation
 
     def reflect(self, plane):
         """Reflect this object across a plane.
@@ -187,8 +350,10 @@ class RoomDoe2Properties(object):
             plane: A ladybug_geometry Plane across which the object will
                 be reflected.
         """
+        self.reset_boundary_cache()
         if self.space_polygon_geometry is not None:
             self._space_polygon_geometry = self.space_polygon_geometry.reflect(plane)
+        self._precomputed_geometry = None  # face locations depend on orientation
 
     def scale(self, factor, origin=None):
         """Scale this object by a factor from an origin point.
@@ -198,9 +363,30 @@ class RoomDoe2Properties(object):
             origin: A ladybug_geometry Point3D representing the origin from which
                 to scale. If None, it will be scaled from the World origin (0, 0, 0).
         """
+        self.reset_boundary_cache()
         if self.space_polygon_geometry is not None:
             self._space_polygon_geometry = \
                 self.space_polygon_geometry.scale(factor, origin)
+        # the precomputed geometry is scaled since it was stamped with the Room
+        # in Feet, which lets it apply to the scaled copies of an ExportView
+        pre_geo = self._precomputed_geometry
+        if pre_geo is not None:
+            pre_geo = dict(pre_geo)
+            if pre_geo['floor_height'] is not None:
+                pre_geo['floor_height'] = pre_geo['floor_height'] * factor
+            if pre_geo['space_polygon'] is not None:
+                pre_geo['space_polygon'] = pre_geo['space_polygon'].scale(factor, origin)
+            self._precomputed_geometry = pre_geo
+
+    def _cached_boundary(self, key):
+        """Get a cached horizontal boundary, raising a KeyError if it is not valid."""
+        face_geos = tuple(face.geometry for face in self.host.faces)
+        stamp = self._boundary_cache.get('stamp')
+        if stamp is None or stamp[0] != self._geometry_version or \
+                len(stamp[1]) != len(face_geos) or \
+                not all(g1 is g2 for g1, g2 in zip(stamp[1], face_geos)):
+            self._boundary_cache = {'stamp': (self._geometry_version, face_geos)}
+        return self._boundary_cache[key]
 
     def check_no_holes(self, raise_exception=True, detailed=False):
         """Check whether the Room's geometry has holes.
@@ -273,7 +459,8 @@ class RoomDoe2Properties(object):
             "min_flow_ratio": 0.3, # number between 0 and 1
             "min_flow_per_area": 0.3, # number in cfm/ft2
             "hmax_flow_ratio": 0.3,  # number between 0 and 1
-            "space_polygon_geometry": {}  # optional Face3D dictionary
+            "space_polygon_geometry": {},  # optional Face3D dictionary
+            "precomputed_geometry": {}  # optional dictionary of precomputed geometry
             }
         """
         assert data['type'] == 'RoomDoe2Properties', \
@@ -294,6 +481,9 @@ class RoomDoe2Properties(object):
                 data['space_polygon_geometry'] is not None:
             new_prop.space_polygon_geometry = \
                 Face3D.from_dict(data['space_polygon_geometry'])
+        if 'precomputed_geometry' in data and data['precomputed_geometry'] is not None:
+            new_prop.precomputed_geometry = \
+                cls._precomputed_geometry_from_dict(data['precomputed_geometry'])
         return new_prop
 
     def apply_properties_from_dict(self, data):
@@ -317,6 +507,9 @@ class RoomDoe2Properties(object):
                 data['space_polygon_geometry'] is not None:
             self.space_polygon_geometry = \
                 Face3D.from_dict(data['space_polygon_geometry'])
+        if 'precomputed_geometry' in data and data['precomputed_geometry'] is not None:
+            self.precomputed_geometry = \
+                self._precomputed_geometry_from_dict(data['precomputed_geometry'])
 
     def apply_properties_from_user_data(self):
         """Apply properties from a the user_data assigned to the host room.
@@ -364,6 +557,19 @@ class RoomDoe2Properties(object):
         if self.space_polygon_geometry is not None:
             base['doe2']['space_polygon_geometry'] = \
                 self.space_polygon_geometry.to_dict()
+        pre_geo = self._precomputed_geometry
+        if pre_geo is not None:
+            pre_dict = {
+                'floor_height': pre_geo['floor_height'],
+                'is_extrusion': pre_geo['is_extrusion'],
+                'face_identifiers': list(pre_geo['face_identifiers']),
+                'face_locations': list(pre_geo['face_locations']),
+                'space_polygon': None,
+                'geometry_stamp': pre_geo['geometry_stamp']
+            }
+            if pre_geo['space_polygon'] is not None:
+                pre_dict['space_polygon'] = pre_geo['space_polygon'].to_dict()
+            base['doe2']['precomputed_geometry'] = pre_dict
         return base
 
     def to_inp(self):
@@ -398,9 +604,18 @@ class RoomDoe2Properties(object):
         _host = new_host or self._host
         new_room = RoomDoe2Properties(
             _host, self.assigned_flow, self.flow_per_area, self.min_flow_ratio,
-            self.min_flow_per_area, self.hmax_flow_ratio, self.space_polygon_geometry)
+            self.min_flow_per_area, self.hmax_flow_ratio, self.space_polygon_geometry,
+            self._precomputed_geometry)
         return new_room
 
+    @staticmethod
+    def _precomputed_geometry_from_dict(data):
+        """Get a precomputed_geometry dictionary from its dictionary representation."""
+        pre_geo = dict(data)
+        if pre_geo.get('space_polygon') is not None:
+            pre_geo['space_polygon'] = Face3D.from_dict(pre_geo['space_polygon'])
+        return pre_geo
+
     def ToString(self):
         return self.__repr__()
 
@@ -19,7 +19,8 @@ from honeybee.boundarycondition import Outdoors, Ground
 from honeybee.typing import clean_string
 
 from .config import DOE2_ANGLE_TOL, DOE2_TOLERANCE
-from .util import clean_inp_file_contents, doe2_object_blocks, parse_inp_string
+from .util import clean_inp_file_contents, doe2_object_blocks, parse_inp_string, \
+    open_inp_file
 
 _CMD_TO_BC = {
     'EXTERIOR-WALL':   Outdoors,
@@ -33,13 +34,14 @@ def model_from_inp_file(inp_file):
     """Convert an inp file to an HBJSON Model object
 
     Args:
-        inp_file: A text string for the path to an INP file.
+        inp_file: A text string for the path to an INP file. The file may
+            be compressed with gzip or zstd.
 
     Returns:
         A honeybee Model object.
     """
     assert os.path.isfile(inp_file), 'No file was found at: {}'.format(inp_file)
-    with open(inp_file, 'r') as doe_file:
+    with open_inp_file(inp_file) as doe_file:
         inp_content = doe_file.read()
     return model_from_inp(inp_content)
 
@@ -3,6 +3,7 @@
 from __future__ import division
 import os
 import re
+from collections import OrderedDict
 
 from ladybug.dt import Date, MONTHNAMES
 from ladybug.analysisperiod import AnalysisPeriod
@@ -14,7 +15,7 @@ from honeybee_energy.lib.scheduletypelimits import fractional, on_off, temperatu
 
 from .config import RES_CHARS
 from .util import generate_inp_string, generate_inp_string_list_format, \
-    clean_inp_file_contents, parse_inp_string
+    clean_inp_file_contents, parse_inp_string, open_inp_file
 
 
 """____________TRANSLATORS FROM HONEYBEE TO INP____________"""
@@ -221,11 +222,13 @@ def schedule_ruleset_to_inp(schedule):
             rules_on_doy = tuple(i for i, rule in enumerate(schedule._schedule_rules)
                                  if rule.does_rule_apply_doy(doy))
             rules_each_day.append(rules_on_doy)
-        unique_rule_sets = set(rules_each_day)
+        # unique items are kept in order such that the week schedules are always
+        # written the same way for the same schedule
+        unique_rule_sets = list(OrderedDict.fromkeys(rules_each_day))
         # check if any combination yield the same week schedule and remove duplicates
         week_tuples = [tuple(_get_week_list(schedule, rule_set))
                        for rule_set in unique_rule_sets]
-        unique_week_tuples = list(set(week_tuples))
+        unique_week_tuples = list(OrderedDict.fromkeys(week_tuples))
         # create the unique week schedules from the combinations of rules
         week_sched_ids = []
         for i, week_list in enumerate(unique_week_tuples):
@@ -602,7 +605,8 @@ def extract_all_schedule_ruleset_from_inp_file(inp_file):
         inp_file: A path to an INP file containing objects for SCHEDULE
             (or SCHEDULE-PD) and corresponding WEEK-SCHEDULE-PD and DAY-SCHEDULE
             (or DAY-SCHEDULE-PD) objects. The SCHEDULE will be used to assemble
-            all of these into a ScheduleRuleset.
+            all of these into a ScheduleRuleset. The file may be compressed
+            with gzip or zstd.
 
     Returns:
         schedules -- A list of all Schedule objects in the INP file as
@@ -610,7 +614,7 @@ def extract_all_schedule_ruleset_from_inp_file(inp_file):
     """
     # read the file and remove lines of comments
     assert os.path.isfile(inp_file), 'Cannot find an INP file at: {}'.format(inp_file)
-    with open(inp_file, 'r') as doe_file:
+    with open_inp_file(inp_file) as doe_file:
         inp_content = doe_file.read()
     file_contents = clean_inp_file_contents(inp_content)
     # extract all of the DAY-SCHEDULE objects
@@ -0,0 +1,290 @@
+# coding=utf-8
+"""Methods for simplifying polygons that exceed the DOE-2 vertex limit."""
+from __future__ import division
+import math
+import heapq
+
+# distance below which a vertex is removed in any direction as it is colinear
+_COLINEAR_TOL = 1e-9
+SIMPLIFY_DIRECTIONS = ('Any', 'Inward', 'Outward')
+
+
+def simplify_polygon(vertices, max_count, tolerance=0.01, direction='Any'):
+    """Simplify a polygon to have no more than a maximum number of vertices.
+
+    The Visvalingam-Whyatt algorithm is used, which repeatedly removes the
+    vertex that forms the smallest triangle with its two neighbors. This
+    removes the vertices that contribute the least to the area and perimeter
+    of the polygon first. Vertices continue to be removed after the polygon
+    has max_count vertices for as long as the removed vertex lies within the
+    tolerance of the line between its neighbors. The first vertex is never
+    removed since it is typically the origin of the DOE-2 POLYGON.
+
+    Vertices are never removed when this would make the polygon self-intersect,
+    which can happen for concave polygons. So the result can have more than
+    max_count vertices in the rare case that no other vertex can be removed.
+
+    Args:
+        vertices: A list of (x, y) tuples for the vertices of the polygon.
+        max_count: An integer for the maximum number of vertices in the result.
+        tolerance: The maximum distance between a vertex and the line between
+            its neighbors at which point the vertex is considered colinear
+            and can be removed even when the polygon has fewer than max_count
+            vertices. (Default: 0.01).
+        direction: Text for the direction in which the boundary of the polygon
+            can move as it is simplified. Choose from the following.
+
+            * Any - Vertices are removed in whichever direction changes the
+              area of the polygon the least.
+            * Inward - Only convex vertices are removed such that the simplified
+              polygon lies inside the original polygon. This always reaches
+              max_count since every polygon has a convex vertex that can be removed.
+            * Outward - Concave vertices are removed and pairs of convex
+              vertices are replaced with the intersection of the lines of
+              their outer edges such that the simplified polygon contains
+              the original polygon.
+
+            (Default: Any).
+
+    Returns:
+        A tuple with three elements.
+
+        -   vertices: A list of (x, y) tuples for the vertices of the
+            simplified polygon.
+
+        -   deviation: A number for the maximum distance between the vertices
+            of the original polygon and the boundary of the simplified polygon.
+
+        -   area_change: A number for the fractional change in the area of the
+            polygon (eg. 0.01 means that the area increased by 1%).
+    """
+    assert direction in SIMPLIFY_DIRECTIONS, 'Polygon simplification direction ' \
+        '"{}" is not recognized. Choose from: {}.'.format(
+            direction, ', '.join(SIMPLIFY_DIRECTIONS))
+    count = len(vertices)
+    if count <= 3 or count <= max_count:
+        return list(vertices), 0, 0
+    assert max_count >= 3, 'Polygon max_count must be at least 3. ' \
+        'Got {}.'.format(max_count)
+
+    # set up a linked list of the vertices and a heap of their simplification steps
+    pts = list(vertices)
+    orient = 1 if _polygon_area(pts) >= 0 else -1
+    prev_i = [(i - 1) % count for i in range(count)]
+    next_i = [(i + 1) % count for i in range(count)]
+    removed = [False] * count
+    heap = []
+    for i in range(1, count):
+        _push_step(heap, pts, prev_i, next_i, i, orient, direction)
+    heapq.heapify(heap)
+
+    # simplify the vertices with the smallest triangles
+    remaining, blocked, progressed = count, [], False
+    while remaining > 3:
+        if not heap:  # retry the blocked vertices if others have since been removed
+            if not progressed:
+                break
+            for j in blocked:
+                if not removed[j]:
+                    _push_step(heap, pts, prev_i, next_i, j, orient, direction)
+            blocked, progressed = [], False
+            continue
+        area, i = heapq.heappop(heap)
+        if removed[i]:
+            continue
+        step = _simplify_step(pts, prev_i, next_i, i, orient, direction)
+        if step is None or area != step[0]:
+            continue  # outdated entry in the heap
+        _, height, new_pt = step
+        if remaining <= max_count and height > tolerance:
+            break
+        if (new_pt is None and _removal_intersects(pts, prev_i, next_i, i)) or \
+                (new_pt is not None and
+                 _collapse_intersects(pts, prev_i, next_i, i, new_pt)):
+            blocked.append(i)
+            continue
+        if new_pt is None:  # remove the vertex
+            rem_i, base_i = i, prev_i[i]
+        else:  # move the vertex and remove the next vertex
+            rem_i, base_i = next_i[i], i
+            pts[i] = new_pt
+        removed[rem_i], progressed = True, True
+        remaining -= 1
+        p_i, n_i = prev_i[rem_i], next_i[rem_i]
+        next_i[p_i], prev_i[n_i] = n_i, p_i
+        update_i = [prev_i[prev_i[base_i]], prev_i[base_i], base_i]
+        update_i.extend((next_i[base_i], next_i[next_i[base_i]]))
+        for j in set(update_i):
+            _push_step(heap, pts, prev_i, next_i, j, orient, direction)
+    new_verts = [pts[i] for i in range(count) if not removed[i]]
+
+    # evaluate how much the simplified polygon deviates from the original
+    segs = list(zip(new_verts, new_verts[1:] + new_verts[:1]))
+    deviation = max(min(_distance_to_segment(pt, seg) for seg in segs)
+                    for pt in vertices)
+    orig_area = _polygon_area(vertices)
+    area_change = (_polygon_area(new_verts) - orig_area) / orig_area \
+        if orig_area != 0 else 0
+    return new_verts, deviation, area_change
+
+
+def _simplify_step(pts, prev_i, next_i, i, orient, direction):
+    """Get the next step to simplify a polygon at a given vertex.
+
+    Returns:
+        None if the vertex cannot be simplified in the direction. Otherwise,
+        a tuple with the area that the step adds or removes, the distance
+        that the boundary moves and a new (x, y) point for the vertex. The new
+        point is None if the vertex is removed. Otherwise, the vertex is moved
+        to the new point and the next vertex is removed.
+    """
+    if i == 0:  # the first vertex is never simplified
+        return None
+    p_i, n_i = prev_i[i], next_i[i]
+    area = _triangle_area(pts, p_i, i, n_i)
+    height = _triangle_height(pts, p_i, i, n_i)
+    turn = orient * _cross(pts[p_i], pts[i], pts[n_i])  # positive for convex vertices
+    if direction == 'Any' or height <= _COLINEAR_TOL or \
+            (direction == 'Inward' and turn > 0) or \
+            (direction == 'Outward' and turn < 0):
+        return area, height, None
+    if direction == 'Inward':
+        return None
+    # replace the convex vertex and the next one with the intersection of their edges
+    nn_i = next_i[n_i]
+    if n_i == 0 or nn_i == p_i:
+        return None
+    new_pt = _edge_intersection(pts[p_i], pts[i], pts[nn_i], pts[n_i])
+    if new_pt is None:
+        return None
+    area = abs(_cross(pts[i], new_pt, pts[n_i])) / 2
+    (x_1, y_1), (x_2, y_2) = pts[i], pts[n_i]
+    base = math.sqrt((x_2 - x_1) ** 2 + (y_2 - y_1) ** 2)
+    height = 2 * area / base if base != 0 else 0
+    return area, height, new_pt
+
+
+def _push_step(heap, pts, prev_i, next_i, i, orient, direction):
+    """Add the next simplification step of a vertex to a heap of steps."""
+    step = _simplify_step(pts, prev_i, next_i, i, orient, direction)
+    if step is not None:
+        heapq.heappush(heap, (step[0], i))
+
+
+def _cross(pt_1, pt_2, pt_3):
+    """Get the cross product of the two edges that meet at the middle of three points.
+    """
+    (x_1, y_1), (x_2, y_2), (x_3, y_3) = pt_1, pt_2, pt_3
+    return (x_2 - x_1) * (y_3 - y_1) - (x_3 - x_1) * (y_2 - y_1)
+
+
+def _edge_intersection(start_1, end_1, start_2, end_2):
+    """Get the point where two edges meet when they are extended past their ends.
+
+    None is returned if the edges are parallel or if they only meet when they
+    are extended past their starts.
+    """
+    (x_1, y_1), (x_2, y_2) = start_1, end_1
+    (x_3, y_3), (x_4, y_4) = start_2, end_2
+    d_x1, d_y1, d_x2, d_y2 = x_2 - x_1, y_2 - y_1, x_4 - x_3, y_4 - y_3
+    denom = d_x1 * d_y2 - d_y1 * d_x2
+    if denom == 0:
+        return None
+    t_1 = ((x_3 - x_1) * d_y2 - (y_3 - y_1) * d_x2) / denom
+    t_2 = ((x_3 - x_1) * d_y1 - (y_3 - y_1) * d_x1) / denom
+    if t_1 < 1 or t_2 < 1:
+        return None
+    return (x_1 + t_1 * d_x1, y_1 + t_1 * d_y1)
+
+
+def _triangle_area(vertices, i_1, i_2, i_3):
+    """Get the area of the triangle formed by three vertices of a polygon."""
+    return abs(_cross(vertices[i_1], vertices[i_2], vertices[i_3])) / 2
+
+
+def _in_triangle(point, pt_1, pt_2, pt_3):
+    """Check whether an (x, y) point lies inside or on the edge of a triangle."""
+    x, y = point
+    (x_1, y_1), (x_2, y_2), (x_3, y_3) = pt_1, pt_2, pt_3
+    if not (min(x_1, x_2, x_3) <= x <= max(x_1, x_2, x_3) and
+            min(y_1, y_2, y_3) <= y <= max(y_1, y_2, y_3)):
+        return False
+    d_1 = (x_2 - x_1) * (y - y_1) - (y_2 - y_1) * (x - x_1)
+    d_2 = (x_3 - x_2) * (y - y_2) - (y_3 - y_2) * (x - x_2)
+    d_3 = (x_1 - x_3) * (y - y_3) - (y_1 - y_3) * (x - x_3)
+    return (d_1 >= 0 and d_2 >= 0 and d_3 >= 0) or \
+        (d_1 <= 0 and d_2 <= 0 and d_3 <= 0)
+
+
+def _removal_intersects(vertices, prev_i, next_i, i):
+    """Check whether removing a vertex would make a simple polygon self-intersect.
+
+    The edge that replaces the two edges of the vertex only crosses the other
+    edges of the polygon if one of the other vertices lies within the triangle
+    formed by the vertex and its neighbors.
+    """
+    p_i, n_i = prev_i[i], next_i[i]
+    pt_1, pt_2, pt_3 = vertices[p_i], vertices[i], vertices[n_i]
+    j = next_i[n_i]
+    while j != p_i:
+        if _in_triangle(vertices[j], pt_1, pt_2, pt_3):
+            return True
+        j = next_i[j]
+    return False
+
+
+def _collapse_intersects(vertices, prev_i, next_i, i, new_pt):
+    """Check whether moving a vertex to a new point and removing the next vertex
+    would make a simple polygon self-intersect.
+
+    The triangle between the vertex, the new point and the next vertex is added
+    to the polygon. So the polygon self-intersects if any other vertex lies
+    within this triangle or if any other edge crosses its two new sides.
+    """
+    n_i = next_i[i]
+    pt_1, pt_3 = vertices[i], vertices[n_i]
+    j = next_i[n_i]
+    while j != i:
+        pt, next_pt = vertices[j], vertices[next_i[j]]
+        if (j != next_i[n_i] and _in_triangle(pt, pt_1, new_pt, pt_3)) or \
+                _segments_cross(pt, next_pt, pt_1, new_pt) or \
+                _segments_cross(pt, next_pt, new_pt, pt_3):
+            return True
+        j = next_i[j]
+    return False
+
+
+def _segments_cross(pt_1, pt_2, pt_3, pt_4):
+    """Check whether two segments cross one another away from their end points."""
+    d_1, d_2 = _cross(pt_3, pt_4, pt_1), _cross(pt_3, pt_4, pt_2)
+    d_3, d_4 = _cross(pt_1, pt_2, pt_3), _cross(pt_1, pt_2, pt_4)
+    return ((d_1 > 0 > d_2) or (d_1 < 0 < d_2)) and \
+        ((d_3 > 0 > d_4) or (d_3 < 0 < d_4))
+
+
+def _triangle_height(vertices, i_1, i_2, i_3):
+    """Get the distance between a vertex and the line between its neighbors."""
+    (x_1, y_1), (x_3, y_3) = vertices[i_1], vertices[i_3]
+    base = math.sqrt((x_3 - x_1) ** 2 + (y_3 - y_1) ** 2)
+    if base == 0:
+        x_2, y_2 = vertices[i_2]
+        return math.sqrt((x_2 - x_1) ** 2 + (y_2 - y_1) ** 2)
+    return 2 * _triangle_area(vertices, i_1, i_2, i_3) / base
+
+
+def _distance_to_segment(point, segment):
+    """Get the distance between an (x, y) point and a segment of two points."""
+    (x, y), ((x_1, y_1), (x_2, y_2)) = point, segment
+    d_x, d_y = x_2 - x_1, y_2 - y_1
+    seg_len = d_x ** 2 + d_y ** 2
+    t = 0 if seg_len == 0 else \
+        max(0, min(1, ((x - x_1) * d_x + (y - y_1) * d_y) / seg_len))
+    return math.sqrt((x - x_1 - t * d_x) ** 2 + (y - y_1 - t * d_y) ** 2)
+
+
+def _polygon_area(vertices):
+    """Get the signed area of a polygon from a list of (x, y) tuples."""
+    area = 0
+    for (x_1, y_1), (x_2, y_2) in zip(vertices, vertices[1:] + vertices[:1]):
+        area += x_1 * y_2 - x_2 * y_1
+    return area / 2
@@ -0,0 +1,92 @@
+# coding=utf-8
+"""Temporary on-disk storage of INP blocks for memory-bounded translation."""
+import os
+import json
+import tempfile
+
+
+class InpBlockSpool(object):
+    """Temporary file that stores INP blocks in place of a list in memory.
+
+    Blocks are appended to the end of the file as they are produced and they
+    can be iterated over in the order that they were added. Each block is
+    written as one line of JSON such that blocks with several lines of text
+    can be read back exactly as they were written. This allows large sections
+    of the INP to be built in order without holding them in memory.
+
+    The temporary file is deleted when the spool is closed or garbage collected.
+
+    Args:
+        folder: Optional path to a folder in which the temporary file will be
+            written. If None, the default temporary folder of the operating
+            system is used. (Default: None).
+
+    Properties:
+        * file_path
+        * closed
+    """
+    __slots__ = ('_file', '_count')
+
+    def __init__(self, folder=None):
+        self._file = tempfile.NamedTemporaryFile(
+            'w', suffix='.spool', dir=folder, delete=False)
+        self._count = 0
+
+    @property
+    def file_path(self):
+        """Get the path to the temporary file in which the blocks are stored."""
+        return self._file.name
+
+    @property
+    def closed(self):
+        """Get a boolean for whether the spool has been closed."""
+        return self._file.closed
+
+    def append(self, block):
+        """Add an INP block to the end of the spool.
+
+        Args:
+            block: A text string for the INP block.
+        """
+        self._file.write(json.dumps(block))
+        self._file.write('\n')
+        self._count += 1
+
+    def extend(self, blocks):
+        """Add several INP blocks to the end of the spool.
+
+        Args:
+            blocks: An iterable of text strings for the INP blocks.
+        """
+        for block in blocks:
+            self.append(block)
+
+    def close(self):
+        """Close the spool and delete its temporary file."""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.isfile(self._file.name):
+            os.remove(self._file.name)
+
+    def __iter__(self):
+        assert not self._file.closed, 'Cannot iterate over a closed InpBlockSpool.'
+        self._file.flush()
+        with open(self._file.name) as spool_file:
+            for line in spool_file:
+                yield json.loads(line)
+
+    def __len__(self):
+        return self._count
+
+    def __del__(self):
+        try:
+            self.close()
+        except (AttributeError, OSError):  # interpreter shutting down
+            pass
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'InpBlockSpool: [{} blocks]'.format(self._count)
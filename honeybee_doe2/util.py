@@ -3,7 +3,31 @@
 from __future__ import division
 
 import os
+import io
 import re
+import gzip
+import hashlib
+
+# the comment headers that start each section of the INP for inp_section_hashes
+SECTION_HEADERS = {
+    'Day Schedules': 'schedules',
+    'Week Schedules': 'schedules',
+    'Annual Schedules': 'schedules',
+    'Materials / Layers / Constructions': 'constructions',
+    'Glass Types': 'constructions',
+    'Door Construction': 'constructions',
+    'Polygons': 'geometry',
+    'Wall Parameters': 'geometry',
+    'Fixed and Building Shades': 'geometry',
+    'Floors / Spaces / Walls / Windows / Doors': 'geometry',
+    'HVAC Systems / Zones': 'zones'
+}
+
+# the file extensions and leading bytes of compressed INP files for open_inp_file
+GZIP_EXTENSIONS = ('.gz', '.gzip')
+ZSTD_EXTENSIONS = ('.zst', '.zstd')
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
 
 
 def generate_inp_string(u_name, command, keywords, values):
@@ -342,6 +366,117 @@ def header_comment_major(header_text):
         '\n'.format(header_text)
 
 
+def inp_section_hashes(inp_file_contents):
+    """Get a hash of the contents of each section of an INP file.
+
+    This is useful for checking whether the sections of an INP written from
+    a Model have changed since a previous export without comparing the full
+    INP files (eg. to skip re-simulating an unchanged model). The sections are
+    identified by the comment headers that the INP writer uses and the line
+    endings of the INP do not affect the hashes.
+
+    Note that the INP writer functions can compute the same hashes as they
+    write the INP using their section_hashes argument, which avoids reading
+    the INP again. This function is a convenience for INP files that have
+    already been written.
+
+    Args:
+        inp_file_contents: A string of the INP file contents.
+
+    Returns:
+        A dictionary with the following keys and SHA-256 hex digests of the
+        contents of each section as values.
+
+        -   schedules: The DAY-SCHEDULEs, WEEK-SCHEDULEs and SCHEDULEs.
+
+        -   constructions: The MATERIALs, CONSTRUCTIONs, GLASS-TYPEs and
+            door CONSTRUCTIONs.
+
+        -   geometry: The POLYGONs, FIXED-SHADEs, FLOORs, SPACEs, walls,
+            WINDOWs and DOORs.
+
+        -   zones: The SYSTEMs and ZONEs.
+
+        -   other: Everything else, including the simulation parameters.
+    """
+    hasher = InpSectionHasher()
+    hasher.update(inp_file_contents)
+    return hasher.hexdigests()
+
+
+class InpSectionHasher(object):
+    """Hash the sections of an INP incrementally as its text is generated.
+
+    The text can be passed to the update method in chunks of any size and the
+    resulting hashes are the same as those of inp_section_hashes for the
+    concatenated text.
+
+    Properties:
+        * section
+    """
+    __slots__ = ('_hashes', '_section', '_prev_line', '_partial_line')
+
+    def __init__(self):
+        self._hashes = {}
+        for section in ('schedules', 'constructions', 'geometry', 'zones', 'other'):
+            self._hashes[section] = hashlib.sha256()
+        self._section, self._prev_line, self._partial_line = 'other', '', ''
+
+    @property
+    def section(self):
+        """Get text for the section to which the last complete line belongs."""
+        return self._section
+
+    def update(self, inp_text):
+        """Add a chunk of INP text to the hashes of the sections.
+
+        Args:
+            inp_text: A string of INP text, which follows the text of the
+                previous update.
+        """
+        lines = (self._partial_line + inp_text).splitlines(True)
+        self._partial_line = ''
+        if lines and (lines[-1].endswith('\r') or
+                      lines[-1].splitlines()[0] == lines[-1]):  # line may continue
+            self._partial_line = lines.pop()
+        for line in lines:
+            self._update_line(line.splitlines()[0])
+
+    def hexdigests(self):
+        """Get a dictionary with the SHA-256 hex digests of each section.
+
+        Any incomplete last line of the text is included in the hashes.
+        """
+        hashes = {section: s_hash.copy() for section, s_hash in self._hashes.items()}
+        if self._partial_line != '':
+            line = self._partial_line.splitlines()[0]
+            hashes[self._line_section(line)].update((line + '\n').encode('utf-8'))
+        return {section: s_hash.hexdigest() for section, s_hash in hashes.items()}
+
+    def _line_section(self, line):
+        """Get the section of a line given the line before it."""
+        header = line[1:].strip()
+        if line.startswith('$') and header.strip('*- ') != '':  # possible header
+            if self._prev_line.startswith('$ **'):  # major header
+                return SECTION_HEADERS.get(header, 'other')
+            elif self._prev_line.startswith('$ ---') and header in SECTION_HEADERS:
+                return SECTION_HEADERS[header]
+        return self._section
+
+    def _update_line(self, line):
+        """Add a complete line without its line ending to the hashes."""
+        self._section = self._line_section(line)
+        self._hashes[self._section].update((line + '\n').encode('utf-8'))
+        self._prev_line = line
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'InpSectionHasher: [section: {}]'.format(self._section)
+
+
 def switch_statement_id(value):
     """Convert a string into a 4-character ID that can be used for switch statements.
 
@@ -409,3 +544,74 @@ def inp_path_from_folder(folder_path=None, filename=None):
         assert os.path.isfile(inp_path), \
             'No INP file was found at: {}'.format(inp_path)
         return inp_path
+
+
+def open_inp_file(file_path, mode='r', encoding='utf-8', errors=None):
+    """Open an INP file as a text file object, which may be compressed.
+
+    When writing, files with a .gz extension are compressed with gzip and files
+    with a .zst extension are compressed with zstd as they are written. When
+    reading, compressed files are recognized from their first bytes such that
+    they are decompressed regardless of their extension. The same encoding is
+    used for compressed and uncompressed files.
+
+    By default, characters that cannot be decoded are replaced when reading
+    since eQuest writes INP files with the cp1252 encoding of Windows, which
+    is not always valid utf-8. These characters are typically only found
+    in comments and descriptions.
+
+    Note that zstd compression requires Python 3.14 or the zstandard package
+    to be installed.
+
+    Args:
+        file_path: Text for the path to the INP file.
+        mode: Text for whether the file is opened for reading or writing.
+            Choose from r or w. (Default: r).
+        encoding: Text for the encoding of the text in the file. (Default: utf-8).
+        errors: Text for how encoding and decoding errors are handled, which
+            is passed to the text file object (eg. strict, replace). If None,
+            replace is used for reading and strict is used for writing.
+            (Default: None).
+
+    Returns:
+        A text file object, which should be closed after it is used.
+    """
+    assert mode in ('r', 'w'), \
+        'INP file mode must be "r" or "w". Got "{}".'.format(mode)
+    if errors is None:
+        errors = 'replace' if mode == 'r' else 'strict'
+    if mode == 'r':
+        with open(file_path, 'rb') as inp_file:
+            magic = inp_file.read(4)
+        is_gzip, is_zstd = magic[:2] == GZIP_MAGIC, magic == ZSTD_MAGIC
+    else:
+        ext = os.path.splitext(file_path)[1].lower()
+        is_gzip, is_zstd = ext in GZIP_EXTENSIONS, ext in ZSTD_EXTENSIONS
+
+    if is_gzip:
+        binary_file = gzip.open(file_path, mode + 'b')
+    elif is_zstd:
+        binary_file = _zstd_open(file_path, mode)
+    else:
+        return io.open(file_path, mode, encoding=encoding, errors=errors)
+    return io.TextIOWrapper(binary_file, encoding=encoding, errors=errors)
+
+
+def _zstd_open(file_path, mode):
+    """Open a zstd-compressed file as a binary file object."""
+    try:  # zstd is part of the standard library starting in Python 3.14
+        from compression import zstd
+        return zstd.open(file_path, mode + 'b')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            'The zstandard package must be installed in order to read or write '
+            'zstd-compressed INP files.\nUse a .gz extension to compress the '
+            'INP with gzip instead.')
+    raw_file = open(file_path, mode + 'b')
+    if mode == 'w':
+        return zstandard.ZstdCompressor().stream_writer(raw_file)
+    return zstandard.ZstdDecompressor().stream_reader(raw_file)
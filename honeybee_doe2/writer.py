@@ -2,13 +2,26 @@
 """Methods to write Honeybee core objects to inp."""
 from __future__ import division
 import os
+import sys
 import math
+import collections
+import json
+import hashlib
+try:  # process pools are not available in IronPython
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+try:  # numpy is used to project polygon vertices in bulk when it is available
+    import numpy as np
+except ImportError:  # numpy is not available (eg. IronPython)
+    np = None
 
 from ladybug_geometry.geometry2d import Vector2D, Point2D
 from ladybug_geometry.geometry3d import Vector3D, Point3D, LineSegment3D, Plane, Face3D
 from ladybug_geometry.bounding import bounding_box
 from honeybee.typing import clean_doe2_string, clean_string
-from honeybee.boundarycondition import Surface
+from honeybee.boundarycondition import Surface, boundary_conditions
 from honeybee.facetype import Wall, Floor, RoofCeiling
 from honeybee_energy.schedule.ruleset import ScheduleRuleset
 from honeybee_energy.construction.opaque import OpaqueConstruction
@@ -16,10 +29,11 @@ from honeybee_energy.construction.air import AirBoundaryConstruction
 from honeybee_energy.lib.constructionsets import generic_construction_set
 
 from .config import DOE2_TOLERANCE, DOE2_ANGLE_TOL, GEO_DEC_COUNT, RECT_WIN_SUBD, \
-    DOE2_INTERIOR_BCS, GEO_CHARS, RES_CHARS
+    DOE2_INTERIOR_BCS, DOE2_MAX_VERTICES, GEO_CHARS, RES_CHARS
 from .util import generate_inp_string, header_comment_minor, \
-    header_comment_major, switch_statement_id
-from .grouping import group_rooms_by_doe2_level, group_rooms_by_doe2_hvac
+    header_comment_major, switch_statement_id, open_inp_file, InpSectionHasher
+from .grouping import group_rooms_by_doe2_level, group_rooms_by_doe2_hvac, \
+    typical_floor_multipliers, group_identical_rooms, group_rooms_by_thermal_conditions
 from .construction import opaque_material_to_inp, opaque_construction_to_inp, \
     window_construction_to_inp, door_construction_to_inp, air_construction_to_inp
 from .schedule import energy_trans_sch_to_transmittance
@@ -28,6 +42,17 @@ from .load import people_to_inp, lighting_to_inp, electric_equipment_to_inp, \
 from .programtype import program_type_to_inp, switch_dict_to_space_inp, \
     switch_dict_to_zone_inp
 from .simulation import SimulationPar
+from .exportview import ExportView
+from .zoning import model_to_core_perimeter
+from .culling import cull_shades
+from .merging import merge_coplanar_faces, merge_coplanar_shades
+from .simplify import simplify_polygon
+from .cache import RoomBlockCache, ROOM_CACHE_VERSION
+from .spool import InpBlockSpool
+from .adjacency import AdjacencyIndex
+from .geometry import face_geometry_cache, clean_face_geometry, \
+    face_lower_left_corner, room_geometry_analysis, room_precomputed_geometry, \
+    level_geometry_stamp
 
 
 def face_3d_to_inp(face_3d, parent_name='HB object'):
@@ -49,52 +74,186 @@ def face_3d_to_inp(face_3d, parent_name='HB object'):
     Returns:
         A tuple with two elements.
 
+        -   polygon_str: Text string for the INP polygon. Polygons with more
+            vertices than the DOE-2 limit of 120 are simplified.
+
+        -   position_info: A tuple of values used to locate the Polygon in 3D space.
+            The order of properties in the tuple is as follows: (ORIGIN, TILT, AZIMUTH).
+    """
+    vertices, position_info = _face_3d_polygon_vertices(face_3d)
+    polygon_str = _polygon_to_inp(parent_name, vertices)
+    return polygon_str, position_info
+
+
+def face_3ds_to_inp(face_3ds, parent_names):
+    """Convert several Face3Ds into DOE-2 POLYGON strings and info to position them.
+
+    The result is the same as calling face_3d_to_inp on each Face3D. However,
+    when NumPy is available, the vertices of all Face3Ds are projected into
+    their planes together using arrays, which is much faster when there are
+    many Face3Ds to be translated (eg. all Faces of a Room).
+
+    Args:
+        face_3ds: A list of ladybug-geometry Face3D objects for which INP
+            POLYGON strings will be generated.
+        parent_names: A list of text strings that align with the face_3ds and
+            contain the name of the parent object that will reference each
+            POLYGON. These will be used to generate names for the polygons.
+
+    Returns:
+        A list of tuples that align with the input face_3ds. Each tuple has two
+        elements, which match those returned from the face_3d_to_inp function.
+
         -   polygon_str: Text string for the INP polygon.
 
         -   position_info: A tuple of values used to locate the Polygon in 3D space.
             The order of properties in the tuple is as follows: (ORIGIN, TILT, AZIMUTH).
     """
-    # TODO: Consider adding a workaround for the DOE-2 limit of 120 vertices
-    # perhaps we can just say NO-SHAPE and specify AREA, VOLUME, and HEIGHT
+    polygons = []
+    face_verts = _face_3ds_polygon_vertices(face_3ds)
+    for name, (vertices, position_info) in zip(parent_names, face_verts):
+        polygons.append((_polygon_to_inp(name, vertices), position_info))
+    return polygons
+
+
+def _face_3d_polygon_vertices(face_3d):
+    """Get the 2D vertices of a DOE-2 POLYGON and info to position it in space.
+
+    Returns:
+        A tuple with two elements.
+
+        -   vertices: A list of (x, y) tuples for the vertices of the POLYGON.
+
+        -   position_info: A tuple of (ORIGIN, TILT, AZIMUTH) for the Face3D.
+    """
     # get the main properties that place the geometry in 3D space
-    pts_3d = face_3d.lower_left_counter_clockwise_boundary
-    tilt, azimuth = math.degrees(face_3d.tilt), math.degrees(face_3d.azimuth)
-    llc_origin = face_3d.lower_left_corner
-    llc_coords = []
-    for coord in llc_origin:  # avoid signed zero
-        coord = round(coord, GEO_DEC_COUNT)
-        clean_coord = 0.0 if coord == 0 else coord
-        llc_coords.append(clean_coord)
-    llc_origin = Point3D.from_array(llc_coords)
+    pts_3d, ref_plane, position_info = _face_3d_polygon_plane(face_3d)
+    llc_origin, tilt, _ = position_info
 
     # get the 2D vertices in the plane of the Face
     if DOE2_ANGLE_TOL <= tilt <= 180 - DOE2_ANGLE_TOL:  # vertical or tilted
-        proj_y = Vector3D(0, 0, 1).project(face_3d.normal)
-        proj_x = proj_y.rotate(face_3d.normal, math.pi / -2)
-        ref_plane = Plane(face_3d.normal, llc_origin, proj_x)
         vertices = [ref_plane.xyz_to_xy(pt) for pt in pts_3d]
     else:  # horizontal; ensure vertices are always counterclockwise from above
-        azimuth = 180.0
         llc = Point2D(llc_origin.x, llc_origin.y)
         vertices = [Point2D(v.x - llc.x, v.y - llc.y) for v in pts_3d]
         if tilt > 180 - DOE2_ANGLE_TOL:
             vertices = [Point2D(v.x, -v.y) for v in vertices]
+    return [(pt.x, pt.y) for pt in vertices], position_info
+
+
+def _face_3ds_polygon_vertices(face_3ds):
+    """Get the 2D POLYGON vertices of several Face3Ds, using NumPy when available.
+
+    Returns:
+        A list of tuples that align with the input face_3ds. Each tuple has
+        two elements, which match those returned from _face_3d_polygon_vertices.
+    """
+    if np is None or len(face_3ds) == 0:  # use the pure-Python translator
+        return [_face_3d_polygon_vertices(f_geo) for f_geo in face_3ds]
+
+    # gather the vertices, origins and axes of all Face3Ds into arrays
+    pts_3d, origins, x_axes, y_axes, pos_infos, vert_counts = [], [], [], [], [], []
+    for face_3d in face_3ds:
+        f_pts, ref_plane, position_info = _face_3d_polygon_plane(face_3d)
+        llc_origin, tilt, _ = position_info
+        if DOE2_ANGLE_TOL <= tilt <= 180 - DOE2_ANGLE_TOL:  # vertical or tilted
+            x_axis, y_axis = ref_plane.x, ref_plane.y
+        else:  # horizontal; ensure vertices are always counterclockwise from above
+            x_axis = (1., 0., 0.)
+            y_axis = (0., -1., 0.) if tilt > 180 - DOE2_ANGLE_TOL else (0., 1., 0.)
+        pts_3d.extend(tuple(pt) for pt in f_pts)
+        origins.append(tuple(llc_origin))
+        x_axes.append(tuple(x_axis))
+        y_axes.append(tuple(y_axis))
+        pos_infos.append(position_info)
+        vert_counts.append(len(f_pts))
+
+    # project all of the vertices into the planes of their Face3Ds
+    diff = np.array(pts_3d) - np.repeat(np.array(origins), vert_counts, axis=0)
+    x_axes = np.repeat(np.array(x_axes), vert_counts, axis=0)
+    y_axes = np.repeat(np.array(y_axes), vert_counts, axis=0)
+    # sum the products in the same order as Vector3D.dot to get identical results
+    x_coords = x_axes[:, 0] * diff[:, 0] + x_axes[:, 1] * diff[:, 1] + \
+        x_axes[:, 2] * diff[:, 2]
+    y_coords = y_axes[:, 0] * diff[:, 0] + y_axes[:, 1] * diff[:, 1] + \
+        y_axes[:, 2] * diff[:, 2]
+    vertices = list(zip(x_coords.tolist(), y_coords.tolist()))
+
+    # split the vertices back into the polygons of each Face3D
+    face_verts, st_i = [], 0
+    for position_info, v_count in zip(pos_infos, vert_counts):
+        face_verts.append((vertices[st_i:st_i + v_count], position_info))
+        st_i += v_count
+    return face_verts
+
+
+def _face_3d_polygon_plane(face_3d):
+    """Get the properties needed to project a Face3D into a DOE-2 POLYGON.
+
+    Returns:
+        A tuple with three elements.
 
-    # format the vertices into a POLYGON string
+        -   pts_3d: The lower-left counter-clockwise boundary of the Face3D.
+
+        -   ref_plane: A Plane into which vertical or tilted geometry is projected.
+            This is None for horizontal geometry.
+
+        -   position_info: A tuple of (ORIGIN, TILT, AZIMUTH) for the Face3D.
+    """
+    pts_3d = face_3d.lower_left_counter_clockwise_boundary
+    tilt, azimuth = math.degrees(face_3d.tilt), math.degrees(face_3d.azimuth)
+    llc_origin = _round_origin(face_3d.lower_left_corner)
+    if DOE2_ANGLE_TOL <= tilt <= 180 - DOE2_ANGLE_TOL:  # vertical or tilted
+        proj_y = Vector3D(0, 0, 1).project(face_3d.normal)
+        proj_x = proj_y.rotate(face_3d.normal, math.pi / -2)
+        ref_plane = Plane(face_3d.normal, llc_origin, proj_x)
+    else:  # horizontal geometry is projected into the XY plane
+        azimuth = 180.0
+        ref_plane = None
+    return pts_3d, ref_plane, (llc_origin, tilt, azimuth)
+
+
+def _round_origin(origin):
+    """Round the coordinates of a POLYGON origin Point3D, avoiding signed zero."""
+    clean_coords = []
+    for coord in origin:  # avoid signed zero
+        coord = round(coord, GEO_DEC_COUNT)
+        clean_coord = 0.0 if coord == 0 else coord
+        clean_coords.append(clean_coord)
+    return Point3D.from_array(clean_coords)
+
+
+def _polygon_to_inp(parent_name, vertices, export_view=None, direction='Any'):
+    """Get a DOE-2 POLYGON string from a list of (x, y) coordinates.
+
+    Polygons with more vertices than DOE2_MAX_VERTICES are simplified to
+    meet the DOE-2 limit and the simplification is recorded on the export_view.
+    The direction is passed to simplify_polygon such that the POLYGONs of
+    FLOORs can be simplified outward and those of SPACEs inward, which keeps
+    the SPACEs inside their FLOOR.
+    """
+    poly_name = '{} Plg'.format(parent_name)
+    if len(vertices) > DOE2_MAX_VERTICES:
+        vertices, deviation, area_change = simplify_polygon(
+            vertices, DOE2_MAX_VERTICES, DOE2_TOLERANCE, direction)
+        if len(vertices) > DOE2_MAX_VERTICES:
+            msg = 'POLYGON "{}" could not be simplified to the DOE-2 limit of {} ' \
+                'vertices without self-intersecting. It still has {} ' \
+                'vertices.'.format(poly_name, DOE2_MAX_VERTICES, len(vertices))
+            raise ValueError(msg)
+        if export_view is not None:
+            export_view.record_simplified_polygon(poly_name, deviation, area_change)
     verts_values = []
-    for pt in vertices:
-        x_coord = round(pt.x, GEO_DEC_COUNT)
-        y_coord = round(pt.y, GEO_DEC_COUNT)
+    for x_coord, y_coord in vertices:
+        x_coord = round(x_coord, GEO_DEC_COUNT)
+        y_coord = round(y_coord, GEO_DEC_COUNT)
         if x_coord == 0:  # avoid signed zero
             x_coord = 0.0
         if y_coord == 0:  # avoid signed zero
             y_coord = 0.0
         verts_values.append('({}, {})'.format(x_coord, y_coord))
     verts_keywords = tuple('V{}'.format(i + 1) for i in range(len(verts_values)))
-    poly_name = '{} Plg'.format(parent_name)
-    polygon_str = generate_inp_string(poly_name, 'POLYGON', verts_keywords, verts_values)
-    position_info = (llc_origin, tilt, azimuth)
-    return polygon_str, position_info
+    return generate_inp_string(poly_name, 'POLYGON', verts_keywords, verts_values)
 
 
 def face_3d_to_inp_rectangle(face_3d):
@@ -144,7 +303,9 @@ def face_3d_to_inp_rectangle(face_3d):
     return None
 
 
-def shade_mesh_to_inp(shade_mesh, equest_version=None):
+def shade_mesh_to_inp(
+    shade_mesh, equest_version=None, export_view=None, merge_coplanar=False
+):
     """Generate an INP string representation of a ShadeMesh.
 
     Args:
@@ -153,6 +314,14 @@ def shade_mesh_to_inp(shade_mesh, equest_version=None):
         equest_version: An optional text string to denote the version of eQuest
             for which the Shade INP definition will be generated. If unspecified
             or unrecognized, the latest version of eQuest will be used.
+        export_view: An optional ExportView of the Model to which the ShadeMesh belongs,
+            which will be used to look up the U-Name of the ShadeMesh. If None, the
+            U-Name will be derived from the identifier of the ShadeMesh. (Default: None).
+        merge_coplanar: Boolean to note whether adjacent coplanar faces of the
+            ShadeMesh should be merged together into larger FIXED-SHADEs. This
+            reduces the number of FIXED-SHADEs written for triangulated meshes
+            and merged faces that are rectangles are written with SHAPE
+            RECTANGLE. (Default: False).
 
     Returns:
         A tuple with two elements.
@@ -164,27 +333,33 @@ def shade_mesh_to_inp(shade_mesh, equest_version=None):
             to represent the ShadeMesh.
     """
     # extract the transmittance properties of the shade
-    base_id = clean_doe2_string(shade_mesh.identifier, GEO_CHARS)
+    shd_id = shade_mesh.identifier if export_view is None else \
+        export_view.shade_mesh_identifier(shade_mesh.identifier)
+    base_id = _doe2_name(shd_id, GEO_CHARS, export_view)
     trans_kwd = ['TRANSMITTANCE']
     trans_vals = [energy_trans_sch_to_transmittance(shade_mesh)]
     t_sch_obj = shade_mesh.properties.energy.transmittance_schedule
     if t_sch_obj is not None and not t_sch_obj.is_constant:
         trans_kwd.append('SHADE-SCHEDULE')
-        t_shc_id = clean_doe2_string(t_sch_obj.identifier, RES_CHARS)
+        t_shc_id = _doe2_name(t_sch_obj.identifier, RES_CHARS, export_view)
         trans_vals.append('"{}"'.format(t_shc_id))
 
-    # set up collector lists and properties for all shades
-    shade_polygons, shade_defs = [], []
-
-    # loop through the mesh faces and create individual shade objects
-    for i, face in enumerate(shade_mesh.geometry.face_vertices):
+    # get the cleaned geometry of each mesh face and translate it to INP geometry
+    shade_polygons, shade_defs, poly_geos, poly_ids = [], [], [], []
+    face_geos = []
+    mesh_geos = _shade_mesh_face_geometries(shade_mesh.geometry)
+    if merge_coplanar:
+        merged_geos, face_indices = merge_coplanar_faces(
+            [geo for geo, _ in mesh_geos], DOE2_TOLERANCE, DOE2_ANGLE_TOL)
+        mesh_geos = [
+            mesh_geos[f_is[0]] if len(f_is) == 1 else (geo, len(geo.vertices) == 3)
+            for geo, f_is in zip(merged_geos, face_indices)
+        ]
+    for i, (clean_geo, is_triangle) in enumerate(mesh_geos):
         doe2_id = '{}{}'.format(base_id, i)
-        f_geo = Face3D(face)
-        shd_geo = f_geo if f_geo.altitude > 0 else f_geo.flip()
-        clean_geo = shd_geo.remove_colinear_vertices(DOE2_TOLERANCE)
-        rect_info = face_3d_to_inp_rectangle(clean_geo)
+        # triangles can never be represented as a rectangle
+        rect_info = None if is_triangle else face_3d_to_inp_rectangle(clean_geo)
         if equest_version == '3.64':
-            shade_polygon = ''
             if rect_info is not None:
                 width, height, origin, tilt, az = rect_info
             else:  # take the bounding rectangle around the Face3D
@@ -204,12 +379,22 @@ def shade_mesh_to_inp(shade_mesh, equest_version=None):
             width, height, origin, tilt, az = rect_info
             geo_kwd = ['SHAPE', 'HEIGHT', 'WIDTH']
             geo_vals = ['RECTANGLE', height, width]
-        else:  # otherwise, create the polygon string from the geometry
-            shade_polygon, pos_info = face_3d_to_inp(clean_geo, doe2_id)
-            shade_polygons.append(shade_polygon)
-            origin, tilt, az = pos_info
+        else:  # otherwise, the polygon will be created from the geometry
+            poly_geos.append(clean_geo)
+            poly_ids.append(doe2_id)
             geo_kwd = ['SHAPE', 'POLYGON']
             geo_vals = ['POLYGON', '"{} Plg"'.format(doe2_id)]
+            origin = tilt = az = None
+        face_geos.append((doe2_id, geo_kwd, geo_vals, origin, tilt, az))
+
+    # project all of the polygons together and create the final shade definitions
+    polygons = iter(_shade_mesh_polygon_vertices(poly_geos))
+    poly_ids = iter(poly_ids)
+    for doe2_id, geo_kwd, geo_vals, origin, tilt, az in face_geos:
+        if origin is None:  # add the polygon to the list
+            vertices, (origin, tilt, az) = next(polygons)
+            shade_polygons.append(
+                _polygon_to_inp(next(poly_ids), vertices, export_view))
         geo_kwd.extend(('X-REF', 'Y-REF', 'Z-REF', 'TILT', 'AZIMUTH'))
         geo_vals.extend((round(origin.x, GEO_DEC_COUNT), round(origin.y, GEO_DEC_COUNT),
                         round(origin.z, GEO_DEC_COUNT), tilt, az))
@@ -222,7 +407,185 @@ def shade_mesh_to_inp(shade_mesh, equest_version=None):
     return shade_polygons, shade_defs
 
 
-def shade_to_inp(shade, equest_version=None):
+def _shade_mesh_polygon_vertices(face_3ds):
+    """Get the 2D POLYGON vertices of the Face3Ds of a ShadeMesh.
+
+    When NumPy is available, the lower-left corners, the counterclockwise
+    vertex order and the projected vertices of all triangles are computed
+    together using arrays. Any triangle where the rounded INP values could be
+    affected by floating point differences with the Face3D methods (eg. values
+    that are within a tiny distance of a rounding boundary or vertices that are
+    equally close to the lower-left corner) is translated one by one along
+    with all other Face3Ds such that the result is always the same as that
+    of _face_3d_polygon_vertices.
+
+    Args:
+        face_3ds: A list of cleaned Face3Ds from _shade_mesh_face_geometries.
+
+    Returns:
+        A list of tuples that align with the input face_3ds. Each tuple has
+        two elements, which match those returned from _face_3d_polygon_vertices.
+    """
+    face_verts = [None] * len(face_3ds)
+    tri_i = [i for i, f_geo in enumerate(face_3ds) if len(f_geo.boundary) == 3]
+    if np is not None and len(tri_i) != 0:
+        tri_verts = _triangles_polygon_vertices([face_3ds[i] for i in tri_i])
+        for i, verts in zip(tri_i, tri_verts):
+            face_verts[i] = verts
+    for i, f_geo in enumerate(face_3ds):
+        if face_verts[i] is None:  # translate the face with the Face3D methods
+            face_verts[i] = _face_3d_polygon_vertices(f_geo)
+    return face_verts
+
+
+def _triangles_polygon_vertices(face_3ds):
+    """Get the 2D POLYGON vertices of counterclockwise triangular Face3Ds with NumPy.
+
+    This mirrors the _face_3d_polygon_plane and _face_3d_polygon_vertices
+    functions for all triangles at once. The tilt and azimuth are taken from
+    the plane of each Face3D such that they are exactly the same as those
+    of the Face3D methods.
+
+    Returns:
+        A list of tuples that align with the input face_3ds. Each tuple has
+        two elements, which match those returned from _face_3d_polygon_vertices.
+        The item will be None for any triangle that is too close to a rounding
+        boundary or a tie to be reliably translated with arrays.
+    """
+    # gather the vertices, planes and orientations of the triangles
+    pts, normals, origins, tilts, azimuths = [], [], [], [], []
+    for face_3d in face_3ds:
+        pts.append(tuple(tuple(pt) for pt in face_3d.boundary))
+        plane = face_3d.plane
+        normals.append(tuple(plane.n))
+        origins.append(tuple(plane.o))
+        tilts.append(math.degrees(face_3d.tilt))
+        azimuths.append(math.degrees(face_3d.azimuth))
+    pts, n = np.array(pts), np.array(normals)
+    origins, tilts = np.array(origins), np.array(tilts)
+    hor_n = np.hypot(n[:, 0], n[:, 1])
+    exact_hor = (n[:, 2] == 1) | (n[:, 2] == -1)
+    is_vertical = (DOE2_ANGLE_TOL <= tilts) & (tilts <= 180 - DOE2_ANGLE_TOL)
+    # triangles that are nearly horizontal have an ill-defined horizontal X axis
+    unreliable = (hor_n < 1e-6) & ~exact_hor
+
+    # get the X and Y axes of the planes with a horizontal X axis
+    safe_hor_n = np.where(hor_n == 0, 1, hor_n)
+    x_axis = np.stack((-n[:, 1] / safe_hor_n, n[:, 0] / safe_hor_n,
+                       np.zeros(len(n))), axis=1)
+    x_axis[exact_hor] = (1., 0., 0.)
+    y_axis = np.cross(n, x_axis)
+
+    # get the lower-left corner of the face in its upward-oriented plane
+    rel_pts = pts - origins[:, None, :]
+    pts_x = np.einsum('ijk,ik->ij', rel_pts, x_axis)
+    pts_y = np.einsum('ijk,ik->ij', rel_pts, y_axis)
+    min_x, min_y = pts_x.min(axis=1), pts_y.min(axis=1)
+    llc = origins + x_axis * min_x[:, None] + y_axis * min_y[:, None]
+    llc_round = np.round(llc, GEO_DEC_COUNT)
+    unreliable |= _near_rounding_boundary(llc).any(axis=1)
+
+    # get the counterclockwise boundary starting from the vertex closest to the llc
+    z_range = pts[:, :, 2].max(axis=1) - pts[:, :, 2].min(axis=1)
+    is_hor = z_range <= 0.01  # tolerance used by Face3D.is_horizontal
+    unreliable |= np.abs(z_range - 0.01) < 1e-9
+    hor_x = np.where(n[:, 2] < 0, pts[:, :, 0].max(axis=1), pts[:, :, 0].min(axis=1))
+    corner_x = np.where(is_hor, hor_x, min_x)
+    corner_y = np.where(is_hor, pts[:, :, 1].min(axis=1), min_y)
+    poly_x = np.where(is_hor[:, None], pts[:, :, 0], pts_x)
+    poly_y = np.where(is_hor[:, None], pts[:, :, 1], pts_y)
+    dists = np.hypot(poly_x - corner_x[:, None], poly_y - corner_y[:, None])
+    sorted_dists = np.sort(dists, axis=1)
+    unreliable |= sorted_dists[:, 1] - sorted_dists[:, 0] < \
+        1e-9 * np.maximum(1, sorted_dists[:, 1])
+    first_i = np.argmin(dists, axis=1)
+    order = (first_i[:, None] + np.arange(3)) % 3
+    cc_pts = np.take_along_axis(pts, order[:, :, None], axis=1)
+
+    # project the vertices into the plane of the DOE-2 POLYGON
+    rel_pts = cc_pts - llc_round[:, None, :]
+    ver_x = np.einsum('ijk,ik->ij', rel_pts, x_axis)
+    ver_y = np.einsum('ijk,ik->ij', rel_pts, y_axis)
+    hor_y = np.where(tilts[:, None] > 180 - DOE2_ANGLE_TOL, -rel_pts[:, :, 1],
+                     rel_pts[:, :, 1])
+    vert_x = np.where(is_vertical[:, None], ver_x, rel_pts[:, :, 0])
+    vert_y = np.where(is_vertical[:, None], ver_y, hor_y)
+    unreliable |= _near_rounding_boundary(vert_x).any(axis=1)
+    unreliable |= _near_rounding_boundary(vert_y).any(axis=1)
+
+    # assemble the vertices and position info of the reliable triangles
+    face_verts = []
+    tri_data = zip(unreliable.tolist(), vert_x.tolist(), vert_y.tolist(),
+                   llc_round.tolist(), tilts.tolist(), azimuths, is_vertical.tolist())
+    for unrel, xs, ys, origin, tilt, azimuth, vertical in tri_data:
+        if unrel:
+            face_verts.append(None)
+            continue
+        origin = Point3D(*(0.0 if c == 0 else c for c in origin))
+        azimuth = azimuth if vertical else 180.0
+        face_verts.append((list(zip(xs, ys)), (origin, tilt, azimuth)))
+    return face_verts
+
+
+def _near_rounding_boundary(values):
+    """Get a boolean array for values that are nearly halfway between INP decimals.
+
+    Such values can round differently when they are computed with a different
+    order of floating point operations.
+    """
+    scaled = np.abs(values) * 10 ** GEO_DEC_COUNT
+    tol = 1e-6 * np.maximum(1, scaled * 1e-4)
+    return np.abs(scaled - np.floor(scaled) - 0.5) < tol
+
+
+def _shade_mesh_face_geometries(mesh_3d):
+    """Get upward-pointing Face3Ds without colinear vertices for the faces of a Mesh3D.
+
+    When NumPy is available, all triangular faces of the mesh are checked for
+    colinear vertices together using arrays. Triangles that are clearly not
+    degenerate do not need their colinear vertices to be removed and they are
+    built directly in the same vertex order that remove_colinear_vertices
+    would produce. All other faces are cleaned one by one.
+
+    Returns:
+        A list of tuples that align with the faces of the mesh. Each tuple has
+        the cleaned Face3D and a boolean for whether it is a triangle.
+    """
+    faces = mesh_3d.faces
+    is_clean = [False] * len(faces)
+    if np is not None:
+        tri_i = [i for i, face in enumerate(faces) if len(face) == 3]
+        if len(tri_i) != 0:
+            verts = np.array([tuple(pt) for pt in mesh_3d.vertices])
+            tris = np.array([faces[i] for i in tri_i])
+            pt1, pt2, pt3 = verts[tris[:, 0]], verts[tris[:, 1]], verts[tris[:, 2]]
+            dbl_area = np.linalg.norm(np.cross(pt2 - pt1, pt3 - pt1), axis=1)
+            edge_len = np.max(np.stack((
+                np.linalg.norm(pt2 - pt1, axis=1), np.linalg.norm(pt3 - pt2, axis=1),
+                np.linalg.norm(pt1 - pt3, axis=1))), axis=0)
+            # vertices are kept when the area exceeds that with a tolerance height
+            area_tol = np.maximum(edge_len, DOE2_TOLERANCE) * DOE2_TOLERANCE / 2
+            for i, clean in zip(tri_i, (dbl_area > area_tol * (1 + 1e-6)).tolist()):
+                is_clean[i] = clean
+
+    face_geos = []
+    for face, clean in zip(mesh_3d.face_vertices, is_clean):
+        f_geo = Face3D(face)
+        if clean:  # rotate the vertices like remove_colinear_vertices
+            pt1, pt2, pt3 = f_geo.vertices
+            if f_geo.altitude > 0:
+                clean_geo = Face3D((pt3, pt1, pt2), f_geo.plane, enforce_right_hand=False)
+            else:
+                clean_geo = Face3D(
+                    (pt1, pt3, pt2), f_geo.plane.flip(), enforce_right_hand=False)
+        else:
+            shd_geo = f_geo if f_geo.altitude > 0 else f_geo.flip()
+            clean_geo = shd_geo.remove_colinear_vertices(DOE2_TOLERANCE)
+        face_geos.append((clean_geo, len(clean_geo.vertices) == 3))
+    return face_geos
+
+
+def shade_to_inp(shade, equest_version=None, export_view=None):
     """Generate an INP string representation of a Shade.
 
     Args:
@@ -230,6 +593,9 @@ def shade_to_inp(shade, equest_version=None):
         equest_version: An optional text string to denote the version of eQuest
             for which the Shade INP definition will be generated. If unspecified
             or unrecognized, the latest version of eQuest will be used.
+        export_view: An optional ExportView of the Model to which the Shade belongs,
+            which will be used to look up the U-Name of the Shade. If None, the
+            U-Name will be derived from the identifier of the Shade. (Default: None).
 
     Returns:
         A tuple with two elements.
@@ -239,13 +605,15 @@ def shade_to_inp(shade, equest_version=None):
         -   shade_def: Text string for the INP definition of the Shade.
     """
     # extract the transmittance properties of the shade
-    doe2_id = clean_doe2_string(shade.identifier, GEO_CHARS)
+    shd_id = shade.identifier if export_view is None else \
+        export_view.shade_identifier(shade.identifier)
+    doe2_id = _doe2_name(shd_id, GEO_CHARS, export_view)
     trans_kwd = ['TRANSMITTANCE']
     trans_vals = [energy_trans_sch_to_transmittance(shade)]
     t_sch_obj = shade.properties.energy.transmittance_schedule
     if t_sch_obj is not None and not t_sch_obj.is_constant:
         trans_kwd.append('SHADE-SCHEDULE')
-        t_shc_id = clean_doe2_string(t_sch_obj.identifier, RES_CHARS)
+        t_shc_id = _doe2_name(t_sch_obj.identifier, RES_CHARS, export_view)
         trans_vals.append('"{}"'.format(t_shc_id))
 
     # extract the geometry properties of the shade
@@ -275,7 +643,8 @@ def shade_to_inp(shade, equest_version=None):
         geo_vals = ['RECTANGLE', height, width]
         shade_polygon = ''
     else:  # otherwise, create the polygon string from the geometry
-        shade_polygon, pos_info = face_3d_to_inp(clean_geo, doe2_id)
+        vertices, pos_info = _face_3d_polygon_vertices(clean_geo)
+        shade_polygon = _polygon_to_inp(doe2_id, vertices, export_view)
         origin, tilt, az = pos_info
         geo_kwd = ['SHAPE', 'POLYGON']
         geo_vals = ['POLYGON', '"{} Plg"'.format(doe2_id)]
@@ -290,7 +659,7 @@ def shade_to_inp(shade, equest_version=None):
     return shade_polygon, shade_def
 
 
-def door_to_inp(door):
+def door_to_inp(door, export_view=None):
     """Generate an INP string representation of a Door.
 
     Doors assigned to a parent Face will use the parent Face plane in order to
@@ -303,39 +672,31 @@ def door_to_inp(door):
 
     Args:
         door: A honeybee Door for which an INP representation will be returned.
+        export_view: An optional ExportView of the Model to which the Door belongs,
+            which will be used to cache geometry derived from the parent Face
+            so that it is shared between all sub-faces and to look up the
+            cleaned DOE-2 names. (Default: None).
 
     Returns:
         Text string for the INP definition of the Door.
     """
-    # extract the plane information from the parent geometry
-    if door.has_parent:
-        parent_llc = door.parent.geometry.lower_left_corner
-        rel_plane = door.parent.geometry.plane
-    else:
-        parent_llc = door.geometry.lower_left_corner
-        rel_plane = door.geometry.plane
     # get the LLC and URC of the bounding rectangle of the door
     apt_llc = door.geometry.lower_left_corner
     apt_urc = door.geometry.upper_right_corner
 
     # determine the width and height and origin in the parent coordinate system
-    if DOE2_ANGLE_TOL <= door.tilt <= 180 - DOE2_ANGLE_TOL:  # vertical or tilted
-        proj_y = Vector3D(0, 0, 1).project(rel_plane.n)
-        proj_x = proj_y.rotate(rel_plane.n, math.pi / -2)
-    else:  # located within the XY plane
-        proj_x = Vector3D(1, 0, 0)
-    ref_plane = Plane(rel_plane.n, parent_llc, proj_x)
+    ref_plane = _sub_face_reference_plane(door, export_view)
     min_2d = ref_plane.xyz_to_xy(apt_llc)
     max_2d = ref_plane.xyz_to_xy(apt_urc)
     width = round(max_2d.x - min_2d.x, GEO_DEC_COUNT)
     height = round(max_2d.y - min_2d.y, GEO_DEC_COUNT)
 
     # create the aperture definition
-    doe2_id = clean_doe2_string(door.identifier, GEO_CHARS)
+    doe2_id = _doe2_name(door.identifier, GEO_CHARS, export_view)
     dr_con = door.properties.energy.construction
     constr_o_name = dr_con.identifier if isinstance(dr_con, OpaqueConstruction) \
         else dr_con.identifier + '_d'
-    constr = clean_doe2_string(constr_o_name, RES_CHARS)
+    constr = _doe2_name(constr_o_name, RES_CHARS, export_view)
     keywords = ('X', 'Y', 'WIDTH', 'HEIGHT', 'CONSTRUCTION')
     values = (round(min_2d.x, GEO_DEC_COUNT), round(min_2d.y, GEO_DEC_COUNT),
               width, height, '"{}"'.format(constr))
@@ -343,7 +704,7 @@ def door_to_inp(door):
     return door_def
 
 
-def aperture_to_inp(aperture):
+def aperture_to_inp(aperture, export_view=None):
     """Generate an INP string representation of a Aperture.
 
     Apertures assigned to a parent Face will use the parent Face plane in order to
@@ -356,37 +717,29 @@ def aperture_to_inp(aperture):
 
     Args:
         aperture: A honeybee Aperture for which an INP representation will be returned.
+        export_view: An optional ExportView of the Model to which the Aperture
+            belongs, which will be used to cache geometry derived from the parent
+            Face so that it is shared between all sub-faces and to look up the
+            cleaned DOE-2 names. (Default: None).
 
     Returns:
         Text string for the INP definition of the Aperture.
     """
-    # extract the plane information from the parent geometry
-    if aperture.has_parent:
-        parent_llc = aperture.parent.geometry.lower_left_corner
-        rel_plane = aperture.parent.geometry.plane
-    else:
-        parent_llc = aperture.geometry.lower_left_corner
-        rel_plane = aperture.geometry.plane
     # get the LLC and URC of the bounding rectangle of the aperture
     apt_llc = aperture.geometry.lower_left_corner
     apt_urc = aperture.geometry.upper_right_corner
 
     # determine the width and height and origin in the parent coordinate system
-    if DOE2_ANGLE_TOL <= aperture.tilt <= 180 - DOE2_ANGLE_TOL:  # vertical or tilted
-        proj_y = Vector3D(0, 0, 1).project(rel_plane.n)
-        proj_x = proj_y.rotate(rel_plane.n, math.pi / -2)
-    else:  # located within the XY plane
-        proj_x = Vector3D(1, 0, 0)
-    ref_plane = Plane(rel_plane.n, parent_llc, proj_x)
+    ref_plane = _sub_face_reference_plane(aperture, export_view)
     min_2d = ref_plane.xyz_to_xy(apt_llc)
     max_2d = ref_plane.xyz_to_xy(apt_urc)
     width = round(max_2d.x - min_2d.x, GEO_DEC_COUNT)
     height = round(max_2d.y - min_2d.y, GEO_DEC_COUNT)
 
     # create the aperture definition
-    doe2_id = clean_doe2_string(aperture.identifier, GEO_CHARS)
+    doe2_id = _doe2_name(aperture.identifier, GEO_CHARS, export_view)
     constr_o_name = aperture.properties.energy.construction.identifier
-    constr = clean_doe2_string(constr_o_name, RES_CHARS)
+    constr = _doe2_name(constr_o_name, RES_CHARS, export_view)
     keywords = ('X', 'Y', 'WIDTH', 'HEIGHT', 'GLASS-TYPE')
     values = (round(min_2d.x, GEO_DEC_COUNT), round(min_2d.y, GEO_DEC_COUNT),
               width, height, '"{}"'.format(constr))
@@ -394,7 +747,7 @@ def aperture_to_inp(aperture):
     return aperture_def
 
 
-def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
+def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None, export_view=None):
     """Generate an INP string representation of a Face.
 
     Note that the resulting string does not include full construction definitions.
@@ -412,6 +765,11 @@ def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
         location: An optional text string to note the DOE-2 LOCATION of the
             Face on the parent Room. When this is specified, the Face will be
             written without using a POLYGON. (Default: None).
+        export_view: An optional ExportView of the Model to which the Face belongs,
+            which will be used to look up the U-Names of the Face and any
+            adjacent Room as well as geometry that has been derived from the
+            Face earlier in the export. If None, the U-Names will be derived
+            from the identifiers. (Default: None).
 
     Returns:
         A tuple with two elements.
@@ -421,7 +779,9 @@ def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
         -   face_def: Text string for the INP definition of the Face.
     """
     # set up attributes based on the face type and boundary condition
-    f_type_str, bc_str = str(face.type), str(face.boundary_condition)
+    face_bc = face.boundary_condition if export_view is None else \
+        export_view.face_boundary_condition(face)
+    f_type_str, bc_str = str(face.type), str(face_bc)
     if bc_str == 'Outdoors':
         doe2_type = 'EXTERIOR-WALL'  # DOE2 uses walls for a lot of things
         if f_type_str == 'RoofCeiling':
@@ -432,9 +792,11 @@ def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
         doe2_type = 'UNDERGROUND-WALL'
 
     # process the face identifier and the construction
-    doe2_id = clean_doe2_string(face.identifier, GEO_CHARS)
+    face_id = face.identifier if export_view is None else \
+        export_view.face_identifier(face.identifier)
+    doe2_id = _doe2_name(face_id, GEO_CHARS, export_view)
     constr_o_name = face.properties.energy.construction.identifier
-    constr = clean_doe2_string(constr_o_name, RES_CHARS)
+    constr = _doe2_name(constr_o_name, RES_CHARS, export_view)
 
     # process the geometry
     if location is not None:
@@ -442,8 +804,12 @@ def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
         values = ['"{}"'.format(constr), location]
         face_polygon = ''
     else:  # create the polygon string from the geometry
-        f_geo = face.geometry.remove_colinear_vertices(DOE2_TOLERANCE)
-        face_polygon, pos_info = face_3d_to_inp(f_geo, doe2_id)
+        try:  # see if the polygon has already been projected with other faces
+            vertices, pos_info = face_geometry_cache(face, export_view)['polygon']
+        except KeyError:  # translate the polygon of the face
+            f_geo = clean_face_geometry(face, export_view)
+            vertices, pos_info = _face_3d_polygon_vertices(f_geo)
+        face_polygon = _polygon_to_inp(doe2_id, vertices, export_view)
         face_origin, tilt, az = pos_info
         origin = face_origin - space_origin
         keywords = ['POLYGON', 'CONSTRUCTION', 'TILT', 'AZIMUTH', 'X', 'Y', 'Z']
@@ -454,8 +820,10 @@ def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
 
     # add information related to the boundary condition
     if bc_str == 'Surface':
-        adj_room = face.boundary_condition.boundary_condition_objects[-1]
-        adj_id = clean_doe2_string(adj_room, GEO_CHARS)
+        adj_room = face_bc.boundary_condition_objects[-1]
+        if export_view is not None:
+            adj_room = export_view.room_identifier(adj_room)
+        adj_id = _doe2_name(adj_room, GEO_CHARS, export_view)
         values.append('"{}"'.format(adj_id))
         keywords.append('NEXT-TO')
     elif doe2_type == 'INTERIOR-WALL':  # assume that it is adiabatic
@@ -472,7 +840,8 @@ def face_to_inp(face, space_origin=Point3D(0, 0, 0), location=None):
 
 def room_to_inp(
     room, floor_origin=Point3D(0, 0, 0), floor_height=None,
-    exclude_interior_walls=False, exclude_interior_ceilings=False, adj_set=None
+    exclude_interior_walls=False, exclude_interior_ceilings=False, adj_set=None,
+    export_view=None, adjacency=None
 ):
     """Generate an INP string representation of a Room.
 
@@ -504,6 +873,16 @@ def room_to_inp(
             to ensure that interior Faces do not get added to the INP twice,
             thereby doubling the heat flow. If None, all interior Faces of
             the room will be written as long as they were not excluded. (Default: None).
+        export_view: An optional ExportView of the Model to which the Room belongs,
+            which will be used to look up the U-Names and multiplier of the
+            Room and its Faces as well as to cache the geometry derived from
+            each Face. If None, these will be derived from the Room
+            itself. (Default: None).
+        adjacency: An optional AdjacencyIndex of all Rooms that are translated
+            with this Room, which will be used to determine whether each
+            interior Face is written. When specified, the exclude_interior_walls,
+            exclude_interior_ceilings and adj_set inputs are ignored since
+            they are already accounted for in the index. (Default: None).
 
     Returns:
         A tuple with two elements.
@@ -515,8 +894,14 @@ def room_to_inp(
             to represent the Room and all of its constituent Faces, Apertures
             and Doors.
     """
-    # process the room identifier
-    doe2_id = clean_doe2_string(room.identifier, GEO_CHARS)
+    # process the room identifier and multiplier
+    if export_view is None:
+        doe2_id = clean_doe2_string(room.identifier, GEO_CHARS)
+        multiplier = room.multiplier
+    else:
+        room_id = export_view.room_identifier(room.identifier)
+        doe2_id = export_view.doe2_name(room_id, GEO_CHARS)
+        multiplier = export_view.room_multiplier(room)
 
     # set up attributes based on the Room's energy properties
     energy_attr_keywords = ['ZONE-TYPE']
@@ -549,123 +934,35 @@ def room_to_inp(
     energy_attr_keywords.extend(inf_kwd)
     energy_attr_values.extend(inf_val)
 
-    def _is_room_3d_extruded(hb_room):
-        """Test if a Room is a pure extrusion.
-
-        Args:
-            hb_room: The Honeybee Room to be tested.
-
-        Returns:
-            A tuple with two elements.
-
-            -   is_extrusion: True if the geometry is an extrusion. False if not.
-
-            -   face_orientations: A list of integers that aligns with the Room.faces
-                and denotes whether each face is downward (-1), vertical (0) or
-                upward (+1).
-        """
-        # first check if we have to use POLYGONS because of the parent SPACE-HEIGHT
-        if floor_height is not None:
-            room_height = room.max.z - room.min.z
-            if abs(room_height - floor_height) > DOE2_TOLERANCE:
-                return False, []
-
-        # set up the parameters for evaluating vertical or horizontal
-        vert_vec = Vector3D(0, 0, 1)
-        min_v_ang = math.radians(DOE2_ANGLE_TOL)
-        max_v_ang = math.pi - min_v_ang
-        min_h_ang = (math.pi / 2) - min_v_ang
-        max_h_ang = (math.pi / 2) + min_v_ang
-
-        # loop through the Room faces and test them
-        face_orientations = []
-        for face in hb_room.faces:
-            try:  # first make sure that the geometry is not degenerate
-                clean_geo = face.geometry.remove_colinear_vertices(DOE2_TOLERANCE)
-                v_ang = clean_geo.normal.angle(vert_vec)
-                if v_ang <= min_v_ang:
-                    face_orientations.append(1)
-                    continue
-                elif v_ang >= max_v_ang:
-                    face_orientations.append(-1)
-                    continue
-                elif min_h_ang <= v_ang <= max_h_ang:
-                    face_orientations.append(0)
-                    continue
-                return False, []
-            except AssertionError:  # degenerate face to ignore
-                pass
-        return True, face_orientations
-
-    # if the room is extruded, determine the locations of each face
-    face_locations = []
-    is_extrusion, face_orientations = _is_room_3d_extruded(room)
-    if is_extrusion:  # try to translate without using POLYGON for the Room faces
-        if room.properties.doe2.space_polygon_geometry is not None:
-            r_geo = room.properties.doe2.space_polygon_geometry
-        else:
-            try:
-                r_geo = room.horizontal_boundary(
-                    match_walls=True, tolerance=DOE2_TOLERANCE)
-            except Exception:  # we may need to write it with NO-SHAPE
-                r_geo = None
-        if r_geo is not None:
-            r_geo = r_geo if r_geo.normal.z >= 0 else r_geo.flip()
-            r_geo = r_geo.remove_duplicate_vertices(DOE2_TOLERANCE)
-            rm_pts = r_geo.lower_left_counter_clockwise_boundary
-            rm_height = room.max.z - room.min.z
-            ceil_count = len([orient for orient in face_orientations if orient == 1])
-            floor_count = len([orient for orient in face_orientations if orient == -1])
-            for face, orient in zip(room.faces, face_orientations):
-                if orient == 0:  # wall to associate with a room vertex
-                    clean_geo = face.geometry.remove_colinear_vertices(DOE2_TOLERANCE)
-                    face_height = face.max.z - face.min.z
-                    if clean_geo.boundary_polygon2d.is_rectangle(DOE2_ANGLE_TOL) and \
-                            abs(rm_height - face_height) <= DOE2_TOLERANCE:
-                        f_origin = face.geometry.lower_left_corner
-                        for i, r_pt in enumerate(rm_pts):
-                            if f_origin.is_equivalent(r_pt, DOE2_TOLERANCE):
-                                face_locations.append('SPACE-V{}'.format(i + 1))
-                                break
-                        else:  # not associated with any Room vertex
-                            face_locations.append(None)
-                    else:  # not a rectangular geometry
-                        face_locations.append(None)
-                elif orient == 1:
-                    loc = 'TOP' if ceil_count == 1 and not r_geo.has_holes else None
-                    face_locations.append(loc)
-                else:
-                    loc = 'BOTTOM' if floor_count == 1 else None
-                    face_locations.append(loc)
-
-    # if the room is not extruded, just use the generic horizontal boundary
-    if len(face_locations) == 0:
-        if room.properties.doe2.space_polygon_geometry is not None:
-            r_geo = room.properties.doe2.space_polygon_geometry
-        else:
-            try:
-                r_geo = room.horizontal_boundary(
-                    match_walls=False, tolerance=DOE2_TOLERANCE)
-                r_geo = r_geo if r_geo.normal.z >= 0 else r_geo.flip()
-                r_geo = r_geo.remove_colinear_vertices(tolerance=DOE2_TOLERANCE)
-            except Exception:  # we may need to write it with NO-SHAPE
-                r_geo = None
-        face_locations = [None] * len(room.faces)
+    # see if the geometry of a congruent Room has already been translated
+    room_min = room.min
+    prototype = _room_prototype_cache(room, room_min, floor_height, export_view)
+    try:
+        face_locations, space_verts, space_rel_origin, volume = prototype['geometry']
+        space_origin = _round_origin(room_min + space_rel_origin) \
+            if space_verts is not None else None
+    except KeyError:  # translate the geometry of the room
+        face_locations, space_verts, space_origin = _room_space_geometry(
+            room, floor_height, export_view)
+        volume = room.volume
+        space_rel_origin = space_origin - room_min \
+            if space_verts is not None else None
+        prototype['geometry'] = (face_locations, space_verts, space_rel_origin, volume)
 
     # create the space definition
-    if r_geo is None:   # we have to use NO-SHAPE
+    if space_verts is None:   # we have to use NO-SHAPE
         msg = 'Using NO-SHAPE for SPACE "{}".'.format(room.display_name)
         print(msg)
-        space_origin = room.min
+        space_origin = room_min
         origin = space_origin - floor_origin
         keywords = ['SHAPE', 'AZIMUTH', 'X', 'Y', 'Z', 'AREA', 'VOLUME']
         values = ['NO-SHAPE', 0, round(origin.x, GEO_DEC_COUNT),
                   round(origin.y, GEO_DEC_COUNT), round(origin.z, GEO_DEC_COUNT),
                   round(room.floor_area, GEO_DEC_COUNT),
-                  round(room.volume, GEO_DEC_COUNT)]
-        if room.multiplier != 1:
+                  round(volume, GEO_DEC_COUNT)]
+        if multiplier != 1:
             keywords.append('MULTIPLIER')
-            values.append(room.multiplier)
+            values.append(multiplier)
         keywords.extend(energy_attr_keywords)
         values.extend(energy_attr_values)
         space_def = generate_inp_string(doe2_id, 'SPACE', keywords, values)
@@ -673,54 +970,70 @@ def room_to_inp(
         room_defs = [space_def]
     else:
         # create the room polygon string from the geometry
-        room_polygon, pos_info = face_3d_to_inp(r_geo, doe2_id)
-        space_origin, _, _ = pos_info
+        room_polygon = _polygon_to_inp(
+            doe2_id, space_verts, export_view, 'Inward')
         origin = space_origin - floor_origin
         # create the space definition, which includes the position info
         keywords = ['SHAPE', 'POLYGON', 'AZIMUTH', 'X', 'Y', 'Z', 'VOLUME']
         values = ['POLYGON', '"{} Plg"'.format(doe2_id), 0,
                   round(origin.x, GEO_DEC_COUNT), round(origin.y, GEO_DEC_COUNT),
-                  round(origin.z, GEO_DEC_COUNT), round(room.volume, GEO_DEC_COUNT)]
-        if room.multiplier != 1:
+                  round(origin.z, GEO_DEC_COUNT), round(volume, GEO_DEC_COUNT)]
+        if multiplier != 1:
             keywords.append('MULTIPLIER')
-            values.append(room.multiplier)
+            values.append(multiplier)
         keywords.extend(energy_attr_keywords)
         values.extend(energy_attr_values)
         space_def = generate_inp_string(doe2_id, 'SPACE', keywords, values)
         room_polygons = [room_polygon]
         room_defs = [space_def]
 
-    # gather together all face definitions and polygons to define the room
-    for face, f_loc in zip(room.faces, face_locations):
-        # first check if this is a face that should be excluded
-        if isinstance(face.boundary_condition, Surface):
+    # determine the faces to be written, excluding interior faces if requested
+    write_faces = []
+    for i, (face, f_loc) in enumerate(zip(room.faces, face_locations)):
+        face_bc = face.boundary_condition if export_view is None \
+            else export_view.face_boundary_condition(face)
+        if adjacency is not None:
+            if not adjacency.is_written(face.identifier):
+                continue
+        elif isinstance(face_bc, Surface):
             if exclude_interior_walls and isinstance(face.type, Wall):
                 continue
             elif exclude_interior_ceilings and \
                     isinstance(face.type, (Floor, RoofCeiling)):
                 continue
-            if adj_set is not None and face.identifier in adj_set:
-                continue
-            else:
-                adj_set.add(face.boundary_condition.boundary_condition_object)
+            if adj_set is not None:
+                if face.identifier in adj_set:
+                    continue
+                adj_set.add(face_bc.boundary_condition_object)
+        write_faces.append((i, face, f_loc))
+    if export_view is not None:  # project all of the face polygons together
+        poly_faces = [(i, face) for i, face, f_loc in write_faces if f_loc is None]
+        _cache_face_polygons(poly_faces, room_min, prototype, export_view)
+
+    # gather together all face definitions and polygons to define the room
+    for _, face, f_loc in write_faces:
         # add the face definition along with all apertures and doors
-        face_polygon, face_def = face_to_inp(face, space_origin, f_loc)
+        face_polygon, face_def = face_to_inp(face, space_origin, f_loc, export_view)
         if face_polygon != '':
             room_polygons.append(face_polygon)
         room_defs.append(face_def)
         for ap in face.apertures:
-            ap_def = aperture_to_inp(ap)
+            ap_def = aperture_to_inp(ap, export_view)
             room_defs.append(ap_def)
         if not isinstance(face.boundary_condition, Surface):
             for dr in face.doors:
-                dr_def = door_to_inp(dr)
+                dr_def = door_to_inp(dr, export_view)
                 room_defs.append(dr_def)
     return room_polygons, room_defs
 
 
 def model_to_inp(
     model, simulation_par=None, hvac_mapping='Story',
-    exclude_interior_walls=False, exclude_interior_ceilings=False, equest_version=None
+    exclude_interior_walls=False, exclude_interior_ceilings=False, equest_version=None,
+    workers=1, collapse_typical_floors=False, collapse_identical_rooms=False,
+    zoning='Room', aggregate_windows=False, exclude_similar_interior_faces=False,
+    shade_cutoff_angle=None, merge_shades=False, room_cache=None, spool=False,
+    profiler=None, name_map=None, section_hashes=None
 ):
     """Generate an INP string representation of a Model.
 
@@ -730,6 +1043,118 @@ def model_to_inp(
     parameters. Essentially, the string includes everything needed to simulate
     the model.
 
+    Note that the entire INP string is held in memory by this function. For
+    very large models, the write_model_inp function can be used to write
+    the INP directly to a file without building the complete string, which
+    can also compress the INP as it is written.
+
+    The arguments of this function are the same as those of the model_to_inp_iter
+    function, which documents each of them.
+
+    Usage:
+
+    .. code-block:: python
+
+        import os
+        from ladybug.futil import write_to_file
+        from honeybee.model import Model
+        from honeybee.room import Room
+        from honeybee.config import folders
+
+        # Crate an input Model
+        room = Room.from_box('Tiny House Zone', 5, 10, 3)
+        room.properties.energy.program_type = office_program
+        room.properties.energy.add_default_ideal_air()
+        model = Model('Tiny House', [room])
+
+        # create the INP string for the model
+        inp_str = model.to.inp(model)
+
+        # write the final string into an INP
+        inp = os.path.join(folders.default_simulation_folder, 'test_file', 'in.inp')
+        write_to_file(inp, inp_str, True)
+    """
+    blocks = model_to_inp_iter(
+        model, simulation_par=simulation_par, hvac_mapping=hvac_mapping,
+        exclude_interior_walls=exclude_interior_walls,
+        exclude_interior_ceilings=exclude_interior_ceilings,
+        equest_version=equest_version, workers=workers,
+        collapse_typical_floors=collapse_typical_floors,
+        collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+        aggregate_windows=aggregate_windows,
+        exclude_similar_interior_faces=exclude_similar_interior_faces,
+        shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+        room_cache=room_cache, spool=spool, profiler=profiler, name_map=name_map,
+        section_hashes=section_hashes
+    )
+    return ''.join(_windows_inp_blocks(blocks))
+
+
+def write_model_inp(
+    model, inp_file, simulation_par=None, hvac_mapping='Story',
+    exclude_interior_walls=False, exclude_interior_ceilings=False, equest_version=None,
+    workers=1, collapse_typical_floors=False, collapse_identical_rooms=False,
+    zoning='Room', aggregate_windows=False, exclude_similar_interior_faces=False,
+    shade_cutoff_angle=None, merge_shades=False, room_cache=None, spool=False,
+    profiler=None, name_map=None, section_hashes=None
+):
+    """Write the INP representation of a Model to a file object or a file path.
+
+    The INP is written block by block as it is generated such that the complete
+    INP string is never held in memory at once. The line endings of each block
+    are translated to the Windows-compatible line endings expected by DOE-2
+    as they are written, exactly as they are in the string returned from the
+    model_to_inp function. So the file object should be opened in the same
+    way that one would write the model_to_inp string to a file.
+
+    All arguments other than inp_file are the same as those of the
+    model_to_inp_iter function, which documents each of them.
+
+    Args:
+        model: A honeybee Model for which an INP representation will be written.
+        inp_file: A file-like object with a write method, to which the INP
+            will be written. This can also be a text string for the path to
+            an INP file. Paths ending in .gz are compressed with gzip and paths
+            ending in .zst are compressed with zstd as the INP is written,
+            such that the uncompressed INP is never written to disk.
+    """
+    blocks = model_to_inp_iter(
+        model, simulation_par=simulation_par, hvac_mapping=hvac_mapping,
+        exclude_interior_walls=exclude_interior_walls,
+        exclude_interior_ceilings=exclude_interior_ceilings,
+        equest_version=equest_version, workers=workers,
+        collapse_typical_floors=collapse_typical_floors,
+        collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+        aggregate_windows=aggregate_windows,
+        exclude_similar_interior_faces=exclude_similar_interior_faces,
+        shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+        room_cache=room_cache, spool=spool, profiler=profiler, name_map=name_map,
+        section_hashes=section_hashes
+    )
+    if hasattr(inp_file, 'write'):
+        for inp_str in _windows_inp_blocks(blocks):
+            inp_file.write(inp_str)
+    else:  # open the file at the path
+        with open_inp_file(inp_file, 'w') as inp_f:
+            for inp_str in _windows_inp_blocks(blocks):
+                inp_f.write(inp_str)
+
+
+def model_to_inp_iter(
+    model, simulation_par=None, hvac_mapping='Story',
+    exclude_interior_walls=False, exclude_interior_ceilings=False, equest_version=None,
+    workers=1, collapse_typical_floors=False, collapse_identical_rooms=False,
+    zoning='Room', aggregate_windows=False, exclude_similar_interior_faces=False,
+    shade_cutoff_angle=None, merge_shades=False, room_cache=None, spool=False,
+    profiler=None, name_map=None, section_hashes=None
+):
+    """Get a generator of INP strings for each block of a Model.
+
+    The blocks are yielded in the order that they appear in the INP file and
+    joining them together with newline characters will produce the same content
+    as the model_to_inp function (minus the Windows line endings). This allows
+    the INP to be streamed section by section without building one large string.
+
     Args:
         model: A honeybee Model for which an INP representation will be returned.
         simulation_par: A honeybee-doe2 SimulationPar object to specify how the
@@ -755,92 +1180,191 @@ def model_to_inp(
         equest_version: An optional text string to denote the version of eQuest
             for which the INP definition will be generated. If unspecified
             or unrecognized, the latest version of eQuest will be used.
+        workers: An integer for the number of processes to be used to translate
+            the Rooms of the model to INP. Rooms are split into chunks for each
+            DOE-2 level and the resulting definitions are merged back in order
+            such that the INP is identical to one generated with a single process.
+            Note that parallel translation is only available on Linux, where
+            processes can be safely forked, and the Rooms will be translated
+            in the current process on other platforms. (Default: 1).
+        collapse_typical_floors: Boolean to note whether identical DOE-2 levels
+            that are stacked on top of one another should be collapsed into
+            a single typical floor with a FLOOR MULTIPLIER. Levels are identical
+            when their footprints, Room geometry, programs, loads, HVAC and
+            constructions all match. Only the lowest level of each stack is
+            written to the INP and any of its Faces that are adjacent to the
+            other levels of the stack are written as adiabatic. (Default: False).
+        collapse_identical_rooms: Boolean to note whether identical Rooms on
+            the same DOE-2 level should be written as a single SPACE with a
+            MULTIPLIER. Rooms are identical when they are translations of one
+            another with the same boundary conditions, programs, loads, HVAC
+            and constructions. Faces adjacent to the Rooms that are not written
+            are set to be NEXT-TO the Room that represents them. (Default: False).
+        zoning: Text to indicate how the Rooms of the model are zoned in the INP.
+            Room will write each Room of the model as its own SPACE and ZONE.
+            CorePerimeter will replace the Rooms of each DOE-2 level with
+            perimeter zones for each orientation and a core zone, which have
+            the area-weighted loads of the original Rooms. This is intended
+            for fast early-design simulations. Choose from the options
+            below. (Default: Room).
 
-    Usage:
-
-    .. code-block:: python
+            * Room
+            * CorePerimeter
+
+        aggregate_windows: Boolean to note whether all Apertures on each Face
+            should be replaced with one area-equivalent rectangular WINDOW for
+            each window construction on the Face. The WINDOWs span the sill
+            and head heights of the original Apertures such that the glazing
+            ratio and the height of the glazing are preserved. Faces where the
+            aggregated WINDOWs do not fit within the Face geometry keep their
+            original Apertures. This avoids writing many WINDOWs for curtain
+            walls and it speeds up the DOE-2 LOADS calculation. (Default: False).
+        exclude_similar_interior_faces: Boolean to note whether interior Faces
+            between Rooms with the same thermal conditions should be excluded
+            from the INP. Rooms have the same thermal conditions when they are
+            served by the same HVAC system, they are both conditioned or
+            unconditioned and they have the same program, setpoint schedules
+            and load schedules. Heat transfer between such Rooms is negligible
+            and so this excludes many INTERIOR-WALLs while keeping those that
+            border dissimilar Rooms (eg. server rooms or unconditioned spaces).
+            Unlike exclude_interior_walls and exclude_interior_ceilings, this
+            applies to interior Faces of all types. (Default: False).
+        shade_cutoff_angle: An optional number from 0 up to (but not including)
+            90 for the solar altitude in degrees below which the shadows of context
+            shades are neglected. When specified, orphaned Shades and ShadeMesh faces
+            that are below the lowest exterior Face of the Rooms or that are
+            too far from all exterior Faces to cast a shadow on them with the
+            sun above this altitude are not written to the INP. The number of
+            removed shades is recorded as removed_shades in the shades stage of
+            the profiler. A value of 0 only removes the shades below the lowest
+            exterior Face. If None, all shades are written. (Default: None).
+        merge_shades: Boolean to note whether adjacent coplanar context shades
+            should be merged together into larger FIXED-SHADEs. This applies
+            to the faces of each ShadeMesh and to orphaned Shades with the same
+            transmittance schedule. Merged shades that are rectangles are
+            written with SHAPE RECTANGLE. This greatly reduces the number of
+            FIXED-SHADEs written for triangulated context geometry, which
+            speeds up the DOE-2 shading calculation. (Default: False).
+        room_cache: An optional RoomBlockCache or a path to a folder, which will
+            be used to cache the INP polygons and definitions of each Room on
+            disk. Rooms are looked up in the cache with a hash of their geometry,
+            properties, U-Names and the settings of the translation, which
+            also includes the hashes of all adjacent Rooms. So re-exporting
+            the Model after editing a few Rooms only translates the edited
+            Rooms and their neighbors while all other Rooms reuse their cached
+            INP. The number of Rooms taken from the cache is recorded as
+            cached_rooms in the rooms stage of the profiler. The least recently
+            used entries are removed from the cache once it exceeds its
+            max_size. If None, no cache is used. (Default: None).
+        spool: Boolean to note whether the POLYGONs and the definitions of the
+            building geometry should be spooled to temporary files as they are
+            generated instead of being held in memory until they are written.
+            The temporary files are read back in the order required by the
+            INP, such that the result is identical. Used with write_model_inp,
+            this keeps the peak memory of very large models at roughly the
+            INP of one DOE-2 level. (Default: False).
+        profiler: An optional StageProfiler, which will record the wall time,
+            object counts and (optionally) the peak memory of each stage of
+            the translation, such as the export_view, schedules, levels, rooms
+            and shades. POLYGONs with more than the DOE-2 limit of 120 vertices
+            are simplified and the maximum deviation and fractional area
+            change of each is recorded under simplified_polygons in the
+            geometry_output stage. The POLYGONs of Rooms taken from the
+            room_cache are not included since they are not translated
+            again. If None, the translation is not profiled. (Default: None).
+        name_map: An optional dictionary, which will be filled with the mapping
+            between the identifiers of the Model objects and the names used
+            in the INP. This is the inp_name_map of the ExportView used for
+            the translation and it has keys for rooms, faces, apertures, doors,
+            shades, shade_meshes, constructions, materials and schedules. Each
+            of these has a dictionary with the identifiers as keys and the
+            names as values, which can be saved as a sidecar to the INP in
+            order to map simulation results back to the Model. It also has
+            an hvac_systems key with the name of the SYSTEM of each Room,
+            which is added once the Rooms are grouped into HVAC systems
+            while the INP is generated. (Default: None).
+        section_hashes: An optional dictionary, which will be filled with the
+            SHA-256 hex digests of the schedules, constructions, geometry, zones
+            and other sections of the INP once all of its blocks have been
+            generated. The digests are updated as each block is generated and
+            they are the same as those returned from the inp_section_hashes
+            function for the finished INP, which can be compared to those of a
+            previous export to check which sections have changed. (Default: None).
 
-        import os
-        from ladybug.futil import write_to_file
-        from honeybee.model import Model
-        from honeybee.room import Room
-        from honeybee.config import folders
+    Returns:
+        A generator of text strings, each of which is a block of the INP file.
+        Line endings within each block are a single newline character.
+    """
+    blocks = _model_to_inp_blocks(
+        model, simulation_par=simulation_par, hvac_mapping=hvac_mapping,
+        exclude_interior_walls=exclude_interior_walls,
+        exclude_interior_ceilings=exclude_interior_ceilings,
+        equest_version=equest_version, workers=workers,
+        collapse_typical_floors=collapse_typical_floors,
+        collapse_identical_rooms=collapse_identical_rooms, zoning=zoning,
+        aggregate_windows=aggregate_windows,
+        exclude_similar_interior_faces=exclude_similar_interior_faces,
+        shade_cutoff_angle=shade_cutoff_angle, merge_shades=merge_shades,
+        room_cache=room_cache, spool=spool, profiler=profiler, name_map=name_map
+    )
+    if section_hashes is not None:
+        blocks = _section_hashed_inp_blocks(blocks, section_hashes)
+    if profiler is None:
+        return blocks
+    # exclude the time spent by the consumer of the blocks from the stages
+    return profiler.profile_blocks(blocks)
 
-        # Crate an input Model
-        room = Room.from_box('Tiny House Zone', 5, 10, 3)
-        room.properties.energy.program_type = office_program
-        room.properties.energy.add_default_ideal_air()
-        model = Model('Tiny House', [room])
 
-        # create the INP string for the model
-        inp_str = model.to.inp(model)
+def _model_to_inp_blocks(
+    model, simulation_par=None, hvac_mapping='Story',
+    exclude_interior_walls=False, exclude_interior_ceilings=False, equest_version=None,
+    workers=1, collapse_typical_floors=False, collapse_identical_rooms=False,
+    zoning='Room', aggregate_windows=False, exclude_similar_interior_faces=False,
+    shade_cutoff_angle=None, merge_shades=False, room_cache=None, spool=False,
+    profiler=None, name_map=None
+):
+    """Generate the INP blocks of a Model using the inputs of model_to_inp_iter.
 
-        # write the final string into an INP
-        inp = os.path.join(folders.default_simulation_folder, 'test_file', 'in.inp')
-        write_to_file(inp, inp_str, True)
+    All arguments after the model should be passed by keyword.
     """
-    # duplicate model to avoid mutating it as we edit it for INP export
-    original_model = model
-    model = model.duplicate()
-    # scale the model if the units are not feet
-    if model.units != 'Feet':
-        model.convert_to_units('Feet')
-    # remove degenerate geometry within native DOE-2 tolerance
-    try:
-        model.remove_degenerate_geometry(DOE2_TOLERANCE)
-    except ValueError:
-        error = 'Failed to remove degenerate Rooms.\nYour Model units system is: {}. ' \
-            'Is this correct?'.format(original_model.units)
-        raise ValueError(error)
-    # remove interior sub-faces as they cannot be placed in INP extrusion walls
-    for face in model.faces:
-        if isinstance(face.boundary_condition, Surface) and face.has_sub_faces:
-            face.remove_sub_faces()
-    # convert all of the Aperture geometries to rectangles so they can be translated
-    model.rectangularize_apertures(
-        subdivision_distance=RECT_WIN_SUBD, max_separation=0.0,
-        merge_all=True, resolve_adjacency=False
-    )
-    # reset identifiers to valid DOE-2 U-Names that are derived from the display names
-    for room in model.rooms:
-        base_name = clean_doe2_string(room.display_name, GEO_CHARS - 2)
-        room.display_name = clean_string(base_name)
-        for face in room.faces:
-            base_name = clean_doe2_string(face.display_name, GEO_CHARS - 2)
-            face.display_name = clean_string(base_name)
-            for ap in face.apertures:
-                base_name = clean_doe2_string(ap.display_name, GEO_CHARS - 2)
-                ap.display_name = clean_string(base_name)
-            for dr in face.doors:
-                base_name = clean_doe2_string(dr.display_name, GEO_CHARS - 2)
-                dr.display_name = clean_string(base_name)
-    for shade in model.shades:
-        base_name = clean_doe2_string(shade.display_name, GEO_CHARS - 2)
-        shade.display_name = clean_string(base_name)
-    for shd_mesh in model.shade_meshes:
-        base_name = clean_doe2_string(shd_mesh.display_name, GEO_CHARS - 2)
-        shd_mesh.display_name = clean_string(base_name)
-    model.reset_ids()
-    # assign any doe2 properties previously supported through user_data
-    for room in model.rooms:
-        room.properties.doe2.apply_properties_from_user_data()
+    # check that the zoning is recognized before doing any of the translation
+    clean_zoning = zoning.upper().replace('-', '').replace(' ', '')
+    if clean_zoning not in ('ROOM', 'COREPERIMETER'):
+        msg = 'Zoning "{}" is not recognized. Choose from: Room, ' \
+            'CorePerimeter.'.format(zoning)
+        raise ValueError(msg)
+
+    # prepare a view of the model for INP export, which avoids mutating the model
+    if profiler is not None:
+        profiler.start_stage('export_view', len(model.rooms))
+    export_view = ExportView(model, aggregate_windows)
+    if clean_zoning == 'COREPERIMETER':
+        if profiler is not None:
+            profiler.start_stage('core_perimeter', len(model.rooms))
+        export_view = ExportView(
+            model_to_core_perimeter(export_view.model), aggregate_windows)
+    model = export_view.model
+    if name_map is not None:
+        name_map.update(export_view.inp_name_map())
 
     # write the simulation parameters into the string
-    model_str = ['INPUT ..\n\n']
+    yield 'INPUT ..\n\n'
     sim_par = simulation_par if simulation_par is not None else SimulationPar()
-    model_str.append(sim_par.to_inp())
+    yield sim_par.to_inp()
 
     # write all of the schedules
     all_day_scheds, all_week_scheds, all_year_scheds = [], [], []
     used_day_sched_ids, used_day_count = {}, 1
-    all_scheds = model.properties.energy.schedules
+    all_scheds = sorted(model.properties.energy.schedules, key=lambda s: s.identifier)
+    if profiler is not None:
+        profiler.start_stage('schedules', len(all_scheds))
     for sched in all_scheds:
         if isinstance(sched, ScheduleRuleset):
             year_schedule, week_schedules = sched.to_inp()
             # check that day schedules aren't referenced by other model schedules
             day_scheds = []
             for day in sched.day_schedules:
-                sch_doe2_id = clean_doe2_string(day.identifier, RES_CHARS)
+                sch_doe2_id = export_view.doe2_name(day.identifier, RES_CHARS)
                 if sch_doe2_id not in used_day_sched_ids:
                     day_scheds.append(day.to_inp(sched.schedule_type_limit))
                     used_day_sched_ids[sch_doe2_id] = day
@@ -849,8 +1373,9 @@ def model_to_inp(
                     new_day.identifier = 'Schedule Day {}'.format(used_day_count)
                     day_scheds.append(new_day.to_inp(sched.schedule_type_limit))
                     for i, week_sch in enumerate(week_schedules):
-                        old_day_id = clean_doe2_string(day.identifier, RES_CHARS)
-                        new_day_id = clean_doe2_string(new_day.identifier, RES_CHARS)
+                        old_day_id = export_view.doe2_name(day.identifier, RES_CHARS)
+                        new_day_id = \
+                            export_view.doe2_name(new_day.identifier, RES_CHARS)
                         week_schedules[i] = week_sch.replace(old_day_id, new_day_id)
                     used_day_count += 1
             all_day_scheds.extend(day_scheds)
@@ -861,51 +1386,135 @@ def model_to_inp(
             all_day_scheds.extend(day_scheds)
             all_week_scheds.extend(week_schedules)
             all_year_scheds.append(year_schedule)
-    model_str.append(header_comment_minor('Day Schedules'))
-    model_str.extend(all_day_scheds)
-    model_str.append(header_comment_minor('Week Schedules'))
-    model_str.extend(all_week_scheds)
-    model_str.append(header_comment_minor('Annual Schedules'))
-    model_str.extend(all_year_scheds)
+    yield header_comment_minor('Day Schedules')
+    for day_sch in all_day_scheds:
+        yield day_sch
+    yield header_comment_minor('Week Schedules')
+    for week_sch in all_week_scheds:
+        yield week_sch
+    yield header_comment_minor('Annual Schedules')
+    for year_sch in all_year_scheds:
+        yield year_sch
 
     # write all of the materials and constructions
-    window_constructions = model.properties.energy.aperture_constructions()
-    door_constructions = model.properties.energy.door_constructions()
+    if profiler is not None:
+        profiler.start_stage('constructions')
+    window_constructions = sorted(
+        model.properties.energy.aperture_constructions(), key=lambda c: c.identifier)
+    door_constructions = sorted(
+        model.properties.energy.door_constructions(), key=lambda c: c.identifier)
     drc_ids = set([con.identifier for con in door_constructions])
     materials = []
     construction_strs = []
     all_constrs = model.properties.energy.constructions + \
         generic_construction_set.constructions_unique
-    for constr in set(all_constrs):
+    # sort the unique items such that they are always written in the same order
+    all_constrs = sorted(set(all_constrs), key=lambda c: c.identifier)
+    for constr in all_constrs:
         if isinstance(constr, OpaqueConstruction) and constr.identifier not in drc_ids:
             materials.extend(constr.materials)
             construction_strs.append(opaque_construction_to_inp(constr))
         elif isinstance(constr, AirBoundaryConstruction):
             construction_strs.append(air_construction_to_inp(constr))
-    model_str.append(header_comment_minor('Materials / Layers / Constructions'))
-    model_str.extend([opaque_material_to_inp(mat) for mat in set(materials)])
-    model_str.extend(construction_strs)
-    model_str.append(header_comment_minor('Glass Types'))
+    yield header_comment_minor('Materials / Layers / Constructions')
+    for mat in sorted(set(materials), key=lambda m: m.identifier):
+        yield opaque_material_to_inp(mat)
+    for constr_str in construction_strs:
+        yield constr_str
+    yield header_comment_minor('Glass Types')
     for w_con in window_constructions:
-        model_str.append(window_construction_to_inp(w_con))
-    model_str.append(header_comment_minor('Door Construction'))
+        yield window_construction_to_inp(w_con)
+    yield header_comment_minor('Door Construction')
     for dr_con in door_constructions:
         if not isinstance(dr_con, OpaqueConstruction):
             dr_con = dr_con.duplicate()
             dr_con.identifier = dr_con.identifier + '_d'
-        model_str.append(door_construction_to_inp(dr_con))
+        yield door_construction_to_inp(dr_con)
 
     # gather together all of the program types in a dictionary for switch statements
     switch_dict = {}
-    for program in model.properties.energy.program_types:
+    programs = sorted(model.properties.energy.program_types, key=lambda p: p.identifier)
+    if profiler is not None:
+        profiler.start_stage('program_types', len(programs))
+    for program in programs:
         program_type_to_inp(program, switch_dict)
 
     # loop through rooms grouped by floor level and boundary to get polygons
-    adj_set = set()
-    level_room_groups, level_geos, level_names = \
-        group_rooms_by_doe2_level(model.rooms, model.tolerance)
-    bldg_polygons, bldg_geo_defs = [], []
-    for flr_rooms, flr_geo, flr_name in zip(level_room_groups, level_geos, level_names):
+    if profiler is not None:
+        profiler.start_stage('levels', len(model.rooms))
+    level_groups = _precomputed_levels(export_view)
+    if level_groups is None:  # group the rooms by level using their geometry
+        level_groups = group_rooms_by_doe2_level(model.rooms, model.tolerance)
+    level_room_groups, level_geos, level_names = level_groups
+    # removed rooms are mapped to the identifier of the room that represents them
+    level_mults, removed_rooms = [1] * len(level_room_groups), {}
+    if collapse_typical_floors:  # only write the lowest of each stack of typical floors
+        level_mults = typical_floor_multipliers(level_room_groups, level_geos)
+        for flr_rooms, flr_mult in zip(level_room_groups, level_mults):
+            if flr_mult == 0:
+                for room in flr_rooms:
+                    removed_rooms[room.identifier] = None
+        kept_i = [i for i, flr_mult in enumerate(level_mults) if flr_mult != 0]
+        level_room_groups = [level_room_groups[i] for i in kept_i]
+        level_geos = [level_geos[i] for i in kept_i]
+        level_names = [level_names[i] for i in kept_i]
+        level_mults = [level_mults[i] for i in kept_i]
+    if collapse_identical_rooms:  # only write the first of each set of identical rooms
+        for i, flr_rooms in enumerate(level_room_groups):
+            base_rooms = []
+            for room_group in group_identical_rooms(flr_rooms):
+                base_room = room_group[0]
+                base_rooms.append(base_room)
+                if len(room_group) == 1:
+                    continue
+                export_view.set_room_multiplier(
+                    base_room, base_room.multiplier * len(room_group))
+                for room in room_group[1:]:
+                    removed_rooms[room.identifier] = base_room.identifier
+            level_room_groups[i] = base_rooms
+    if len(removed_rooms) != 0:  # rewire the faces adjacent to the removed rooms
+        _rewire_removed_adjacencies(level_room_groups, removed_rooms, export_view)
+
+    # group the rooms into HVAC systems given the specified hvac_mapping
+    if profiler is not None:
+        profiler.start_stage('hvac_systems', len(model.rooms))
+    if hvac_mapping.upper() == 'STORY':
+        hvac_rooms = level_room_groups
+        hvac_names = ['{}_Sys'.format(name) for name in level_names]
+    elif hvac_mapping.upper().replace('-', '').replace(' ', '') == 'ROOM':
+        hvac_rooms = [[room] for room in model.rooms]
+        hvac_names = [
+            export_view.doe2_name(
+                '{}_Sys'.format(export_view.room_identifier(room.identifier)), RES_CHARS)
+            for room in model.rooms
+        ]
+    else:
+        hvac_rooms, hvac_names = group_rooms_by_doe2_hvac(model, hvac_mapping)
+    if len(removed_rooms) != 0:  # remove the zones of the collapsed rooms
+        hvac_rooms = [[room for room in rooms if room.identifier not in removed_rooms]
+                      for rooms in hvac_rooms]
+        hvac_names = [name for name, rooms in zip(hvac_names, hvac_rooms) if rooms]
+        hvac_rooms = [rooms for rooms in hvac_rooms if rooms]
+    if name_map is not None:
+        name_map['hvac_systems'] = {room.identifier: hvac_name for hvac_name, rooms
+                                    in zip(hvac_names, hvac_rooms) for room in rooms}
+
+    # determine the interior faces that are not written to the INP
+    if profiler is not None:
+        profiler.start_stage('interior_faces', len(model.rooms))
+    similar_rooms = group_rooms_by_thermal_conditions(hvac_rooms) \
+        if exclude_similar_interior_faces else None
+    adjacency = AdjacencyIndex(
+        [room for flr_rooms in level_room_groups for room in flr_rooms],
+        exclude_interior_walls, exclude_interior_ceilings, similar_rooms, export_view)
+    if profiler is not None:
+        profiler.start_stage('floors', len(level_room_groups))
+    chunk_size = None
+    if workers > 1:  # split the rooms into chunks that can be balanced across workers
+        chunk_size = int(math.ceil(len(model.rooms) / (workers * 4)))
+    flr_polygons, flr_defs, flr_chunk_counts, room_chunks = [], [], [], []
+    level_data = zip(level_room_groups, level_geos, level_names, level_mults)
+    for flr_rooms, flr_geo, flr_name, flr_mult in level_data:
         # create the story definition
         rooms_f2c = [room.max.z - room.min.z for room in flr_rooms]
         sotry_f2f = max(rooms_f2c)
@@ -922,90 +1531,161 @@ def model_to_inp(
                         round(flr_volume, GEO_DEC_COUNT), 0,
                         flr_origin.x, flr_origin.y, flr_origin.z,
                         round(median_room_f2c, 3), round(sotry_f2f, 3)]
+            flr_polygon = None
         else:  # write the level with a POLYGON
-            flr_polygon, pos_info = face_3d_to_inp(flr_geo, flr_name)
+            flr_verts, pos_info = _face_3d_polygon_vertices(flr_geo)
+            flr_polygon = _polygon_to_inp(flr_name, flr_verts, export_view, 'Outward')
             flr_origin, _, _ = pos_info
             flr_keys = ['SHAPE', 'POLYGON', 'AZIMUTH', 'X', 'Y', 'Z',
                         'SPACE-HEIGHT', 'FLOOR-HEIGHT']
             flr_vals = ['POLYGON', '"{} Plg"'.format(flr_name), 0,
                         flr_origin.x, flr_origin.y, flr_origin.z,
                         round(median_room_f2c, 3), round(sotry_f2f, 3)]
-            bldg_polygons.append(flr_polygon)
-        r_mult = flr_rooms[0].multiplier
-        if r_mult != 1 and all(room.multiplier == r_mult for room in flr_rooms):
+        r_mult = export_view.room_multiplier(flr_rooms[0])
+        if r_mult != 1 and \
+                all(export_view.room_multiplier(room) == r_mult for room in flr_rooms):
             # set the multiplier for the entire story instead of room-by-room
-            flr_keys.append('MULTIPLIER')
-            flr_vals.append(r_mult)
+            flr_mult = flr_mult * r_mult
             for room in flr_rooms:
-                room.multiplier = 1
-        flr_def = generate_inp_string(flr_name, 'FLOOR', flr_keys, flr_vals)
-        bldg_geo_defs.append(flr_def)
-        # add the room and face definitions + polygons
-        for room in flr_rooms:
-            room_polygons, room_defs = room_to_inp(
-                room, flr_origin, median_room_f2c,
-                exclude_interior_walls, exclude_interior_ceilings, adj_set
-            )
-            bldg_polygons.extend(room_polygons)
-            bldg_geo_defs.extend(room_defs)
-
-    # loop through the shades and get their definitions and polygons
-    shade_polygons, shade_geo_defs = [], []
-    for shade in model.shades:
-        shade_polygon, shade_def = shade_to_inp(shade, equest_version)
-        if shade_polygon != '':  # shade written with a RECTANGLE
-            shade_polygons.append(shade_polygon)
-        shade_geo_defs.append(shade_def)
-    for shade in model.shade_meshes:
-        shade_polygon, shade_def = shade_mesh_to_inp(shade, equest_version)
-        shade_polygons.extend(shade_polygon)
-        shade_geo_defs.extend(shade_def)
-
-    # write the building and shade geometry into the INP
-    model_str.append(header_comment_minor('Polygons'))
-    model_str.extend(bldg_polygons)
-    model_str.append(header_comment_minor('Wall Parameters'))
-    model_str.append(header_comment_minor('Fixed and Building Shades'))
-    model_str.extend(shade_polygons)
-    model_str.extend(shade_geo_defs)
-    model_str.append(header_comment_minor('Misc Cost Related Objects'))
-    model_str.append(header_comment_major('Performance Curves'))
-    model_str.append(header_comment_major('Floors / Spaces / Walls / Windows / Doors'))
-    model_str.append(switch_dict_to_space_inp(switch_dict))
-    model_str.extend(bldg_geo_defs)
+                export_view.set_room_multiplier(room, 1)
+        if flr_mult != 1:
+            flr_keys.append('MULTIPLIER')
+            flr_vals.append(flr_mult)
+        flr_polygons.append(flr_polygon)
+        flr_defs.append(generate_inp_string(flr_name, 'FLOOR', flr_keys, flr_vals))
+        # collect the rooms of the level into chunks to be translated
+        flr_chunk_size = chunk_size or len(flr_rooms)
+        flr_chunk_counts.append(0)
+        for i in range(0, len(flr_rooms), flr_chunk_size):
+            room_chunks.append((
+                flr_rooms[i:i + flr_chunk_size], flr_origin, median_room_f2c,
+                exclude_interior_walls, exclude_interior_ceilings, adjacency,
+                export_view
+            ))
+            flr_chunk_counts[-1] += 1
+
+    # if a room cache is used, get the keys of each room in the cache
+    room_count = sum(len(chunk[0]) for chunk in room_chunks)
+    if room_cache is not None:
+        if profiler is not None:
+            profiler.start_stage('room_cache', room_count)
+        if not isinstance(room_cache, RoomBlockCache):
+            room_cache = RoomBlockCache(room_cache)
+        room_keys = _room_cache_keys(room_chunks)
+        room_chunks = [chunk + (keys, room_cache)
+                       for chunk, keys in zip(room_chunks, room_keys)]
+
+    # translate the rooms and add their definitions + polygons after each story
+    if profiler is not None:
+        profiler.start_stage('rooms', room_count)
+    spools = []  # temporary files that are deleted even if the export is abandoned
+    chunk_results = None  # generator that shuts down any worker processes on close
+    try:
+        if spool:  # write the blocks to temporary files instead of holding them
+            for _ in range(4):
+                spools.append(InpBlockSpool())
+            bldg_polygons, bldg_geo_defs, shade_polygons, shade_geo_defs = spools
+        else:
+            bldg_polygons, bldg_geo_defs, shade_polygons, shade_geo_defs = \
+                [], [], [], []
+        chunk_results = _room_chunks_to_inp(room_chunks, workers)
+        flr_data = zip(flr_polygons, flr_defs, flr_chunk_counts)
+        cached_count = 0
+        for flr_polygon, flr_def, chunk_count in flr_data:
+            if flr_polygon is not None:
+                bldg_polygons.append(flr_polygon)
+            bldg_geo_defs.append(flr_def)
+            for _ in range(chunk_count):
+                room_polygons, room_defs, chunk_cached = next(chunk_results)
+                bldg_polygons.extend(room_polygons)
+                bldg_geo_defs.extend(room_defs)
+                cached_count += chunk_cached
+        chunk_results.close()
+        if room_cache is not None:
+            room_cache.evict()
+            if profiler is not None:
+                profiler.record('cached_rooms', cached_count)
+
+        # remove any context shades that cannot cast a shadow on the building
+        shades, shade_meshes = model.shades, model.shade_meshes
+        if profiler is not None:
+            profiler.start_stage('shades', len(shades) + len(shade_meshes))
+        if shade_cutoff_angle is not None:
+            shades, shade_meshes, removed_count = \
+                cull_shades(model, shade_cutoff_angle, model.tolerance)
+            if profiler is not None:
+                profiler.record('removed_shades', removed_count)
+        if merge_shades:  # merge adjacent coplanar shades
+            shades = merge_coplanar_shades(shades, DOE2_TOLERANCE, DOE2_ANGLE_TOL)
+
+        # loop through the shades and get their definitions and polygons
+        for shade in shades:
+            shade_polygon, shade_def = shade_to_inp(shade, equest_version, export_view)
+            if shade_polygon != '':  # shade written with a RECTANGLE
+                shade_polygons.append(shade_polygon)
+            shade_geo_defs.append(shade_def)
+        for shade in shade_meshes:
+            shade_polygon, shade_def = \
+                shade_mesh_to_inp(shade, equest_version, export_view, merge_shades)
+            shade_polygons.extend(shade_polygon)
+            shade_geo_defs.extend(shade_def)
+
+        # write the building and shade geometry into the INP
+        if profiler is not None:
+            profiler.start_stage(
+                'geometry_output', len(bldg_polygons) + len(bldg_geo_defs))
+            profiler.record('simplified_polygons', export_view.simplified_polygons)
+        yield header_comment_minor('Polygons')
+        for bldg_polygon in bldg_polygons:
+            yield bldg_polygon
+        yield header_comment_minor('Wall Parameters')
+        yield header_comment_minor('Fixed and Building Shades')
+        for shade_polygon in shade_polygons:
+            yield shade_polygon
+        for shade_def in shade_geo_defs:
+            yield shade_def
+        yield header_comment_minor('Misc Cost Related Objects')
+        yield header_comment_major('Performance Curves')
+        yield header_comment_major('Floors / Spaces / Walls / Windows / Doors')
+        yield switch_dict_to_space_inp(switch_dict)
+        for geo_def in bldg_geo_defs:
+            yield geo_def
+    finally:
+        if chunk_results is not None:
+            chunk_results.close()
+        for block_spool in spools:  # delete the temporary files
+            block_spool.close()
 
     # write in placeholder headers for various HVAC components
-    model_str.append(header_comment_major('Electric & Fuel Meters'))
+    yield header_comment_major('Electric & Fuel Meters')
     for meter in ('Electric Meters', 'Fuel Meters', 'Master Meters'):
-        model_str.append(header_comment_minor(meter))
-    model_str.append(header_comment_major('HVAC Circulation Loops / Plant Equipment'))
+        yield header_comment_minor(meter)
+    yield header_comment_major('HVAC Circulation Loops / Plant Equipment')
     hvac_comp_types = (
         'Pumps', 'Heat Exchangers', 'Circulation Loops', 'Chillers', 'Boilers',
         'Domestic Water Heaters', 'Heat Rejection', 'Tower Free Cooling',
         'Photovoltaic Modules', 'Electric Generators', 'Thermal Storage',
         'Ground Loop Heat Exchangers', 'Compliance DHW (residential dwelling units)')
     for comp in hvac_comp_types:
-        model_str.append(header_comment_minor(comp))
-    model_str.append(header_comment_major('Steam & Chilled Water Meters'))
-    model_str.append(header_comment_minor('Steam Meters'))
-    model_str.append(header_comment_minor('Chilled Water Meters'))
-    model_str.append(header_comment_major('HVAC Systems / Zones'))
-    model_str.append(switch_dict_to_zone_inp(switch_dict))
-
-    # assign HVAC systems given the specified hvac_mapping
-    if hvac_mapping.upper() == 'STORY':
-        hvac_rooms = level_room_groups
-        hvac_names = ['{}_Sys'.format(name) for name in level_names]
-    else:
-        hvac_rooms, hvac_names = group_rooms_by_doe2_hvac(model, hvac_mapping)
+        yield header_comment_minor(comp)
+    yield header_comment_major('Steam & Chilled Water Meters')
+    yield header_comment_minor('Steam Meters')
+    yield header_comment_minor('Chilled Water Meters')
+    if profiler is not None:
+        profiler.start_stage('zones', sum(len(rooms) for rooms in hvac_rooms))
+    yield header_comment_major('HVAC Systems / Zones')
+    yield switch_dict_to_zone_inp(switch_dict)
+
+    # write the HVAC systems and their zones
     for hvac_name, rooms in zip(hvac_names, hvac_rooms):
         # create the definition of the HVAC
         hvac_keys = ('TYPE', 'HEAT-SOURCE', 'SYSTEM-REPORTS')
         hvac_vals = ('SUM', 'NONE', 'NO')
         hvac_def = generate_inp_string(hvac_name, 'SYSTEM', hvac_keys, hvac_vals)
-        model_str.append(hvac_def)
+        yield hvac_def
         for room in rooms:
-            space_name = clean_doe2_string(room.identifier, GEO_CHARS)
+            room_id = export_view.room_identifier(room.identifier)
+            space_name = export_view.doe2_name(room_id, GEO_CHARS)
             zone_name = '{}_Zn'.format(space_name)
             zone_type = room_doe2_conditioning_type(room)
             zone_keys = ['TYPE', 'SIZING-OPTION', 'SPACE']
@@ -1018,33 +1698,471 @@ def model_to_inp(
                 vt_kwd, vt_val = ventilation_to_inp(room.properties.energy._ventilation)
                 zone_keys.extend(vt_kwd)
                 zone_vals.extend(vt_val)
-                hvac_kwd, hvac_val = room.properties.doe2.to_inp()
+                # assign any doe2 properties previously supported through user_data
+                doe2_props = room.properties.doe2.duplicate()
+                doe2_props.apply_properties_from_user_data()
+                hvac_kwd, hvac_val = doe2_props.to_inp()
                 zone_keys.extend(hvac_kwd)
                 zone_vals.extend(hvac_val)
             zone_def = generate_inp_string(zone_name, 'ZONE', zone_keys, zone_vals)
-            model_str.append(zone_def)
+            yield zone_def
 
     # provide a few last comment headers and end the file
-    model_str.append(header_comment_major('Metering & Misc HVAC'))
-    model_str.append(header_comment_minor('Equipment Controls'))
-    model_str.append(header_comment_minor('Load Management'))
-    model_str.append(header_comment_major('Utility Rates'))
+    yield header_comment_major('Metering & Misc HVAC')
+    yield header_comment_minor('Equipment Controls')
+    yield header_comment_minor('Load Management')
+    yield header_comment_major('Utility Rates')
     for rate in ('Ratchets', 'Block Charges', 'Utility Rates'):
-        model_str.append(header_comment_minor(rate))
-    model_str.append(header_comment_major('Output Reporting'))
+        yield header_comment_minor(rate)
+    yield header_comment_major('Output Reporting')
     report_types = (
         'Loads Non-Hourly Reporting', 'Systems Non-Hourly Reporting',
         'Plant Non-Hourly Reporting', 'Economics Non-Hourly Reporting',
         'Hourly Reporting', 'THE END')
     for report in report_types:
-        model_str.append(header_comment_minor(report))
-    model_str.append('END ..\nCOMPUTE ..\nSTOP ..\n')
-
-    # create the final string and ensure that it is windows-compatible
-    inp_str = '\n'.join(model_str)
-    if os.name != 'nt':  # we are on a unix-based system
-        inp_str = inp_str.replace('\n', '\r\n')
-    return inp_str
+        yield header_comment_minor(report)
+    yield 'END ..\nCOMPUTE ..\nSTOP ..\n'
+
+
+def _room_space_geometry(room, floor_height=None, export_view=None):
+    """Get the LOCATION of each Face of a Room and the vertices of its SPACE polygon.
+
+    The precomputed_geometry of the Room is used whenever it still applies
+    to the Room geometry and the floor_height. Otherwise, the geometry is analyzed.
+
+    Returns:
+        A tuple with three elements.
+
+        -   face_locations: A list that aligns with the Room.faces and contains
+            the LOCATION of each Face in the SPACE polygon or None if the Face
+            must be written with its own POLYGON.
+
+        -   space_verts: A list of (x, y) tuples for the vertices of the SPACE
+            POLYGON or None if the Room must be written with NO-SHAPE.
+
+        -   space_origin: A Point3D for the origin of the SPACE POLYGON or None
+            if the Room must be written with NO-SHAPE.
+    """
+    pre_geo = room_precomputed_geometry(room)
+    if pre_geo is not None:
+        dec_count = GEO_DEC_COUNT + 2
+        pre_height, flr_height = pre_geo['floor_height'], floor_height
+        if pre_height is not None:
+            pre_height = round(pre_height, dec_count)
+        if flr_height is not None:
+            flr_height = round(flr_height, dec_count)
+        face_ids = tuple(face.identifier for face in room.faces)
+        if pre_height == flr_height and face_ids == pre_geo['face_identifiers']:
+            face_locations, r_geo = list(pre_geo['face_locations']), \
+                pre_geo['space_polygon']
+            if r_geo is None:
+                return face_locations, None, None
+            # the boundary is already ordered from the lower-left corner
+            space_origin = _round_origin(r_geo.lower_left_corner)
+            space_verts = [(pt.x - space_origin.x, pt.y - space_origin.y)
+                           for pt in r_geo.boundary]
+            return face_locations, space_verts, space_origin
+    face_locations, r_geo = _room_face_locations_and_boundary(
+        room, floor_height, export_view)
+    if r_geo is None:
+        return face_locations, None, None
+    space_verts, (space_origin, _, _) = _face_3d_polygon_vertices(r_geo)
+    return face_locations, space_verts, space_origin
+
+
+def _room_face_locations_and_boundary(room, floor_height=None, export_view=None):
+    """Get the LOCATION of each Face of a Room and the Room's horizontal boundary.
+
+    Returns:
+        A tuple with two elements.
+
+        -   face_locations: A list that aligns with the Room.faces and contains
+            the LOCATION of each Face in the SPACE polygon or None if the Face
+            must be written with its own POLYGON.
+
+        -   r_geo: A Face3D for the SPACE polygon of the Room or None if the
+            Room must be written with NO-SHAPE.
+    """
+    _, face_locations, r_geo = room_geometry_analysis(room, floor_height, export_view)
+    return face_locations, r_geo
+
+
+def _precomputed_levels(export_view):
+    """Get the levels of an ExportView from the precomputed levels of its host Model.
+
+    Returns:
+        A tuple with the Rooms, geometries and names of the levels, which has
+        the same structure as the result of group_rooms_by_doe2_level. None
+        will be returned if the host Model has no precomputed levels, the
+        levels do not contain exactly the Rooms of the ExportView or the
+        geometry of any Room has changed since the levels were computed.
+    """
+    levels = export_view.host.properties.doe2.precomputed_levels
+    if levels is None:
+        return None
+    rooms = {room.identifier: room for room in export_view.model.rooms}
+    level_ids = [room_id for level in levels for room_id in level['rooms']]
+    if len(level_ids) != len(rooms) or set(level_ids) != set(rooms):
+        return None
+    for level in levels:
+        lvl_rooms = [rooms[room_id] for room_id in level['rooms']]
+        if level['geometry_stamp'] != level_geometry_stamp(lvl_rooms):
+            return None
+    room_groups, level_geometries, level_names = [], [], []
+    for level in levels:
+        room_groups.append([rooms[room_id] for room_id in level['rooms']])
+        flr_geo = level['geometry']
+        if flr_geo is not None and export_view.scale_factor != 1:
+            flr_geo = flr_geo.scale(export_view.scale_factor)
+        level_geometries.append(flr_geo)
+        level_names.append(level['name'])
+    return room_groups, level_geometries, level_names
+
+
+def _doe2_name(identifier, char_limit, export_view=None):
+    """Get a DOE-2 name from an identifier, using the name table of any export_view."""
+    if export_view is None:
+        return clean_doe2_string(identifier, char_limit)
+    return export_view.doe2_name(identifier, char_limit)
+
+
+def _cache_face_polygons(indexed_faces, room_min, prototype, export_view):
+    """Translate the POLYGONs of several Room Faces together and cache them on the view.
+
+    POLYGONs that have already been translated for a congruent Room are taken
+    from the prototype cache and only their origins are moved. All other
+    POLYGONs are added to the prototype cache after they are translated.
+
+    Args:
+        indexed_faces: A list of tuples with the index of each Face in its
+            parent Room and the Face itself.
+        room_min: A Point3D for the minimum of the parent Room.
+        prototype: A dictionary from _room_prototype_cache for the parent Room.
+        export_view: The ExportView to which the Faces belong.
+    """
+    proto_faces = prototype.setdefault('faces', {})
+    new_faces, face_geos = [], []
+    for i, face in indexed_faces:
+        cache = face_geometry_cache(face, export_view)
+        try:  # reuse the polygon of the congruent Room
+            vertices, (rel_origin, tilt, azimuth) = proto_faces[i]
+            origin = _round_origin(room_min + rel_origin)
+            cache['polygon'] = (vertices, (origin, tilt, azimuth))
+            continue
+        except KeyError:  # the polygon has not yet been translated
+            pass
+        try:
+            face_geos.append(clean_face_geometry(face, export_view))
+        except AssertionError:  # degenerate face; let face_to_inp handle it
+            continue
+        new_faces.append((i, cache))
+    polygons = _face_3ds_polygon_vertices(face_geos)
+    for (i, cache), (vertices, pos_info) in zip(new_faces, polygons):
+        cache['polygon'] = (vertices, pos_info)
+        origin, tilt, azimuth = pos_info
+        proto_faces[i] = (vertices, (origin - room_min, tilt, azimuth))
+
+
+def _room_prototype_cache(room, room_min, floor_height=None, export_view=None):
+    """Get a dictionary to cache geometry shared by Rooms that are translations.
+
+    Rooms are considered congruent when the vertices of all of their Faces
+    are the same relative to the Room minimum, which is evaluated with more
+    decimal places than are written to the INP. Rooms with a user-specified
+    space_polygon_geometry are never considered congruent.
+
+    Args:
+        room: A Honeybee Room in the export_view.
+        room_min: A Point3D for the minimum of the Room.
+        floor_height: The SPACE-HEIGHT of the parent story or None.
+        export_view: The ExportView to which the Room belongs. If None, an
+            empty dictionary that is not shared with other Rooms is returned.
+    """
+    if export_view is None or room.properties.doe2.space_polygon_geometry is not None:
+        return {}
+    dec_count = GEO_DEC_COUNT + 2
+    min_x, min_y, min_z = room_min.x, room_min.y, room_min.z
+    key = [None if floor_height is None else round(floor_height, dec_count)]
+    for face in room.faces:
+        key.append(tuple(
+            (round(pt.x - min_x, dec_count), round(pt.y - min_y, dec_count),
+             round(pt.z - min_z, dec_count))
+            for pt in face.geometry.vertices
+        ))
+    return export_view.room_prototype_cache(tuple(key))
+
+
+def _sub_face_reference_plane(sub_face, export_view=None):
+    """Get the Plane in which the X and Y of an Aperture or Door are evaluated.
+
+    The Plane has its origin at the lower-left corner of the parent Face and
+    its X axis is horizontal for vertical or tilted sub-faces.
+    """
+    is_vertical = DOE2_ANGLE_TOL <= sub_face.tilt <= 180 - DOE2_ANGLE_TOL
+    if not sub_face.has_parent:
+        ref_geo, cache = sub_face.geometry, {}
+        parent_llc = ref_geo.lower_left_corner
+    else:
+        cache = face_geometry_cache(sub_face.parent, export_view)
+        try:
+            return cache[('sub_face_plane', is_vertical)]
+        except KeyError:  # first time that the plane is requested
+            ref_geo = sub_face.parent.geometry
+            parent_llc = face_lower_left_corner(sub_face.parent, export_view)
+    rel_normal = ref_geo.plane.n
+    if is_vertical:  # vertical or tilted
+        proj_y = Vector3D(0, 0, 1).project(rel_normal)
+        proj_x = proj_y.rotate(rel_normal, math.pi / -2)
+    else:  # located within the XY plane
+        proj_x = Vector3D(1, 0, 0)
+    ref_plane = Plane(rel_normal, parent_llc, proj_x)
+    cache[('sub_face_plane', is_vertical)] = ref_plane
+    return ref_plane
+
+
+def _rewire_removed_adjacencies(level_room_groups, removed_rooms, export_view):
+    """Override the boundary conditions of Faces that are adjacent to removed Rooms.
+
+    Faces adjacent to a Room that is represented by another Room with a
+    multiplier are set to be adjacent to the representative Room instead.
+    Faces adjacent to Rooms of collapsed typical floors or to other Rooms
+    represented by the Face's own Room are set to be adiabatic.
+
+    Args:
+        level_room_groups: A list of lists with the Rooms of each DOE-2 level
+            that will be written to the INP.
+        removed_rooms: A dictionary with the identifiers of the Rooms that are
+            not written to the INP as keys and the identifiers of the Rooms
+            that represent them as values (or None if they have no representative).
+        export_view: The ExportView to which the Rooms belong.
+    """
+    for flr_rooms in level_room_groups:
+        for room in flr_rooms:
+            for face in room.faces:
+                if not isinstance(face.boundary_condition, Surface):
+                    continue
+                bc_objs = face.boundary_condition.boundary_condition_objects
+                try:
+                    base_room = removed_rooms[bc_objs[-1]]
+                except KeyError:  # adjacent room is written to the INP
+                    continue
+                if base_room is None or base_room == room.identifier:
+                    new_bc = boundary_conditions.adiabatic
+                else:
+                    new_bc = Surface((bc_objs[0], base_room))
+                export_view.set_face_boundary_condition(face, new_bc)
+
+
+def _rooms_to_inp(
+    rooms, floor_origin, floor_height,
+    exclude_interior_walls, exclude_interior_ceilings, adjacency, export_view,
+    room_keys=None, room_cache=None
+):
+    """Get the INP polygons and definitions for a list of Rooms on the same level.
+
+    If room_keys and a room_cache are specified, the INP of each Room is taken
+    from the cache when possible and the INP of all other Rooms is added to it.
+
+    Returns:
+        A tuple with the list of INP polygons, the list of INP definitions and
+        an integer for the number of Rooms that were taken from the cache.
+    """
+    polygons, defs, cached_count = [], [], 0
+    room_keys = room_keys if room_keys is not None else [None] * len(rooms)
+    for room, room_key in zip(rooms, room_keys):
+        cached = room_cache.get(room_key) if room_key is not None else None
+        if cached is not None:
+            room_polygons, room_defs = cached
+            cached_count += 1
+        else:
+            room_polygons, room_defs = room_to_inp(
+                room, floor_origin, floor_height,
+                exclude_interior_walls, exclude_interior_ceilings,
+                export_view=export_view, adjacency=adjacency
+            )
+            if room_key is not None:
+                room_cache.set(room_key, room_polygons, room_defs)
+        polygons.extend(room_polygons)
+        defs.extend(room_defs)
+    return polygons, defs, cached_count
+
+
+def _room_cache_keys(room_chunks):
+    """Get the keys of the Rooms in chunks for looking up their INP in a RoomBlockCache.
+
+    The key of each Room is a hash of everything that affects its INP, including
+    the hashes of all adjacent Rooms such that the neighbors of an edited Room
+    are also translated again.
+
+    Args:
+        room_chunks: A list of tuples where each tuple contains the arguments
+            for the _rooms_to_inp function.
+
+    Returns:
+        A list of lists with the keys of each Room, which align with the room_chunks.
+    """
+    # get a hash of each room on its own
+    room_hashes, programs = {}, {}
+    for chunk in room_chunks:
+        rooms, flr_origin, flr_height, excl_walls, excl_ceilings, adjacency, \
+            export_view = chunk
+        for room in rooms:
+            program = room.properties.energy.program_type
+            try:
+                program_dict = programs[program.identifier]
+            except KeyError:
+                program_dict = programs[program.identifier] = \
+                    program.to_dict(abridged=True)
+            faces = []
+            for face in room.faces:
+                face_bc = export_view.face_boundary_condition(face)
+                adj_room = adjacency.adjacent_room(face.identifier)
+                if adj_room is not None:
+                    adj_room = export_view.room_identifier(adj_room)
+                faces.append((
+                    export_view.face_identifier(face.identifier), face_bc.to_dict(),
+                    adj_room, adjacency.is_written(face.identifier),
+                    face.properties.energy.construction.identifier,
+                    [ap.properties.energy.construction.identifier
+                     for ap in face.apertures],
+                    [dr.properties.energy.construction.identifier
+                     for dr in face.doors]
+                ))
+            signature = (
+                ROOM_CACHE_VERSION, room.to_dict(), program_dict, faces,
+                export_view.room_identifier(room.identifier),
+                export_view.room_multiplier(room), tuple(flr_origin), flr_height,
+                excl_walls, excl_ceilings
+            )
+            room_hashes[room.identifier] = hashlib.sha256(
+                json.dumps(signature, sort_keys=True).encode('utf-8')).hexdigest()
+
+    # combine the hash of each room with those of its neighbors
+    room_keys = []
+    for chunk in room_chunks:
+        rooms, adjacency = chunk[0], chunk[5]
+        chunk_keys = []
+        for room in rooms:
+            adj_hashes = set(room_hashes.get(adj_id, adj_id)
+                             for adj_id in adjacency.adjacent_rooms(room.identifier))
+            key_str = ''.join([room_hashes[room.identifier]] + sorted(adj_hashes))
+            chunk_keys.append(hashlib.sha256(key_str.encode('utf-8')).hexdigest())
+        room_keys.append(chunk_keys)
+    return room_keys
+
+
+# room chunks that are inherited by forked worker processes instead of being pickled
+_FORKED_ROOM_CHUNKS = {}
+
+
+def _forked_room_chunk_to_inp(chunk_key):
+    """Translate one of the _FORKED_ROOM_CHUNKS to INP within a worker process.
+
+    Returns:
+        A tuple with the result of _rooms_to_inp and a dictionary of the POLYGONs
+        that were simplified while translating the chunk, which must be recorded
+        on the ExportView of the parent process.
+    """
+    chunks_id, chunk_index = chunk_key
+    chunk = _FORKED_ROOM_CHUNKS[chunks_id][chunk_index]
+    export_view = chunk[6]
+    existing = export_view.simplified_polygons
+    result = _rooms_to_inp(*chunk)
+    simplified = {name: info for name, info in export_view.simplified_polygons.items()
+                  if name not in existing}
+    return result, simplified
+
+
+def _room_chunks_to_inp(room_chunks, workers=1):
+    """Translate chunks of Rooms to INP, using several processes when possible.
+
+    Honeybee objects are locked against edits once they are shared between
+    several objects and so they cannot be reliably pickled to worker processes.
+    Instead, the chunks are inherited by worker processes when they are forked
+    and only the resulting INP strings are sent back to the parent process.
+    Forking is only used on Linux since it is unsafe on Mac (where system
+    libraries may crash the forked processes) and unavailable on Windows.
+
+    Args:
+        room_chunks: A list of tuples where each tuple contains the arguments
+            for the _rooms_to_inp function.
+        workers: An integer for the number of processes to use. (Default: 1).
+
+    Returns:
+        An iterator of tuples with the INP polygons, the INP definitions and the
+        number of cached Rooms of each chunk, which align with the input
+        room_chunks. Each chunk is only translated (or only submitted to the
+        worker processes along with the next few chunks) once the iterator
+        reaches it, such that the INP of all chunks is never held at once.
+    """
+    if workers > 1 and len(room_chunks) > 1 and ProcessPoolExecutor is not None \
+            and sys.platform.startswith('linux'):
+        return _forked_room_chunks_to_inp(room_chunks, workers)
+    return (_rooms_to_inp(*chunk) for chunk in room_chunks)
+
+
+def _forked_room_chunks_to_inp(room_chunks, workers):
+    """Translate chunks of Rooms to INP in forked processes, yielding them in order.
+
+    No more than twice as many chunks as workers are submitted to the processes
+    at once, such that the results are never far ahead of the consumer.
+    """
+    chunks_id = id(room_chunks)
+    _FORKED_ROOM_CHUNKS[chunks_id] = room_chunks
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            pending, next_i = collections.deque(), 0
+            for chunk in room_chunks:
+                while next_i < len(room_chunks) and len(pending) < workers * 2:
+                    pending.append(
+                        pool.submit(_forked_room_chunk_to_inp, (chunks_id, next_i)))
+                    next_i += 1
+                result, simplified = pending.popleft().result()
+                for poly_name, info in simplified.items():
+                    chunk[6].record_simplified_polygon(
+                        poly_name, info['deviation'], info['area_change'])
+                yield result
+    finally:
+        _FORKED_ROOM_CHUNKS.pop(chunks_id, None)
+
+
+def _section_hashed_inp_blocks(blocks, section_hashes):
+    """Get INP blocks while hashing the sections of the INP that they form.
+
+    Args:
+        blocks: An iterable of INP text strings, which will be separated from
+            one another by a newline character.
+        section_hashes: A dictionary, which will be filled with the hex digest
+            of each section once all of the blocks have been generated.
+
+    Returns:
+        A generator of the same INP blocks.
+    """
+    hasher = InpSectionHasher()
+    for i, block in enumerate(blocks):
+        hasher.update(block if i == 0 else '\n' + block)
+        yield block
+    section_hashes.update(hasher.hexdigests())
+
+
+def _windows_inp_blocks(blocks):
+    """Get INP blocks with separators and Windows-compatible line endings.
+
+    Args:
+        blocks: An iterable of INP text strings, which will be separated from
+            one another by a newline character.
+
+    Returns:
+        A generator of text strings, which can be concatenated or written to
+        a file one after the other to produce a valid INP.
+    """
+    for i, block in enumerate(blocks):
+        if i != 0:
+            block = '\n' + block
+        if os.name != 'nt':  # we are on a unix-based system
+            block = block.replace('\n', '\r\n')
+        yield block
 
 
 def room_doe2_conditioning_type(room):
@@ -0,0 +1,348 @@
+# coding=utf-8
+"""Methods for simplifying the zoning of Models before translation to INP."""
+from __future__ import division
+import math
+
+from ladybug_geometry.geometry3d import Vector3D, Face3D, Polyface3D
+from ladybug_geometry_polyskel.polysplit import perimeter_core_subfaces
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee.boundarycondition import boundary_conditions
+from honeybee.facetype import Wall, Floor, RoofCeiling
+from honeybee.typing import clean_string
+from honeybee.units import conversion_factor_to_meters
+from honeybee_energy.programtype import ProgramType
+
+from .grouping import group_rooms_by_doe2_level, hvac_grouping_key
+
+# names for the orientations of perimeter zones, starting from north and going clockwise
+ORIENTATION_NAMES = ('N', 'E', 'S', 'W')
+# DOE-2 Room properties that must match for Rooms to be merged into the same zones
+ZONE_DOE2_ATTRS = ('flow_per_area', 'min_flow_ratio', 'min_flow_per_area',
+                   'hmax_flow_ratio')
+
+
+def model_to_core_perimeter(model, perimeter_depth=None):
+    """Get a Model with the Rooms of each DOE-2 level merged into core/perimeter zones.
+
+    The floor polygon of each level from the group_rooms_by_doe2_level function
+    is split into perimeter zones along each edge and a core zone using the
+    straight skeleton of the polygon. These zones are extruded to the average
+    height of the Rooms on the level and they are named by the orientation of
+    their exterior walls.
+
+    The loads of the new zones are area-weighted averages of the loads of the
+    original Rooms on the level and the windows of each perimeter zone use the
+    window-to-wall ratio of the original exterior walls facing the same
+    orientation. The floors and roofs of the zones use the boundary condition
+    that covers the largest area of the original level, except that any
+    interior floors or roofs become adiabatic. The construction set and HVAC
+    of the zones are those of the largest Room on the level.
+
+    The zones also get the multiplier, DOE-2 properties and user_data of the
+    original Rooms and any assigned_flow of the Rooms is split between the
+    zones by floor area. Levels with Rooms that have different multipliers,
+    DOE-2 properties or user_data cannot be merged and so they keep their
+    original Rooms, as do levels where the conditioned Rooms have different
+    HVAC systems. Levels without a floor polygon or with polygons that cannot
+    be split into core and perimeter zones also keep their original Rooms.
+
+    Args:
+        model: A Honeybee Model to be simplified.
+        perimeter_depth: A number for the depth of the perimeter zones in the
+            units of the model. If None, the depth will be 15 feet in the
+            units of the model (the depth used by ASHRAE 90.1 Appendix G).
+
+    Returns:
+        A new Honeybee Model with the simplified Rooms. All shades of the original
+        Rooms that were merged are included as orphaned shades.
+    """
+    if perimeter_depth is None:
+        perimeter_depth = 15 * conversion_factor_to_meters('Feet') / \
+            conversion_factor_to_meters(model.units)
+
+    # create the core and perimeter rooms for each level
+    rooms, shades = [], [shd.duplicate() for shd in model.orphaned_shades]
+    level_room_groups, level_geos, level_names = \
+        group_rooms_by_doe2_level(model.rooms, model.tolerance)
+    for flr_rooms, flr_geo, flr_name in zip(level_room_groups, level_geos, level_names):
+        new_rooms = None
+        if flr_geo is not None:
+            new_rooms = core_perimeter_rooms(
+                flr_rooms, flr_geo, flr_name, perimeter_depth,
+                model.tolerance, model.angle_tolerance)
+        if new_rooms is None:  # keep the original rooms of the level
+            rooms.extend(flr_rooms)
+            continue
+        rooms.extend(new_rooms)
+        # include the outdoor shades of the original rooms as orphaned shades
+        for room in flr_rooms:
+            shades.extend(shd.duplicate() for shd in _room_outdoor_shades(room))
+
+    new_model = Model(
+        model.identifier, rooms, model.orphaned_faces, shades,
+        model.orphaned_apertures, model.orphaned_doors, model.shade_meshes,
+        units=model.units, tolerance=model.tolerance,
+        angle_tolerance=model.angle_tolerance)
+    new_model._display_name = model._display_name
+    return new_model
+
+
+def core_perimeter_rooms(
+    rooms, level_geometry, level_name, perimeter_depth,
+    tolerance=0.01, angle_tolerance=1
+):
+    """Get core and perimeter Rooms that replace the Rooms of a DOE-2 level.
+
+    The new Rooms are extruded from the bottom of the lowest Room by the
+    floor-area-weighted average height of the Rooms, such that the volume of
+    a level with mixed ceiling heights is preserved.
+
+    Args:
+        rooms: A list of Honeybee Rooms on the same DOE-2 level.
+        level_geometry: A Face3D for the floor polygon of the level, which
+            should be pointing upward.
+        level_name: Text for the name of the level, which will be used to
+            derive the names of the new Rooms.
+        perimeter_depth: A number for the depth of the perimeter zones.
+        tolerance: The maximum difference between point values for them to be
+            considered equivalent. (Default: 0.01).
+        angle_tolerance: The max angle difference in degrees that vertices are
+            allowed to differ from one another in order to consider them
+            colinear. (Default: 1).
+
+    Returns:
+        A list of new Honeybee Rooms for the level. Will be None if the level
+        geometry cannot be split into core and perimeter zones or if the Rooms
+        have different multipliers, DOE-2 properties, user_data or HVACs.
+    """
+    # check that the rooms can be merged into the same zones
+    zone_settings = _level_zone_settings(rooms)
+    if zone_settings is None:
+        return None
+    multiplier, doe2_attrs, assigned_flow, user_data = zone_settings
+
+    # split the level geometry into perimeter and core faces
+    try:
+        perimeter, core = perimeter_core_subfaces(
+            level_geometry, perimeter_depth, tolerance)
+    except Exception:  # the straight skeleton failed for the polygon
+        return None
+    if len(perimeter) == 0:
+        return None
+
+    # join the perimeter faces that face the same orientation
+    orient_faces = [[] for _ in ORIENTATION_NAMES]
+    for flr_face in perimeter:
+        flr_face = flr_face if flr_face.normal.z >= 0 else flr_face.flip()
+        orient_i = _perimeter_orientation_index(flr_face, level_geometry, tolerance)
+        orient_faces[orient_i].append(flr_face)
+    zone_faces, zone_names = [], []
+    for orient, flr_faces in zip(ORIENTATION_NAMES, orient_faces):
+        if len(flr_faces) == 0:
+            continue
+        joined_faces = Face3D.join_coplanar_faces(flr_faces, tolerance) \
+            if len(flr_faces) > 1 else flr_faces
+        for i, flr_face in enumerate(joined_faces):
+            zone_faces.append(flr_face)
+            zone_names.append('Perim {}{}'.format(orient, i + 1 if i else ''))
+    for i, flr_face in enumerate(core):
+        zone_faces.append(flr_face if flr_face.normal.z >= 0 else flr_face.flip())
+        zone_names.append('Core{}'.format(i + 1 if i else ''))
+
+    # extrude the faces into rooms with the area-weighted height of the level
+    flr_z = min(room.min.z for room in rooms)
+    areas = [room.floor_area for room in rooms]
+    total_area = sum(areas)
+    if total_area > 0:
+        height = sum((room.max.z - room.min.z) * area
+                     for room, area in zip(rooms, areas)) / total_area
+    else:  # rooms without floors; use the full height of the level
+        height = max(room.max.z for room in rooms) - flr_z
+    move_vec = Vector3D(0, 0, flr_z - level_geometry.min.z)
+    base_name = clean_string(level_name)
+    new_rooms = []
+    for flr_face, zone_name in zip(zone_faces, zone_names):
+        flr_face = flr_face if flr_face.normal.z >= 0 else flr_face.flip()
+        polyface = Polyface3D.from_offset_face(flr_face.move(move_vec), height)
+        room_id = clean_string('{}_{}'.format(base_name, zone_name))
+        room = Room.from_polyface3d(room_id, polyface)
+        room.display_name = '{} {}'.format(level_name, zone_name)
+        new_rooms.append(room)
+    Room.intersect_adjacency(new_rooms, tolerance, angle_tolerance)
+    Room.solve_adjacency(new_rooms, tolerance)
+
+    # assign boundary conditions and windows from the original rooms
+    flr_bc = _level_boundary_condition(rooms, Floor)
+    roof_bc = _level_boundary_condition(rooms, RoofCeiling)
+    wall_bc = boundary_conditions.ground \
+        if _level_boundary_condition(rooms, Wall) == boundary_conditions.ground \
+        else boundary_conditions.outdoors
+    ratios = _orientation_window_ratios(rooms)
+    for room in new_rooms:
+        for face in room.faces:
+            if isinstance(face.type, Floor):
+                face.boundary_condition = flr_bc
+            elif isinstance(face.type, RoofCeiling):
+                face.boundary_condition = roof_bc
+            elif face.boundary_condition == boundary_conditions.outdoors:
+                face.boundary_condition = wall_bc
+                orient_i = _orientation_index(face.normal)
+                if wall_bc == boundary_conditions.outdoors and ratios[orient_i] > 0:
+                    face.apertures_by_ratio(ratios[orient_i], tolerance)
+
+    # assign the averaged loads, constructions and HVAC of the original rooms
+    program = _area_weighted_program('{}_Program'.format(base_name), rooms)
+    big_room = sorted(rooms, key=lambda r: r.floor_area)[-1]
+    conditioned = [r for r in rooms if r.properties.energy.is_conditioned]
+    hvac = sorted(conditioned, key=lambda r: r.floor_area)[-1].properties.energy.hvac \
+        if len(conditioned) != 0 else None
+    new_area = sum(room.floor_area for room in new_rooms)
+    for room in new_rooms:
+        room.story = big_room.story
+        room.properties.energy.program_type = program
+        room.properties.energy.construction_set = \
+            big_room.properties.energy.construction_set
+        if hvac is not None:
+            room.properties.energy.hvac = hvac
+
+        # assign the multiplier, DOE-2 properties and user_data of the original rooms
+        room.multiplier = multiplier
+        for attr, value in zip(ZONE_DOE2_ATTRS, doe2_attrs):
+            setattr(room.properties.doe2, attr, value)
+        if assigned_flow is not None:
+            room.properties.doe2.assigned_flow = \
+                assigned_flow * room.floor_area / new_area
+        if user_data is not None:
+            room.user_data = user_data.copy()
+    return new_rooms
+
+
+def _level_zone_settings(rooms):
+    """Get the settings that the core and perimeter zones take from the original Rooms.
+
+    Returns:
+        A tuple with the multiplier, a tuple of the ZONE_DOE2_ATTRS, the total
+        assigned_flow (or None) and the user_data of the Rooms. Will be None if
+        the Rooms have different values for any of these or if the conditioned
+        Rooms have different HVAC systems.
+    """
+    first_room = rooms[0]
+    doe2_attrs = tuple(getattr(first_room.properties.doe2, attr)
+                       for attr in ZONE_DOE2_ATTRS)
+    flows = [room.properties.doe2.assigned_flow for room in rooms]
+    hvac_keys = set(hvac_grouping_key(room.properties.energy.hvac)
+                    for room in rooms if room.properties.energy.is_conditioned)
+    if len(hvac_keys) > 1 or \
+            any(flow is None for flow in flows) != all(flow is None for flow in flows):
+        return None
+    for room in rooms[1:]:
+        if room.multiplier != first_room.multiplier or \
+                room.user_data != first_room.user_data or \
+                doe2_attrs != tuple(getattr(room.properties.doe2, attr)
+                                    for attr in ZONE_DOE2_ATTRS):
+            return None
+    assigned_flow = None if flows[0] is None else sum(flows)
+    return first_room.multiplier, doe2_attrs, assigned_flow, first_room.user_data
+
+
+def _level_boundary_condition(rooms, face_type):
+    """Get the boundary condition covering the largest area of a type of Face.
+
+    Interior boundary conditions (eg. Surface) are converted to Adiabatic.
+    """
+    bc_areas = {}
+    for room in rooms:
+        for face in room.faces:
+            if isinstance(face.type, face_type):
+                bc_str = str(face.boundary_condition)
+                try:
+                    bc_areas[bc_str] += face.area
+                except KeyError:
+                    bc_areas[bc_str] = face.area
+    if face_type is Wall:  # interior walls are not relevant for the level
+        bc_areas.pop('Surface', None)
+    if len(bc_areas) == 0:
+        return boundary_conditions.outdoors
+    bc_str = sorted(bc_areas.items(), key=lambda x: x[1])[-1][0]
+    if bc_str == 'Outdoors':
+        return boundary_conditions.outdoors
+    elif bc_str == 'Ground':
+        return boundary_conditions.ground
+    return boundary_conditions.adiabatic
+
+
+def _room_outdoor_shades(room):
+    """Get a list of all outdoor shades assigned to a Room and its children."""
+    shades = list(room.outdoor_shades)
+    for face in room.faces:
+        shades.extend(face.outdoor_shades)
+        for sub_face in face.apertures + face.doors:
+            shades.extend(sub_face.outdoor_shades)
+    return shades
+
+
+def _orientation_index(normal):
+    """Get the index of the ORIENTATION_NAMES that correspond to a normal vector."""
+    azimuth = math.degrees(math.atan2(normal.x, normal.y)) % 360
+    return int(((azimuth + 45) % 360) / 90)
+
+
+def _perimeter_orientation_index(perimeter_face, level_geometry, tolerance):
+    """Get the index of the ORIENTATION_NAMES for a perimeter Face3D of a level.
+
+    The orientation is that of the longest edge of the perimeter Face3D that
+    lies along the boundary of the level geometry.
+    """
+    level_segs = level_geometry.boundary_segments
+    best_seg, best_length = None, -1
+    for seg in perimeter_face.boundary_segments:
+        if seg.length <= best_length:
+            continue
+        mid_pt = seg.midpoint
+        if any(l_seg.distance_to_point(mid_pt) <= tolerance for l_seg in level_segs):
+            best_seg, best_length = seg, seg.length
+    if best_seg is None:  # perimeter face does not touch the boundary
+        best_seg = sorted(perimeter_face.boundary_segments, key=lambda s: s.length)[-1]
+    # the outward normal is to the right of counterclockwise edges
+    direction = best_seg.v
+    return _orientation_index(Vector3D(direction.y, -direction.x, 0))
+
+
+def _orientation_window_ratios(rooms):
+    """Get the window-to-wall ratio of the exterior walls facing each orientation."""
+    wall_areas, window_areas = [0] * 4, [0] * 4
+    for room in rooms:
+        for face in room.faces:
+            if isinstance(face.type, Wall) and \
+                    face.boundary_condition == boundary_conditions.outdoors:
+                orient_i = _orientation_index(face.normal)
+                wall_areas[orient_i] += face.area
+                window_areas[orient_i] += sum(ap.area for ap in face.apertures)
+    return [min(win / wall, 0.99) if wall > 0 else 0
+            for win, wall in zip(window_areas, wall_areas)]
+
+
+def _area_weighted_program(identifier, rooms):
+    """Get a ProgramType with the loads of several Rooms weighted by floor area.
+
+    The setpoint of the ProgramType is the average of the setpoints of the
+    conditioned Rooms and it is None if none of the Rooms are conditioned.
+    """
+    energy_props = [room.properties.energy for room in rooms]
+    # if all rooms use the same program without overrides, there is nothing to average
+    programs = set(e.program_type.identifier for e in energy_props)
+    if len(programs) == 1 and not any(e.has_overridden_loads for e in energy_props):
+        return energy_props[0].program_type
+    # only the setpoints of conditioned rooms are included in the average
+    room_programs = [
+        ProgramType(
+            '{}_Loads'.format(room.identifier), e.people, e.lighting,
+            e.electric_equipment, e.gas_equipment, e.service_hot_water,
+            e.infiltration, e.ventilation, e.setpoint if e.is_conditioned else None)
+        for room, e in zip(rooms, energy_props)
+    ]
+    areas = [room.floor_area for room in rooms]
+    total_area = sum(areas)
+    weights = [a / total_area for a in areas] if total_area > 0 else None
+    return ProgramType.average(identifier, room_programs, weights)
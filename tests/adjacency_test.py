@@ -0,0 +1,97 @@
+"""Test the AdjacencyIndex of the interior Faces of Rooms."""
+from ladybug_geometry.geometry3d import Point3D
+
+from honeybee.room import Room
+from honeybee.model import Model
+from honeybee.boundarycondition import Surface
+from honeybee_energy.lib.programtypes import office_program
+
+from honeybee_doe2.adjacency import AdjacencyIndex
+
+
+def _adjacent_rooms():
+    """Get a list of three Rooms in a row with solved adjacencies."""
+    rooms = [Room.from_box('Office_{}'.format(i), 10, 10, 3, origin=Point3D(i * 10, 0, 0))
+             for i in range(3)]
+    Room.solve_adjacency(rooms, 0.01)
+    return rooms
+
+
+def test_adjacency_index():
+    """Test the adjacent Faces and Rooms recorded by the AdjacencyIndex."""
+    rooms = _adjacent_rooms()
+    adjacency = AdjacencyIndex(rooms)
+    assert adjacency.face_count == 18
+    assert adjacency.adjacent_rooms('Office_0') == ('Office_1',)
+    assert sorted(adjacency.adjacent_rooms('Office_1')) == ['Office_0', 'Office_2']
+    assert adjacency.adjacent_rooms('Not_A_Room') == ()
+
+    for room in rooms:
+        for face in room.faces:
+            assert adjacency.face_room(face.identifier) == room.identifier
+            if isinstance(face.boundary_condition, Surface):
+                bc_objs = face.boundary_condition.boundary_condition_objects
+                assert adjacency.adjacent_face(face.identifier) == bc_objs[0]
+                assert adjacency.adjacent_room(face.identifier) == bc_objs[-1]
+            else:
+                assert adjacency.adjacent_face(face.identifier) is None
+                assert adjacency.adjacent_room(face.identifier) is None
+                assert adjacency.is_written(face.identifier)
+
+
+def test_adjacency_index_ownership():
+    """Test that only one Face of each adjacent pair is written."""
+    rooms = _adjacent_rooms()
+    adjacency = AdjacencyIndex(rooms)
+    assert len(adjacency.unwritten_faces) == 2
+    for room in rooms:
+        for face in room.faces:
+            adj_face = adjacency.adjacent_face(face.identifier)
+            if adj_face is not None:
+                assert adjacency.is_written(face.identifier) != \
+                    adjacency.is_written(adj_face)
+    # the face that is written belongs to the room that comes first
+    assert all(adjacency.is_written(face.identifier) for face in rooms[0].faces)
+    rev_adjacency = AdjacencyIndex(list(reversed(rooms)))
+    assert all(rev_adjacency.is_written(face.identifier) for face in rooms[2].faces)
+
+    excl_adjacency = AdjacencyIndex(rooms, exclude_interior_walls=True)
+    assert len(excl_adjacency.unwritten_faces) == 4
+    similar_adjacency = AdjacencyIndex(rooms, similar_room_groups=[rooms])
+    assert len(similar_adjacency.unwritten_faces) == 4
+
+
+def test_room_writer_adjacency():
+    """Test that the Room writer uses the AdjacencyIndex for interior Faces."""
+    rooms = _adjacent_rooms()
+    model = Model('Offices', rooms, units='Feet', tolerance=0.01)
+    adjacency = AdjacencyIndex(model.rooms)
+
+    _, first_defs = rooms[1].to.inp(rooms[1], adjacency=adjacency)
+    _, all_defs = rooms[1].to.inp(rooms[1])
+    assert len(all_defs) == len(first_defs) + 1
+    assert sum(1 for d in all_defs if 'NEXT-TO' in d) == 2
+    assert sum(1 for d in first_defs if 'NEXT-TO' in d) == 1
+
+
+def test_adjacency_index_rewired_faces():
+    """Test that Faces made adiabatic by collapsed Rooms are not excluded."""
+    rooms = []
+    for j in range(5):
+        room = Room.from_box('Guest_{}'.format(j), 10, 20, 3,
+                             origin=Point3D(j * 10, 0, 0))
+        room.properties.energy.program_type = office_program
+        room.properties.energy.add_default_ideal_air()
+        room.faces[3].apertures_by_ratio(0.3)
+        rooms.append(room)
+    Room.solve_adjacency(rooms, 0.01)
+    hb_model = Model('Hotel', rooms, units='Feet', tolerance=0.01)
+
+    excl_inp_str = hb_model.to.inp(hb_model, exclude_interior_walls=True)
+    assert 'NEXT-TO' not in excl_inp_str
+    assert 'ADIABATIC' not in excl_inp_str
+    inp_str = hb_model.to.inp(
+        hb_model, exclude_interior_walls=True, collapse_identical_rooms=True)
+    assert inp_str.count('= ZONE') == 3
+    assert 'NEXT-TO' not in inp_str
+    assert inp_str.count('ADIABATIC') == 1
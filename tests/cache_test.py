@@ -0,0 +1,64 @@
+"""Test the on-disk cache of Room INP blocks."""
+import os
+import time
+
+from honeybee.model import Model
+from honeybee_energy.lib.programtypes import office_program
+
+from honeybee_doe2.cache import RoomBlockCache
+from honeybee_doe2.profiling import StageProfiler
+
+
+def test_room_block_cache(tmpdir):
+    """Test the get, set and evict methods of RoomBlockCache."""
+    cache = RoomBlockCache(str(tmpdir.join('room_cache')), max_size=0.001)
+    assert os.path.isdir(cache.folder)
+    assert cache.get('room_1') is None
+    assert 'room_1' not in cache
+
+    cache.set('room_1', ['polygon_1'], ['space_1', 'wall_1'])
+    assert 'room_1' in cache
+    assert cache.get('room_1') == (['polygon_1'], ['space_1', 'wall_1'])
+
+    # add entries until the cache exceeds max_size and check the oldest are removed
+    for i in range(2, 6):
+        time.sleep(0.01)
+        cache.set('room_{}'.format(i), ['polygon'] * 20, ['space'] * 20)
+    assert cache.get('room_1') is not None  # mark room_1 as recently used
+    assert cache.evict() > 0
+    assert 'room_1' in cache
+    assert 'room_2' not in cache
+    assert 'room_5' in cache
+
+
+def _cached_rooms(profiler):
+    """Get the number of cached Rooms recorded in the rooms stage of a profiler."""
+    return [stage for stage in profiler.stages if stage['name'] == 'rooms'][0][
+        'cached_rooms']
+
+
+def test_model_to_inp_room_cache(tmpdir):
+    """Test the translation of a Model to INP with a room_cache."""
+    cache_folder = str(tmpdir.join('room_cache'))
+    model = Model.from_file('./tests/assets/testbed_no_user_data.hbjson')
+    inp_str = model.to.inp(model)
+    profiler = StageProfiler()
+    assert model.to.inp(model, room_cache=cache_folder, profiler=profiler) == inp_str
+    assert _cached_rooms(profiler) == 0
+    profiler = StageProfiler()
+    assert model.to.inp(model, room_cache=cache_folder, profiler=profiler) == inp_str
+    assert _cached_rooms(profiler) == 6
+
+    # edit a room and check that it is translated again along with its neighbors
+    edit_room = model.rooms[0]
+    edit_room.properties.energy.program_type = office_program
+    adj_count = len(set(
+        face.boundary_condition.boundary_condition_objects[-1]
+        for face in edit_room.faces if str(face.boundary_condition) == 'Surface'))
+    new_inp_str = model.to.inp(model)
+    profiler = StageProfiler()
+    assert model.to.inp(model, room_cache=cache_folder, profiler=profiler) == \
+        new_inp_str
+    cached_count = len(model.rooms) - 1 - adj_count
+    assert cached_count < 5
+    assert _cached_rooms(profiler) == cached_count
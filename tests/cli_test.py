@@ -1,9 +1,11 @@
 """Test the CLI commands"""
 import json
 import os
+import gzip
 from click.testing import CliRunner
 
 from honeybee_energy.schedule.ruleset import ScheduleRuleset
+from honeybee_doe2.cli.edit import precompute_cli
 from honeybee_doe2.cli.translate import model_to_inp_cli, schedule_from_inp_cli, \
     schedule_to_inp_cli
 
@@ -26,6 +28,52 @@ def test_model_to_inp_cli():
     os.remove(out_file)
 
 
+def test_model_to_inp_cli_profile():
+    """Test the profile and name map outputs of the translation of a Model to INP."""
+    runner = CliRunner()
+    input_hb_model = './tests/assets/shade_test.hbjson'
+    out_file = './tests/assets/cli_test.inp'
+    profile_file = './tests/assets/cli_test_profile.json'
+    name_map_file = './tests/assets/cli_test_names.json'
+
+    in_args = [input_hb_model, '--profile-file', profile_file,
+               '--name-map-file', name_map_file, '--output-file', out_file]
+    result = runner.invoke(model_to_inp_cli, in_args)
+    assert result.exit_code == 0
+    with open(profile_file) as json_file:
+        profile_dict = json.load(json_file)
+    assert len(profile_dict['stages']) > 0
+    with open(name_map_file) as json_file:
+        name_map = json.load(json_file)
+    assert len(name_map['rooms']) > 0
+    os.remove(out_file)
+    os.remove(profile_file)
+    os.remove(name_map_file)
+
+
+def test_model_to_inp_cli_compressed():
+    """Test the translation of a Model to a compressed INP."""
+    runner = CliRunner()
+    input_hb_model = './tests/assets/shade_test.hbjson'
+    out_file = './tests/assets/cli_test.inp'
+    gz_out_file = './tests/assets/cli_test.inp.gz'
+
+    result = runner.invoke(model_to_inp_cli, [input_hb_model, '--output-file', out_file])
+    assert result.exit_code == 0
+    result = runner.invoke(
+        model_to_inp_cli, [input_hb_model, '--output-file', gz_out_file])
+    assert result.exit_code == 0
+
+    with open(out_file, 'rb') as inp_file:
+        inp_content = inp_file.read()
+    with gzip.open(gz_out_file, 'rb') as inp_file:
+        gz_inp_content = inp_file.read()
+    assert os.path.getsize(gz_out_file) < len(inp_content)
+    assert gz_inp_content == inp_content
+    os.remove(out_file)
+    os.remove(gz_out_file)
+
+
 def test_schedule_to_from_inp():
     runner = CliRunner()
     input_hb_sch = './tests/assets/Schedules.inp'
@@ -46,3 +94,30 @@ def test_schedule_to_from_inp():
     assert result.exit_code == 0
 
     os.remove(output_hb_json)
+
+
+def test_precompute_cli():
+    """Test the precomputation of the geometry of a Model for INP export."""
+    runner = CliRunner()
+    input_hb_model = './tests/assets/multi_hvac.hbjson'
+    out_file = './tests/assets/cli_test_precompute.hbjson'
+    out_inp = './tests/assets/cli_test_precompute.inp'
+
+    result = runner.invoke(precompute_cli, [input_hb_model, '--output-file', out_file])
+    assert result.exit_code == 0
+    with open(out_file) as json_file:
+        data = json.load(json_file)
+    assert len(data['properties']['doe2']['precomputed_levels']) > 0
+    assert all('precomputed_geometry' in room['properties']['doe2']
+               for room in data['rooms'])
+
+    result = runner.invoke(model_to_inp_cli, [out_file, '--output-file', out_inp])
+    assert result.exit_code == 0
+    assert os.path.isfile(out_inp)
+    os.remove(out_inp)
+
+    result = runner.invoke(precompute_cli, [out_file, '--clear'])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert 'precomputed_levels' not in data['properties']['doe2']
+    os.remove(out_file)
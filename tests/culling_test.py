@@ -0,0 +1,80 @@
+"""Test the culling of context shades before translation to INP."""
+import pytest
+
+from ladybug_geometry.geometry3d import Point3D, Mesh3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee.shade import Shade
+from honeybee.shademesh import ShadeMesh
+
+from honeybee_doe2.culling import cull_shades
+from honeybee_doe2.profiling import StageProfiler
+
+
+def _shade_test_model():
+    """Get a Model with a Room and several context shades around it."""
+    room = Room.from_box('Office', 10, 10, 3)
+    near_pts = (Point3D(12, 0, 0), Point3D(12, 10, 0),
+                Point3D(12, 10, 5), Point3D(12, 0, 5))
+    far_pts = (Point3D(100, 0, 0), Point3D(100, 10, 0),
+               Point3D(100, 10, 3), Point3D(100, 0, 3))
+    low_pts = (Point3D(0, 0, -5), Point3D(10, 0, -5),
+               Point3D(10, -10, -5), Point3D(0, -10, -5))
+    shades = [Shade.from_vertices('Near', near_pts),
+              Shade.from_vertices('Far', far_pts),
+              Shade.from_vertices('Low', low_pts)]
+    mesh_pts = (Point3D(-2, 0, 4), Point3D(-2, 10, 4), Point3D(-3, 10, 4),
+                Point3D(-50, 0, 1), Point3D(-50, 10, 1), Point3D(-51, 10, 1))
+    mesh = Mesh3D(mesh_pts, ((0, 1, 2), (3, 4, 5)))
+    shade_mesh = ShadeMesh('Context', mesh)
+    return Model('Shade_Test', [room], orphaned_shades=shades,
+                 shade_meshes=[shade_mesh])
+
+
+def test_cull_shades():
+    """Test the cull_shades method."""
+    model = _shade_test_model()
+    shades, shade_meshes, removed_count = cull_shades(model, 30)
+    assert [shd.identifier for shd in shades] == ['Near']
+    assert len(shade_meshes) == 1
+    assert shade_meshes[0].identifier == 'Context'
+    assert len(shade_meshes[0].faces) == 1
+    assert len(shade_meshes[0].vertices) == 3
+    assert removed_count == 3
+    assert len(model.shade_meshes[0].faces) == 2
+
+    shades, shade_meshes, removed_count = cull_shades(model, 0)
+    assert [shd.identifier for shd in shades] == ['Near', 'Far']
+    assert len(shade_meshes[0].faces) == 2
+    assert removed_count == 1
+
+    shades, shade_meshes, removed_count = cull_shades(model, 89.9)
+    assert len(shades) <= 2
+    with pytest.raises(ValueError):
+        cull_shades(model, 90)
+    with pytest.raises(ValueError):
+        cull_shades(model, -10)
+
+
+def test_cull_shades_assigned():
+    """Test that cull_shades keeps the shades that are assigned to Rooms."""
+    model = _shade_test_model()
+    room_shd_pts = (Point3D(0, 0, -10), Point3D(10, 0, -10),
+                    Point3D(10, -10, -10), Point3D(0, -10, -10))
+    model.rooms[0].add_outdoor_shade(Shade.from_vertices('Room_Shade', room_shd_pts))
+    shades, _, removed_count = cull_shades(model, 30)
+    assert [shd.identifier for shd in shades] == ['Room_Shade', 'Near']
+    assert removed_count == 3
+
+
+def test_model_to_inp_shade_cutoff_angle():
+    """Test the translation of a Model to INP with a shade_cutoff_angle."""
+    model = _shade_test_model()
+    inp_str = model.to.inp(model)
+    assert inp_str.count('= FIXED-SHADE') == 5
+    profiler = StageProfiler()
+    inp_str = model.to.inp(model, shade_cutoff_angle=30, profiler=profiler)
+    assert inp_str.count('= FIXED-SHADE') == 2
+    assert '"Far"' not in inp_str
+    shades_stage = [stage for stage in profiler.stages if stage['name'] == 'shades']
+    assert shades_stage[0]['removed_shades'] == 3
@@ -0,0 +1,166 @@
+"""Test the ExportView that prepares Models for translation to INP."""
+import json
+
+from ladybug_geometry.geometry3d import Point3D, Vector3D
+
+from honeybee.model import Model
+from honeybee.room import Room
+
+from honeybee_doe2.exportview import ExportView
+
+
+def test_export_view_does_not_mutate():
+    """Test that the ExportView and the Model writer do not mutate the Model."""
+    standard_test = './tests/assets/multi_hvac.hbjson'
+    hb_model = Model.from_file(standard_test)
+    model_str = json.dumps(hb_model.to_dict())
+
+    view = ExportView(hb_model)
+    assert view.host is hb_model
+    assert view.model.units == 'Feet'
+    assert len(view.model.rooms) == len(hb_model.rooms)
+    hb_model.to.inp(hb_model)
+    assert json.dumps(hb_model.to_dict()) == model_str
+
+
+def test_export_view_shared_rooms():
+    """Test that Rooms without edits are shared with the original Model."""
+    standard_test = './tests/assets/out_school_project_from_wiz.hbjson'
+    hb_model = Model.from_file(standard_test)
+    view = ExportView(hb_model)
+
+    shared_rooms = [r1 for r1, r2 in zip(hb_model.rooms, view.model.rooms) if r1 is r2]
+    assert 0 < len(shared_rooms) < len(hb_model.rooms)
+    for room in view.model.rooms:
+        if room in shared_rooms:
+            assert not any(face.has_sub_faces for face in room.faces)
+        for face in room.faces:
+            for ap in face.apertures:
+                assert ap.identifier == ap.display_name or \
+                    ap.identifier.startswith(ap.display_name)
+
+    room_ids = view.identifier_map['rooms']
+    assert len(room_ids) == len(hb_model.rooms)
+    assert len(set(room_ids.values())) == len(hb_model.rooms)
+    room = hb_model.rooms[0]
+    assert view.room_identifier(room.identifier) == room_ids[room.identifier]
+    assert view.room_multiplier(room) == room.multiplier
+    view.set_room_multiplier(room, 3)
+    assert view.room_multiplier(room) == 3
+    assert room.multiplier == 1
+
+
+def test_export_view_units():
+    """Test that Models in other units are scaled to Feet."""
+    standard_test = './tests/assets/out_school_project_from_wiz.hbjson'
+    hb_model = Model.from_file(standard_test)
+    assert ExportView(hb_model).scale_factor == 1
+    hb_model.convert_to_units('Meters')
+    view = ExportView(hb_model)
+
+    assert 3.28 < view.scale_factor < 3.29
+    assert view.model.units == 'Feet'
+    assert hb_model.units == 'Meters'
+    assert all(r1 is not r2 for r1, r2 in zip(hb_model.rooms, view.model.rooms))
+    assert abs(view.model.rooms[0].volume -
+               hb_model.rooms[0].volume * view.scale_factor ** 3) < 1e-3
+
+
+def test_export_view_face_geometry_cache():
+    """Test that geometry derived from Faces is cached on the ExportView."""
+    standard_test = './tests/assets/shade_test.hbjson'
+    hb_model = Model.from_file(standard_test)
+    view = ExportView(hb_model)
+    room = view.model.rooms[0]
+
+    no_view_polygons, no_view_defs = room.to.inp(room, adj_set=set())
+    polygons, defs = room.to.inp(room, adj_set=set(), export_view=view)
+    assert len(polygons) == len(no_view_polygons)
+    assert len(defs) == len(no_view_defs)
+
+    face = [f for f in room.faces if f.has_sub_faces][0]
+    cache = view.face_geometry_cache(face)
+    assert 'clean_geometry' in cache
+    assert 'lower_left_corner' in cache
+    assert cache is view.face_geometry_cache(face)
+
+
+def test_export_view_room_prototypes():
+    """Test that the geometry of congruent Rooms is only translated once."""
+    room_1 = Room.from_box('Office_1', 10, 12, 3, origin=Point3D(0, 0, 0))
+    room_2 = Room.from_box('Office_2', 10, 12, 3, origin=Point3D(10, 0, 0))
+    room_3 = Room.from_box('Office_3', 10, 15, 3, origin=Point3D(20, 0, 0))
+    for room in (room_1, room_2):
+        room.faces[1].apertures_by_ratio(0.4)
+    hb_model = Model('Offices', [room_1, room_2, room_3], units='Feet')
+    view = ExportView(hb_model)
+
+    for room in view.model.rooms:
+        no_view_polygons, no_view_defs = room.to.inp(room, adj_set=set())
+        polygons, defs = room.to.inp(room, adj_set=set(), export_view=view)
+        assert polygons == no_view_polygons
+        assert defs == no_view_defs
+    assert len(view._room_prototypes) == 2
+
+
+def test_export_view_inp_name_map():
+    """Test the table of DOE-2 names and the map of names written to the INP."""
+    standard_test = './tests/assets/revit_sample_model.hbjson'
+    hb_model = Model.from_file(standard_test)
+    view = ExportView(hb_model)
+    long_name = 'My Construction with a "Very" Long Name'
+    doe2_name = view.doe2_name(long_name, 30)
+    assert len(doe2_name) <= 30
+    assert '"' not in doe2_name
+    assert view.doe2_name(long_name, 30) is doe2_name
+
+    name_map = view.inp_name_map()
+    assert len(name_map['rooms']) == len(hb_model.rooms)
+    # apertures may be split into several rectangular apertures for the INP
+    assert len(name_map['apertures']) == len(view.model.apertures)
+    assert len(name_map['doors']) == len(view.model.doors)
+    assert len(set(name_map['apertures'].values())) == len(view.model.apertures)
+    assert len(name_map['constructions']) > 0
+    assert len(name_map['schedules']) > 0
+
+    inp_str = hb_model.to.inp(hb_model)
+    for key in ('rooms', 'apertures', 'doors', 'schedules'):
+        for name in name_map[key].values():
+            assert '"{}"'.format(name) in inp_str
+    assert json.loads(json.dumps(name_map)) == name_map
+
+    for hvac_mapping in ('Story', 'Room', 'HVAC'):
+        name_map = {}
+        inp_str = hb_model.to.inp(
+            hb_model, hvac_mapping=hvac_mapping, name_map=name_map)
+        assert sorted(name_map['hvac_systems']) == \
+            sorted(room.identifier for room in hb_model.rooms)
+        for name in set(name_map['hvac_systems'].values()):
+            assert '"{}" = SYSTEM'.format(name) in inp_str
+        for name in name_map['schedules'].values():
+            assert '"{}"'.format(name) in inp_str
+
+
+def test_export_view_rectangular_apertures():
+    """Test that rectangularized Apertures match those of honeybee."""
+    room = Room.from_box('Office', 10, 12, 3)
+    room.faces[1].apertures_by_ratio_rectangle(0.3, 1, 0.8, 1.5, tolerance=0.01)
+    room.faces[2].apertures_by_ratio(0.4, tolerance=0.01)
+    room.faces[3].apertures_by_ratio(0.4, tolerance=0.01)
+    room.faces[3].apertures[0].move(Vector3D(0, 0, 0.5))  # non-rectangular window
+    hb_model = Model('Office', [room], units='Feet')
+    view = ExportView(hb_model)
+    hb_room = room.duplicate()
+    hb_room.clean_envelope({}, 0.03)
+    hb_room.rectangularize_apertures(0.5, 0.0, True, 0.01, 1.0)
+
+    for orig_face, face, hb_face in \
+            zip(room.faces, view.model.rooms[0].faces, hb_room.faces):
+        orig_area = sum(ap.area for ap in orig_face.apertures)
+        assert abs(sum(ap.area for ap in face.apertures) - orig_area) < 1e-6
+        for ap in face.apertures:
+            assert ap.geometry.polygon2d.is_rectangle(0.01)
+        assert [ap.display_name for ap in face.apertures] == \
+            [ap.display_name for ap in hb_face.apertures]
+    assert len(view.model.rooms[0].faces[1].apertures) > 1
+    assert view.model.rooms[0].faces[2].apertures[0].display_name.endswith('_0')
@@ -0,0 +1,64 @@
+"""Test the merging of coplanar shades before translation to INP."""
+from ladybug_geometry.geometry3d import Point3D, Mesh3D, Face3D
+from honeybee.shade import Shade
+from honeybee.shademesh import ShadeMesh
+
+from honeybee_doe2.merging import merge_coplanar_faces, merge_coplanar_shades
+
+
+def _triangulated_wall_mesh(count=4, size=10):
+    """Get a Mesh3D for a vertical wall split into a grid of triangles."""
+    step = size / count
+    vertices = [Point3D(i * step, 0, j * step)
+                for i in range(count + 1) for j in range(count + 1)]
+    faces = []
+    for i in range(count):
+        for j in range(count):
+            pt1 = i * (count + 1) + j
+            pt2, pt3, pt4 = pt1 + count + 1, pt1 + count + 2, pt1 + 1
+            faces.extend(((pt1, pt2, pt3), (pt1, pt3, pt4)))
+    return Mesh3D(vertices, faces)
+
+
+def test_merge_coplanar_faces():
+    """Test the merge_coplanar_faces method."""
+    mesh = _triangulated_wall_mesh()
+    faces = [Face3D(verts) for verts in mesh.face_vertices]
+    far_face = Face3D((Point3D(20, 0, 0), Point3D(30, 0, 0), Point3D(30, 0, 10)))
+    roof_face = Face3D((Point3D(0, 0, 10), Point3D(10, 0, 10), Point3D(10, 10, 10)))
+    merged_faces, face_indices = \
+        merge_coplanar_faces(faces + [far_face, roof_face], 0.01, 1)
+
+    assert len(merged_faces) == 3
+    assert face_indices[0] == list(range(len(faces)))
+    assert face_indices[1:] == [[len(faces)], [len(faces) + 1]]
+    assert len(merged_faces[0].vertices) == 4
+    assert abs(merged_faces[0].area - 100) < 1e-6
+    assert merged_faces[1] is far_face
+
+
+def test_merge_coplanar_shades():
+    """Test the merge_coplanar_shades method."""
+    mesh = _triangulated_wall_mesh(2)
+    shades = [Shade('Shade{}'.format(i), Face3D(verts))
+              for i, verts in enumerate(mesh.face_vertices)]
+    shades[-1].is_detached = True
+    merged_shades = merge_coplanar_shades(shades)
+
+    assert len(merged_shades) == 2
+    assert merged_shades[0].identifier == 'Shade0'
+    assert abs(merged_shades[0].area - 100 * 7 / 8) < 1e-6
+    assert merged_shades[1] is shades[-1]
+
+
+def test_shade_mesh_to_inp_merge_coplanar():
+    """Test the translation of a ShadeMesh to INP with merge_coplanar."""
+    shade = ShadeMesh('Context_Wall', _triangulated_wall_mesh())
+    shade_polygons, shade_defs = shade.to.inp(shade)
+    assert len(shade_defs) == 32
+    assert len(shade_polygons) == 32
+
+    shade_polygons, shade_defs = shade.to.inp(shade, merge_coplanar=True)
+    assert len(shade_defs) == 1
+    assert len(shade_polygons) == 0
+    assert 'RECTANGLE' in shade_defs[0]
@@ -1,4 +1,5 @@
 """Tests the features that honeybee_doe2 adds to honeybee_core Model."""
+from ladybug_geometry.geometry3d import Vector3D
 from honeybee.room import Room
 from honeybee.model import Model
 from honeybee_energy.lib.programtypes import office_program
@@ -32,3 +33,56 @@ def test_from_dict():
     assert new_room.properties.doe2.min_flow_ratio == 0.3
     assert new_room.properties.doe2.min_flow_per_area == 0.35
     assert new_room.properties.doe2.hmax_flow_ratio == 0.5
+
+
+def test_precompute():
+    """Test the precompute method of the Model doe2 properties."""
+    model = Model.from_file('./tests/assets/multi_hvac.hbjson')
+    inp_str = model.to.inp(model)
+    model.properties.doe2.precompute()
+
+    levels = model.properties.doe2.precomputed_levels
+    assert len(levels) > 0
+    level_ids = [room_id for level in levels for room_id in level['rooms']]
+    assert sorted(level_ids) == sorted(room.identifier for room in model.rooms)
+    for room in model.rooms:
+        pre_geo = room.properties.doe2.precomputed_geometry
+        assert pre_geo['face_identifiers'] == \
+            tuple(face.identifier for face in room.faces)
+        assert len(pre_geo['face_locations']) == len(room.faces)
+    assert model.to.inp(model) == inp_str
+
+    new_model = Model.from_dict(model.to_dict())
+    assert new_model.properties.doe2.precomputed_levels == levels
+    new_room = new_model.rooms[0]
+    assert new_room.properties.doe2.precomputed_geometry['face_locations'] == \
+        model.rooms[0].properties.doe2.precomputed_geometry['face_locations']
+    assert new_model.to.inp(new_model) == inp_str
+
+    new_model.rotate_xy(90, new_model.rooms[0].center)
+    assert new_model.properties.doe2.precomputed_levels is None
+    assert new_room.properties.doe2.precomputed_geometry is None
+    model.properties.doe2.clear_precomputed()
+    assert model.properties.doe2.precomputed_levels is None
+    assert all(room.properties.doe2.precomputed_geometry is None
+               for room in model.rooms)
+
+
+def test_precompute_edited_room():
+    """Test that precomputed geometry is ignored once the geometry of a Room changes."""
+    model = Model.from_file('./tests/assets/multi_hvac.hbjson')
+    model.properties.doe2.precompute()
+    room = model.rooms[0]
+    stamp = room.properties.doe2.geometry_stamp
+    room.move(Vector3D(3, 0, 0))
+    assert room.properties.doe2.geometry_stamp != stamp
+    assert room.properties.doe2.precomputed_geometry is None
+    assert model.rooms[1].properties.doe2.precomputed_geometry is not None
+
+    new_model = model.duplicate()
+    new_model.properties.doe2.clear_precomputed()
+    inp_str = new_model.to.inp(new_model)
+    assert model.to.inp(model) == inp_str
+    model = Model.from_dict(model.to_dict())
+    assert model.properties.doe2.precomputed_levels is not None
+    assert model.to.inp(model) == inp_str
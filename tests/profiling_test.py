@@ -0,0 +1,68 @@
+"""Test the instrumentation of the stages of the INP translation."""
+import json
+
+from honeybee.model import Model
+
+from honeybee_doe2.profiling import StageProfiler
+from honeybee_doe2.writer import model_to_inp_iter
+
+
+def test_stage_profiler():
+    """Test the start_stage, end_stage and serialization of StageProfiler."""
+    events = []
+    profiler = StageProfiler(events.append)
+    assert profiler.stages == ()
+
+    profiler.start_stage('stage_1', 10)
+    profiler.start_stage('stage_2')
+    assert len(events) == 1
+    profiler.end_stage()
+    profiler.end_stage()  # ending a stage twice does nothing
+    assert len(events) == 2
+    assert [stage['name'] for stage in profiler.stages] == ['stage_1', 'stage_2']
+    assert profiler.stages[0]['count'] == 10
+    assert profiler.stages[1]['count'] is None
+    assert profiler.stages[0]['memory'] is None
+    assert profiler.total_time >= 0
+
+    profiler.start_stage('stage_3')
+    profiler.record('removed_shades', 3)
+    profiler.end_stage()
+    profiler.record('removed_shades', 4)  # recording without a stage does nothing
+    assert profiler.stages[2]['removed_shades'] == 3
+    assert 'removed_shades' not in profiler.stages[1]
+
+    profile_dict = profiler.to_dict()
+    assert profile_dict['type'] == 'StageProfiler'
+    assert len(profile_dict['stages']) == 3
+    assert json.loads(json.dumps(profile_dict)) == profile_dict
+
+
+def test_model_to_inp_profiler():
+    """Test that the stages of the translation of a Model are recorded."""
+    hb_model = Model.from_file('./tests/assets/shade_test.hbjson')
+    inp_str = hb_model.to.inp(hb_model)
+
+    profiler = StageProfiler(trace_memory=True)
+    assert hb_model.to.inp(hb_model, profiler=profiler) == inp_str
+    stage_names = [stage['name'] for stage in profiler.stages]
+    assert stage_names[0] == 'export_view'
+    for name in ('schedules', 'constructions', 'levels', 'rooms', 'shades', 'zones'):
+        assert name in stage_names
+    rooms_stage = profiler.stages[stage_names.index('rooms')]
+    assert rooms_stage['count'] == len(hb_model.rooms)
+    assert all(stage['memory'] is not None for stage in profiler.stages)
+    assert all(stage['time'] >= 0 for stage in profiler.stages)
+
+
+def test_model_to_inp_iter_profiler():
+    """Test that the consumer of the INP blocks is not included in the stages."""
+    hb_model = Model.from_file('./tests/assets/shade_test.hbjson')
+    profiler = StageProfiler()
+    blocks = model_to_inp_iter(hb_model, profiler=profiler)
+    assert profiler.stages == ()
+    block_count = 0
+    for _ in blocks:
+        block_count += 1
+    assert block_count > 0
+    assert profiler.stages[-1]['name'] == 'zones'
@@ -1,8 +1,11 @@
 """Test the reader functions."""
 import os
+import gzip
+import shutil
 
 from honeybee.model import Model
 from honeybee_doe2.reader import command_dict_from_inp, model_from_inp_file
+from honeybee_doe2.schedule import extract_all_schedule_ruleset_from_inp_file
 
 
 def test_parse_inp_file():
@@ -66,3 +69,53 @@ def test_school_project_from_wiz():
     inp_path = os.path.join(os.path.dirname(__file__), 'assets', 'school_project_from_wiz.inp')
     model = model_from_inp_file(inp_path)
     assert isinstance(model, Model)
+
+
+def test_model_from_compressed_inp_file():
+    """Test that compressed INP files are read the same as uncompressed files."""
+    inp_path = os.path.join(os.path.dirname(__file__), 'assets', 'square_from_hbjson.inp')
+    gz_inp_path = os.path.join(os.path.dirname(__file__), 'assets', 'square_comp.inp')
+    with open(inp_path, 'rb') as inp_file:
+        with gzip.open(gz_inp_path, 'wb') as gz_inp_file:
+            shutil.copyfileobj(inp_file, gz_inp_file)
+
+    model = model_from_inp_file(inp_path)
+    gz_model = model_from_inp_file(gz_inp_path)
+    os.remove(gz_inp_path)
+    assert len(gz_model.rooms) == len(model.rooms)
+    assert gz_model.volume == model.volume
+
+
+def test_schedules_from_compressed_inp_file():
+    """Test that schedules are extracted from compressed INP files."""
+    inp_path = os.path.join(os.path.dirname(__file__), 'assets', 'Schedules.inp')
+    gz_inp_path = os.path.join(os.path.dirname(__file__), 'assets', 'Schedules.inp.gz')
+    with open(inp_path, 'rb') as inp_file:
+        with gzip.open(gz_inp_path, 'wb') as gz_inp_file:
+            shutil.copyfileobj(inp_file, gz_inp_file)
+
+    schedules = extract_all_schedule_ruleset_from_inp_file(inp_path)
+    gz_schedules = extract_all_schedule_ruleset_from_inp_file(gz_inp_path)
+    os.remove(gz_inp_path)
+    assert len(gz_schedules) == len(schedules)
+    assert gz_schedules == schedules
+
+
+def test_read_cp1252_inp_file(tmpdir):
+    """Test that INP files written by eQuest with the cp1252 encoding can be read."""
+    assets = os.path.join(os.path.dirname(__file__), 'assets')
+    for file_name in ('square_from_hbjson.inp', 'Schedules.inp'):
+        with open(os.path.join(assets, file_name), 'rb') as inp_file:
+            inp_bytes = inp_file.read()
+        comment = u'$ Caf\u00e9 \u00b0F \u2013 edited in eQuest\n'.encode('cp1252')
+        with open(str(tmpdir.join(file_name)), 'wb') as inp_file:
+            inp_file.write(comment + inp_bytes)
+
+    model = model_from_inp_file(os.path.join(assets, 'square_from_hbjson.inp'))
+    cp_model = model_from_inp_file(str(tmpdir.join('square_from_hbjson.inp')))
+    assert len(cp_model.rooms) == len(model.rooms)
+    schedules = extract_all_schedule_ruleset_from_inp_file(
+        os.path.join(assets, 'Schedules.inp'))
+    cp_schedules = extract_all_schedule_ruleset_from_inp_file(
+        str(tmpdir.join('Schedules.inp')))
+    assert len(cp_schedules) == len(schedules)
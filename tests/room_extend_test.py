@@ -1,5 +1,5 @@
 """Tests the features that honeybee_doe2 adds to honeybee_core Room."""
-from ladybug_geometry.geometry3d.pointvector import Point3D
+from ladybug_geometry.geometry3d.pointvector import Point3D, Vector3D
 from honeybee.room import Room
 from honeybee_energy.lib.programtypes import office_program
 
@@ -73,6 +73,31 @@ def test_duplicate():
         room_dup_1.properties.doe2.hmax_flow_ratio
 
 
+def test_horizontal_boundary_cache():
+    """Test the caching of the horizontal boundaries of the Room."""
+    room = Room.from_box('ShoeBoxZone', 5, 10, 3)
+    bound = room.properties.doe2.horizontal_boundary(tolerance=0.01)
+    assert bound.area == room.horizontal_boundary(tolerance=0.01).area
+    assert room.properties.doe2.horizontal_boundary(tolerance=0.01) is bound
+    match_bound = room.properties.doe2.horizontal_boundary(True, 0.01)
+    assert len(match_bound.boundary) == \
+        len(room.horizontal_boundary(True, 0.01).boundary)
+    flr_bounds = room.properties.doe2.horizontal_floor_boundaries(tolerance=0.01)
+    assert len(flr_bounds) == 1
+    assert room.properties.doe2.horizontal_floor_boundaries(
+        tolerance=0.01)[0] is flr_bounds[0]
+
+    version = room.properties.doe2.geometry_version
+    room.move(Vector3D(10, 0, 0))
+    assert room.properties.doe2.geometry_version == version + 1
+    new_bound = room.properties.doe2.horizontal_boundary(tolerance=0.01)
+    assert new_bound is not bound
+    assert new_bound.min.x == bound.min.x + 10
+    room.scale(2)
+    assert room.properties.doe2.horizontal_boundary(tolerance=0.01).area == \
+        new_bound.area * 4
+
+
 def test_to_dict():
     """Test the Room to_dict method with doe2 properties."""
     room = Room.from_box('ShoeBox', 5, 10, 3)
@@ -0,0 +1,167 @@
+"""Test the simplification of polygons that exceed the DOE-2 vertex limit."""
+import math
+
+from ladybug_geometry.geometry2d import Point2D, Polygon2D
+from ladybug_geometry.geometry3d import Point3D, Face3D, Polyface3D
+from honeybee.model import Model
+from honeybee.room import Room
+
+from honeybee_doe2.simplify import simplify_polygon
+from honeybee_doe2.reader import command_dict_from_inp, _verts_to_tuples
+from honeybee_doe2.profiling import StageProfiler
+
+
+def _circle_vertices(count, radius=10):
+    """Get a list of (x, y) vertices for a circle."""
+    return [(radius * math.cos(2 * math.pi * i / count),
+             radius * math.sin(2 * math.pi * i / count)) for i in range(count)]
+
+
+def test_simplify_polygon():
+    """Test the simplify_polygon method."""
+    vertices = _circle_vertices(500)
+    new_verts, deviation, area_change = simplify_polygon(vertices, 120, 0)
+    assert len(new_verts) == 120
+    assert new_verts[0] == vertices[0]
+    assert 0 < deviation < 0.05
+    assert -0.01 < area_change < 0
+
+    new_verts, deviation, area_change = simplify_polygon(vertices, 120, 0.01)
+    assert len(new_verts) < 120
+    assert 0 < deviation < 0.05
+
+    new_verts, deviation, area_change = simplify_polygon(vertices[:100], 120, 0.01)
+    assert new_verts == vertices[:100]
+    assert deviation == area_change == 0
+
+
+def test_simplify_polygon_colinear():
+    """Test the simplify_polygon method with colinear vertices."""
+    vertices = [(i, 0) for i in range(200)] + [(199, 10), (0, 10)]
+    new_verts, deviation, area_change = simplify_polygon(vertices, 120, 0.01)
+    assert new_verts == [(0, 0), (199, 0), (199, 10), (0, 10)]
+    assert deviation < 1e-9
+    assert abs(area_change) < 1e-9
+
+
+def _comb_vertices(count=100, spikes=20):
+    """Get (x, y) vertices of a concave polygon with teeth reaching into a notch.
+
+    The notch has a zigzag top edge and the teeth reach into its first peaks.
+    """
+    upper = [(i * 0.1, 8 + (0.3 if i % 2 else 0)) for i in range(count + 1)]
+    lower = []
+    for i in range(1, 2 * spikes, 2):
+        x = i * 0.1
+        lower.extend([(x - 0.05, 2), (x, 8.15), (x + 0.05, 2)])
+    length = count * 0.1
+    return [(0, 0), (length + 2, 0), (length + 2, 10), (0, 10)] + upper + \
+        [(length, 2)] + list(reversed(lower)) + [(0, 2)]
+
+
+def _segments_intersect(seg_1, seg_2):
+    """Check whether two segments of (x, y) points cross one another."""
+    def orient(p_1, p_2, p_3):
+        val = (p_2[0] - p_1[0]) * (p_3[1] - p_1[1]) - \
+            (p_2[1] - p_1[1]) * (p_3[0] - p_1[0])
+        return (val > 1e-9) - (val < -1e-9)
+    (a, b), (c, d) = seg_1, seg_2
+    return orient(a, b, c) * orient(a, b, d) < 0 and \
+        orient(c, d, a) * orient(c, d, b) < 0
+
+
+def _is_self_intersecting(vertices):
+    """Check whether a polygon from a list of (x, y) vertices is self-intersecting."""
+    segs = list(zip(vertices, vertices[1:] + vertices[:1]))
+    for i, seg_1 in enumerate(segs):
+        for j in range(i + 2, len(segs)):
+            if i == 0 and j == len(segs) - 1:
+                continue  # adjacent segments
+            if _segments_intersect(seg_1, segs[j]):
+                return True
+    return False
+
+
+def test_simplify_polygon_concave():
+    """Test that the simplify_polygon method does not create self-intersections."""
+    vertices = _comb_vertices()
+    assert len(vertices) > 120
+    assert not _is_self_intersecting(vertices)
+    new_verts, deviation, area_change = simplify_polygon(vertices, 120, 0.01)
+    assert len(new_verts) <= 120
+    assert new_verts[0] == vertices[0]
+    assert not _is_self_intersecting(new_verts)
+
+
+def test_model_to_inp_simplified_space():
+    """Test the translation of a Room with more than 120 vertices to INP."""
+    pts = [Point3D(x, y, 0) for x, y in _circle_vertices(200)]
+    polyface = Polyface3D.from_offset_face(Face3D(pts), 3)
+    room = Room.from_polyface3d('Round_Room', polyface)
+    model = Model('Round_Building', [room], units='Feet')
+    inp_str = model.to.inp(model)
+    assert 'V121' not in inp_str
+    assert 'SPACE-V' not in inp_str
+    assert inp_str.count('= EXTERIOR-WALL') == 200
+
+
+def _polygon_contains(polygon, vertices, tolerance=1e-6):
+    """Check whether all (x, y) vertices are inside or on the edge of a polygon."""
+    polygon = Polygon2D([Point2D(x, y) for x, y in polygon])
+    return all(polygon.point_relationship(Point2D(x, y), tolerance) >= 0
+               for x, y in vertices)
+
+
+def test_simplify_polygon_direction():
+    """Test the simplify_polygon method with an inward and an outward direction."""
+    vertices = [(x * (1 + 0.02 * (i % 3)), y * (1 + 0.02 * (i % 3)))
+                for i, (x, y) in enumerate(_circle_vertices(300))]
+    in_verts, _, in_area_change = simplify_polygon(vertices, 120, 0.01, 'Inward')
+    out_verts, _, out_area_change = simplify_polygon(vertices, 120, 0.01, 'Outward')
+    for new_verts in (in_verts, out_verts):
+        assert len(new_verts) <= 120
+        assert new_verts[0] == vertices[0]
+        assert not _is_self_intersecting(new_verts)
+    assert in_area_change < 0 < out_area_change
+    assert _polygon_contains(vertices, in_verts)
+    assert _polygon_contains(out_verts, vertices)
+
+    vertices = list(reversed(_comb_vertices()))
+    out_verts, _, _ = simplify_polygon(vertices, 120, 0.01, 'Outward')
+    assert len(out_verts) <= 120
+    assert not _is_self_intersecting(out_verts)
+    assert _polygon_contains(out_verts, vertices)
+
+
+def test_model_to_inp_simplified_floor():
+    """Test that simplified SPACE POLYGONs stay inside the simplified FLOOR POLYGON."""
+    circle = _circle_vertices(300, 500)
+    rooms = []
+    for i, half in enumerate((circle[:151], circle[150:] + circle[:1])):
+        pts = [Point3D(x, y, 0) for x, y in half]
+        polyface = Polyface3D.from_offset_face(Face3D(pts), 3)
+        rooms.append(Room.from_polyface3d('Half_Room_{}'.format(i), polyface))
+    model = Model('Round_Building', rooms, units='Feet')
+    profiler = StageProfiler()
+    inp_str = model.to.inp(model, profiler=profiler)
+    assert 'V121' not in inp_str
+
+    stage_names = [stage['name'] for stage in profiler.stages]
+    geo_stage = profiler.stages[stage_names.index('geometry_output')]
+    simplified = geo_stage['simplified_polygons']
+    assert len(simplified) == 7  # FLOOR, SPACEs and the floor and roof of each Room
+    for info in simplified.values():
+        assert 0 < info['deviation'] < 1
+    assert simplified['Level_0 Plg']['area_change'] > 0
+    assert simplified['Half Room 0 Plg']['area_change'] < 0
+    assert simplified['Half Room 1 Plg']['area_change'] < 0
+
+    commands = command_dict_from_inp(inp_str)
+    polygons = commands['POLYGON']
+    floor = list(commands['FLOOR'].values())[0]
+    flr_verts = _verts_to_tuples(polygons[floor['POLYGON'].strip('"')])
+    for space in commands['SPACE'].values():
+        x, y = space['X'], space['Y']
+        space_verts = _verts_to_tuples(polygons[space['POLYGON'].strip('"')])
+        space_verts = [(v_x + x, v_y + y) for v_x, v_y in space_verts]
+        assert _polygon_contains(flr_verts, space_verts, 0.001)  # INP is rounded
@@ -0,0 +1,57 @@
+"""Test the temporary on-disk storage of INP blocks."""
+import os
+import tempfile
+
+from honeybee.model import Model
+
+from honeybee_doe2.spool import InpBlockSpool
+from honeybee_doe2.writer import model_to_inp_iter
+
+
+def test_inp_block_spool(tmpdir):
+    """Test the append, extend and iteration of InpBlockSpool."""
+    spool = InpBlockSpool(str(tmpdir))
+    assert os.path.isfile(spool.file_path)
+    assert len(spool) == 0
+    assert list(spool) == []
+
+    blocks = ['"Room_1 Plg" = POLYGON\n   V1 = ( 0.0, 0.0 )\n   ..\n', 'Ünicode "\\ ..']
+    spool.append(blocks[0])
+    spool.extend(blocks[1:])
+    assert len(spool) == 2
+    assert list(spool) == blocks
+    spool.append('last block')  # blocks can be added after reading
+    assert list(spool) == blocks + ['last block']
+
+    spool.close()
+    assert spool.closed
+    assert not os.path.isfile(spool.file_path)
+
+
+def test_model_writer_spool():
+    """Test that spooling the geometry of a Model produces the same INP."""
+    hb_model = Model.from_file('./tests/assets/shade_test.hbjson')
+    spool_files = [f for f in os.listdir(tempfile.gettempdir()) if f.endswith('.spool')]
+
+    inp_str = hb_model.to.inp(hb_model)
+    spool_inp_str = hb_model.to.inp(hb_model, spool=True)
+    assert spool_inp_str == inp_str
+    assert spool_files == \
+        [f for f in os.listdir(tempfile.gettempdir()) if f.endswith('.spool')]
+
+
+def test_model_writer_spool_abandoned():
+    """Test that the spool files are deleted when the INP blocks are abandoned."""
+    hb_model = Model.from_file('./tests/assets/shade_test.hbjson')
+    spool_files = [f for f in os.listdir(tempfile.gettempdir()) if f.endswith('.spool')]
+
+    blocks = model_to_inp_iter(hb_model, spool=True)
+    for block in blocks:
+        if 'Polygons' in block:  # stop in the middle of the spooled geometry
+            break
+    new_spool_files = \
+        [f for f in os.listdir(tempfile.gettempdir()) if f.endswith('.spool')]
+    assert len(new_spool_files) == len(spool_files) + 4
+    blocks.close()
+    assert spool_files == \
+        [f for f in os.listdir(tempfile.gettempdir()) if f.endswith('.spool')]
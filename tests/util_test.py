@@ -1,5 +1,14 @@
 """Test the utility functions."""
-from honeybee_doe2.util import parse_inp_string
+import os
+from io import StringIO
+import pytest
+
+from ladybug_geometry.geometry3d import Vector3D
+from honeybee.model import Model
+
+from honeybee_doe2.util import parse_inp_string, inp_section_hashes, open_inp_file, \
+    InpSectionHasher
+from honeybee_doe2.writer import model_to_inp_iter, write_model_inp
 
 
 SCHEDULE_DAY_STR = """
@@ -137,3 +146,86 @@ def test_parse_schedule_year_pd():
     assert len(values) == 4
     assert keywords[0] == 'TYPE'
     assert values[0] == 'TEMPERATURE'
+
+
+def test_inp_section_hashes():
+    """Test the inp_section_hashes function."""
+    model = Model.from_file('./tests/assets/out_stacked_rect_from_wiz.hbjson')
+    inp_str = model.to.inp(model)
+    hashes = inp_section_hashes(inp_str)
+    assert sorted(hashes.keys()) == \
+        ['constructions', 'geometry', 'other', 'schedules', 'zones']
+    assert len(set(hashes.values())) == 5
+    assert inp_section_hashes(model.to.inp(model)) == hashes
+    assert inp_section_hashes(inp_str.replace('\r\n', '\n')) == hashes
+
+    model.move(Vector3D(10, 0, 0))
+    new_hashes = inp_section_hashes(model.to.inp(model))
+    assert new_hashes['geometry'] != hashes['geometry']
+    for section in ('schedules', 'constructions', 'zones', 'other'):
+        assert new_hashes[section] == hashes[section]
+
+
+def test_model_to_inp_section_hashes():
+    """Test that the writer computes the section hashes as the INP is generated."""
+    model = Model.from_file('./tests/assets/out_stacked_rect_from_wiz.hbjson')
+    section_hashes = {}
+    inp_str = model.to.inp(model, section_hashes=section_hashes)
+    assert section_hashes == inp_section_hashes(inp_str)
+
+    section_hashes, inp_file = {}, StringIO()
+    write_model_inp(model, inp_file, section_hashes=section_hashes)
+    assert section_hashes == inp_section_hashes(inp_str)
+
+    section_hashes = {}
+    blocks = model_to_inp_iter(model, section_hashes=section_hashes)
+    assert section_hashes == {}
+    list(blocks)
+    assert section_hashes == inp_section_hashes(inp_str)
+
+    hasher = InpSectionHasher()
+    for i in range(0, len(inp_str), 7):  # chunks that split lines and line endings
+        hasher.update(inp_str[i:i + 7])
+    assert hasher.hexdigests() == inp_section_hashes(inp_str)
+
+
+def _zstd_available():
+    """Check whether zstd compression is available."""
+    try:
+        from compression import zstd  # noqa: F401
+        return True
+    except ImportError:
+        pass
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def test_open_inp_file(tmpdir):
+    """Test that open_inp_file uses the same encoding with and without compression."""
+    inp_str = u'"Caf\u00e9 \u00b0F Space" = SPACE\n   ..\n'
+    for file_name in ('plain.inp', 'compressed.inp.gz'):
+        inp_path = str(tmpdir.join(file_name))
+        with open_inp_file(inp_path, 'w') as inp_file:
+            inp_file.write(inp_str)
+        with open_inp_file(inp_path) as inp_file:
+            assert inp_file.read() == inp_str
+    with open(str(tmpdir.join('plain.inp')), 'rb') as inp_file:
+        assert inp_file.read().decode('utf-8') == inp_str
+
+
+@pytest.mark.skipif(not _zstd_available(), reason='zstd is not available')
+def test_open_inp_file_zstd(tmpdir):
+    """Test that open_inp_file writes and reads zstd-compressed INP files."""
+    inp_str = u'"Caf\u00e9 \u00b0F Space" = SPACE\n   ..\n'
+    inp_path = str(tmpdir.join('compressed.inp.zst'))
+    with open_inp_file(inp_path, 'w') as inp_file:
+        inp_file.write(inp_str)
+    with open(inp_path, 'rb') as inp_file:
+        assert inp_file.read(4) == b'\x28\xb5\x2f\xfd'
+    renamed_path = str(tmpdir.join('compressed.inp'))  # read from the leading bytes
+    os.rename(inp_path, renamed_path)
+    with open_inp_file(renamed_path) as inp_file:
+        assert inp_file.read() == inp_str
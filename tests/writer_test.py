@@ -1,7 +1,8 @@
 """Test the translators for geometry to INP."""
 import os
+from io import StringIO
 
-from ladybug_geometry.geometry3d import Point3D, Vector3D, Mesh3D
+from ladybug_geometry.geometry3d import Point3D, Vector3D, Mesh3D, Face3D
 
 from honeybee.model import Model
 from honeybee.room import Room
@@ -14,9 +15,16 @@ from honeybee.shademesh import ShadeMesh
 from honeybee_energy.construction.opaque import OpaqueConstruction
 from honeybee_energy.material.opaque import EnergyMaterial
 from honeybee_energy.schedule.ruleset import ScheduleRuleset
+from honeybee_energy.hvac.allair.vav import VAV
 import honeybee_energy.lib.scheduletypelimits as schedule_types
 from honeybee_energy.lib.programtypes import office_program, program_type_by_identifier
 
+import honeybee_doe2.writer as writer
+from honeybee_doe2.exportview import ExportView
+from honeybee_doe2.adjacency import AdjacencyIndex
+from honeybee_doe2.writer import model_to_inp_iter, write_model_inp, \
+    face_3d_to_inp, face_3ds_to_inp
+
 if os.name == 'nt':
     START_TEXT = 'INPUT ..\n\n'
     END_TEXT = 'END ..\nCOMPUTE ..\nSTOP ..\n'
@@ -160,6 +168,32 @@ def test_shade_mesh_writer():
         '   ..\n'
 
 
+def test_shade_mesh_writer_numpy():
+    """Test that translating ShadeMesh triangles with NumPy matches the Face3D methods."""
+    pts, faces = [], []
+    for i in range(6):
+        for j in range(6):
+            pts.append(Point3D(i * 3.3, j * 2.7, ((i * 7 + j * 3) % 5) * 0.9))
+    for i in range(5):
+        for j in range(5):
+            st = i * 6 + j
+            faces.append((st, st + 6, st + 7))
+            faces.append((st, st + 7, st + 1))
+    pts.extend((Point3D(0, 0, 0), Point3D(4, 0, 0), Point3D(4, 0, 6), Point3D(2, 0, 9),
+                Point3D(0, 0, 6)))
+    faces.extend(((36, 37, 38), (36, 38, 40), (40, 38, 39), (36, 40, 38)))
+    shade = ShadeMesh('Terrain', Mesh3D(pts, faces))
+
+    shade_polygons, shade_defs = shade.to.inp(shade)
+    assert len(shade_defs) == len(faces)
+    numpy_module = writer.np
+    writer.np = None  # test the pure-Python translator
+    try:
+        assert shade.to.inp(shade) == (shade_polygons, shade_defs)
+    finally:
+        writer.np = numpy_module
+
+
 def test_aperture_writer():
     """Test the basic functionality of the Aperture inp writer."""
     vertices_parent_wall = [[0, 0, 0], [0, 10, 0], [0, 10, 3], [0, 0, 3]]
@@ -330,6 +364,31 @@ def test_face_writer():
         '   ..\n'
 
 
+def test_face_3ds_writer():
+    """Test that translating Face3Ds together matches translating them one by one."""
+    face_3ds = [
+        Face3D((Point3D(0, 0, 0), Point3D(10, 0, 0), Point3D(10, 0, 10),
+                Point3D(0, 0, 10))),
+        Face3D((Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3),
+                Point3D(0, 10, 3))),
+        Face3D((Point3D(0, 0, 0), Point3D(0, 10, 0), Point3D(10, 10, 0),
+                Point3D(10, 0, 0))),
+        Face3D((Point3D(1.3, 2.1, 0), Point3D(8.7, 4.6, 1.1), Point3D(7.2, 9.9, 6.4),
+                Point3D(0.4, 6.2, 5.3))),
+    ]
+    names = ['Wall', 'Roof', 'Floor', 'Tilted']
+    polygons = [face_3d_to_inp(f_geo, name) for f_geo, name in zip(face_3ds, names)]
+    assert face_3ds_to_inp(face_3ds, names) == polygons
+    assert face_3ds_to_inp([], []) == []
+
+    numpy_module = writer.np
+    writer.np = None  # test the pure-Python translator
+    try:
+        assert face_3ds_to_inp(face_3ds, names) == polygons
+    finally:
+        writer.np = numpy_module
+
+
 def test_room_writer():
     """Test the basic functionality of the Room inp writer."""
     room = Room.from_box('Tiny_House_Zone', 15, 30, 10)
@@ -566,3 +625,186 @@ def test_model_writer_from_ceil_adj_hbjson():
     inp_str = hb_model.to.inp(hb_model, hvac_mapping='AssignedHVAC')
     assert inp_str.startswith(START_TEXT)
     assert inp_str.endswith(END_TEXT)
+
+
+def test_model_writer_streaming():
+    """Test that the streaming Model writers match the Model inp string."""
+    standard_test = './tests/assets/shade_test.hbjson'
+    hb_model = Model.from_file(standard_test)
+    inp_str = hb_model.to.inp(hb_model)
+
+    blocks = list(model_to_inp_iter(hb_model))
+    assert blocks[0] == 'INPUT ..\n\n'
+    assert blocks[-1] == 'END ..\nCOMPUTE ..\nSTOP ..\n'
+    joined_str = '\n'.join(blocks)
+    if os.name != 'nt':
+        joined_str = joined_str.replace('\n', '\r\n')
+    assert joined_str == inp_str
+
+    inp_file = StringIO()
+    write_model_inp(hb_model, inp_file)
+    assert inp_file.getvalue() == inp_str
+
+
+def test_model_writer_workers(monkeypatch):
+    """Test that translating Rooms with several workers matches the serial INP."""
+    ceiling_adj_test = './tests/assets/ceiling_adj_test.hbjson'
+    hb_model = Model.from_file(ceiling_adj_test)
+
+    inp_str = hb_model.to.inp(hb_model)
+    parallel_inp_str = hb_model.to.inp(hb_model, workers=2)
+    assert parallel_inp_str == inp_str
+
+    # the results of the workers are consumed lazily and in order
+    export_view = ExportView(hb_model)
+    rooms = export_view.model.rooms
+    adjacency = AdjacencyIndex(rooms, export_view=export_view)
+    room_chunks = [(rooms[i:i + 1], Point3D(), None, False, False, adjacency,
+                    export_view) for i in range(len(rooms))]
+    chunk_results = writer._room_chunks_to_inp(room_chunks, workers=2)
+    assert not isinstance(chunk_results, list)
+    serial_results = [writer._rooms_to_inp(*chunk) for chunk in room_chunks]
+    assert list(chunk_results) == serial_results
+
+    # processes are only forked on Linux
+    monkeypatch.setattr(writer.sys, 'platform', 'darwin')
+    monkeypatch.setattr(writer, '_forked_room_chunks_to_inp', None)  # fails if used
+    assert hb_model.to.inp(hb_model, workers=2) == inp_str
+
+
+def test_model_writer_typical_floors():
+    """Test the translation of a Model with stacked typical floors."""
+    rooms = []
+    for flr in range(5):
+        for j in range(2):
+            room = Room.from_box('Office_{}_{}'.format(flr, j), 10, 10, 3,
+                                 origin=Point3D(j * 10, 0, flr * 3))
+            room.properties.energy.program_type = office_program
+            room.properties.energy.add_default_ideal_air()
+            rooms.append(room)
+    Room.solve_adjacency(rooms, 0.01)
+    hb_model = Model('Tower', rooms, units='Feet', tolerance=0.01)
+
+    inp_str = hb_model.to.inp(hb_model)
+    assert inp_str.count('= ZONE') == 10
+    assert 'ADIABATIC' not in inp_str
+    typical_inp_str = hb_model.to.inp(hb_model, collapse_typical_floors=True)
+    assert typical_inp_str.count('= ZONE') == 6
+    assert typical_inp_str.count('= FLOOR') == 3
+    assert typical_inp_str.count('MULTIPLIER               = 3') == 1
+    assert typical_inp_str.count('ADIABATIC') == 4
+    assert 'Office_2_0' not in typical_inp_str
+
+
+def test_model_writer_identical_rooms():
+    """Test the translation of a Model with identical Rooms on the same level."""
+    rooms = []
+    for j in range(5):
+        room = Room.from_box('Guest_{}'.format(j), 10, 20, 3,
+                             origin=Point3D(j * 10, 0, 0))
+        room.properties.energy.program_type = office_program
+        room.properties.energy.add_default_ideal_air()
+        room.faces[3].apertures_by_ratio(0.3)
+        rooms.append(room)
+    Room.solve_adjacency(rooms, 0.01)
+    hb_model = Model('Hotel', rooms, units='Feet', tolerance=0.01)
+
+    inp_str = hb_model.to.inp(hb_model)
+    assert inp_str.count('= ZONE') == 5
+    collapsed_inp_str = hb_model.to.inp(hb_model, collapse_identical_rooms=True)
+    assert collapsed_inp_str.count('= ZONE') == 3
+    assert collapsed_inp_str.count('MULTIPLIER               = 3') == 1
+    assert collapsed_inp_str.count('NEXT-TO                  = "Guest 1"') == 2
+    assert collapsed_inp_str.count('ADIABATIC') == 1
+    assert '"Guest 3"' not in collapsed_inp_str
+
+    hb_model.properties.doe2.precompute()
+    assert hb_model.to.inp(hb_model, collapse_identical_rooms=True) == collapsed_inp_str
+
+
+def test_model_writer_identical_rooms_hvac():
+    """Test that identical Rooms with different HVAC systems are not collapsed."""
+    rooms = []
+    for j in range(4):
+        room = Room.from_box('Guest_{}'.format(j), 10, 20, 3,
+                             origin=Point3D(j * 10, 0, 0))
+        room.properties.energy.program_type = office_program
+        room.faces[3].apertures_by_ratio(0.3)
+        rooms.append(room)
+    Room.solve_adjacency(rooms, 0.01)
+    vav_1, vav_2 = VAV('VAV_1'), VAV('VAV_2')
+    for room, vav in zip(rooms, (vav_1, vav_2, vav_1, vav_2)):
+        room.properties.energy.hvac = vav
+    hb_model = Model('Hotel', rooms, units='Feet', tolerance=0.01)
+
+    inp_str = hb_model.to.inp(
+        hb_model, hvac_mapping='AssignedHVAC', collapse_identical_rooms=True)
+    assert inp_str.count('= ZONE') == 4
+    assert inp_str.count('= SYSTEM') == 2
+
+    for room in rooms:  # identical ideal air systems of each room can be collapsed
+        room.properties.energy.add_default_ideal_air()
+    inp_str = hb_model.to.inp(
+        hb_model, hvac_mapping='AssignedHVAC', collapse_identical_rooms=True)
+    assert inp_str.count('= ZONE') == 3
+    ideal_air = rooms[1].properties.energy.hvac.duplicate()
+    ideal_air.economizer_type = 'NoEconomizer'
+    rooms[1].properties.energy.hvac = ideal_air
+    inp_str = hb_model.to.inp(
+        hb_model, hvac_mapping='AssignedHVAC', collapse_identical_rooms=True)
+    assert inp_str.count('= ZONE') == 4
+
+
+def test_model_writer_aggregate_windows():
+    """Test the translation of a Model with the windows of each Face aggregated."""
+    room = Room.from_box('Curtain_Wall_Office', 40, 20, 12)
+    room.properties.energy.program_type = office_program
+    room.properties.energy.add_default_ideal_air()
+    south_face = room.faces[1]
+    south_face.apertures_by_ratio_rectangle(0.6, 8, 2, 4)
+    room.faces[2].apertures_by_ratio(0.4)
+    ap_area = south_face.aperture_area
+    hb_model = Model('Curtain_Wall', [room], units='Feet', tolerance=0.01)
+
+    inp_str = hb_model.to.inp(hb_model)
+    assert inp_str.count('= WINDOW') > 3
+    agg_inp_str = hb_model.to.inp(hb_model, aggregate_windows=True)
+    assert agg_inp_str.count('= WINDOW') == 2
+    assert len(south_face.apertures) > 1
+
+    view = ExportView(hb_model, aggregate_windows=True)
+    new_face = view.model.rooms[0].faces[1]
+    assert len(new_face.apertures) == 1
+    new_ap = new_face.apertures[0]
+    assert abs(new_ap.area - ap_area) < 1e-6
+    assert abs(new_ap.geometry.min.z - min(ap.min.z for ap in south_face.apertures)) \
+        < 1e-6
+    assert abs(new_ap.geometry.max.z - max(ap.max.z for ap in south_face.apertures)) \
+        < 1e-6
+
+
+def test_model_writer_similar_interior_faces():
+    """Test the exclusion of interior Faces between Rooms with the same conditions."""
+    server_program = office_program.duplicate()
+    server_program.identifier = 'Server_Room'
+    server_program.electric_equipment.watts_per_area = 200
+    rooms = []
+    for j in range(4):
+        room = Room.from_box('Office_{}'.format(j), 10, 10, 3,
+                             origin=Point3D(j * 10, 0, 0))
+        room.properties.energy.program_type = office_program
+        room.properties.energy.add_default_ideal_air()
+        rooms.append(room)
+    rooms[3].properties.energy.program_type = server_program
+    Room.solve_adjacency(rooms, 0.01)
+    hb_model = Model('Offices', rooms, units='Feet', tolerance=0.01)
+
+    inp_str = hb_model.to.inp(hb_model, hvac_mapping='Model')
+    assert inp_str.count('= INTERIOR-WALL') == 3
+    pruned_inp_str = hb_model.to.inp(
+        hb_model, hvac_mapping='Model', exclude_similar_interior_faces=True)
+    assert pruned_inp_str.count('= INTERIOR-WALL') == 1
+    assert pruned_inp_str.count('NEXT-TO                  = "Office 3"') == 1
+    room_inp_str = hb_model.to.inp(
+        hb_model, hvac_mapping='Room', exclude_similar_interior_faces=True)
+    assert room_inp_str.count('= INTERIOR-WALL') == 3
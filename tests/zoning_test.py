@@ -0,0 +1,135 @@
+"""Test the simplification of Model zoning before translation to INP."""
+import pytest
+
+from ladybug_geometry.geometry3d import Point3D
+from honeybee.model import Model
+from honeybee.room import Room
+from honeybee_energy.lib.programtypes import office_program
+from honeybee_energy.hvac.allair.vav import VAV
+
+from honeybee_doe2.grouping import group_rooms_by_doe2_level
+from honeybee_doe2.zoning import model_to_core_perimeter, core_perimeter_rooms, \
+    _area_weighted_program
+
+
+def test_model_to_core_perimeter():
+    """Test the model_to_core_perimeter method."""
+    standard_test = './tests/assets/out_stacked_rect_from_wiz.hbjson'
+    hb_model = Model.from_file(standard_test)
+    cp_model = model_to_core_perimeter(hb_model)
+
+    assert len(hb_model.rooms) == 2
+    assert len(cp_model.rooms) == 10
+    assert abs(cp_model.floor_area - hb_model.floor_area) < 1e-3
+    assert abs(cp_model.volume - hb_model.volume) < 1e-3
+    room_names = [room.display_name for room in cp_model.rooms]
+    assert 'Ground Flr Perim N' in room_names
+    assert 'Top Flr Core' in room_names
+    assert len(cp_model.apertures) > 0
+    for room in cp_model.rooms:
+        assert room.properties.energy.program_type.identifier == \
+            hb_model.rooms[0].properties.energy.program_type.identifier
+
+
+def test_model_to_inp_core_perimeter():
+    """Test the translation of a Model to INP with core/perimeter zoning."""
+    standard_test = './tests/assets/out_stacked_rect_from_wiz.hbjson'
+    hb_model = Model.from_file(standard_test)
+    inp_str = hb_model.to.inp(hb_model, zoning='CorePerimeter')
+    assert inp_str.count('= ZONE') == 10
+    assert '"Ground Flr Perim N"' in inp_str
+
+
+def test_core_perimeter_rooms_mixed_heights():
+    """Test that core_perimeter_rooms preserves the volume of mixed ceiling heights."""
+    room_1 = Room.from_box('Low_Room', 10, 10, 3)
+    room_2 = Room.from_box('High_Room', 5, 10, 6, origin=Point3D(10, 0, 0))
+    rooms = [room_1, room_2]
+    Room.solve_adjacency(rooms, 0.01)
+    level_rooms, level_geos, level_names = group_rooms_by_doe2_level(rooms, 0.01)
+    assert len(level_rooms) == 1
+
+    cp_rooms = core_perimeter_rooms(level_rooms[0], level_geos[0], level_names[0], 2)
+    assert len(cp_rooms) == 5
+    assert abs(sum(r.floor_area for r in cp_rooms) - 150) < 1e-3
+    assert abs(sum(r.volume for r in cp_rooms) - 600) < 1e-3
+    for room in cp_rooms:
+        assert abs(room.min.z) < 1e-6
+        assert abs(room.max.z - 4) < 1e-6
+
+
+def test_area_weighted_program_unconditioned():
+    """Test _area_weighted_program with conditioned and unconditioned Rooms."""
+    room_1 = Room.from_box('Office_Room', 10, 10, 3)
+    room_1.properties.energy.program_type = office_program
+    room_1.properties.energy.add_default_ideal_air()
+    room_2 = Room.from_box('Plenum_Room', 5, 10, 3, origin=Point3D(10, 0, 0))
+    assert room_2.properties.energy.setpoint is None
+
+    program = _area_weighted_program('Mixed_Program', [room_1, room_2])
+    assert program.setpoint is not None
+    assert program.setpoint.heating_setpoint == \
+        office_program.setpoint.heating_setpoint
+    assert program.setpoint.cooling_setpoint == \
+        office_program.setpoint.cooling_setpoint
+    assert abs(program.lighting.watts_per_area -
+               office_program.lighting.watts_per_area * 100 / 150) < 1e-6
+
+    room_3 = Room.from_box('Attic_Room', 10, 10, 3, origin=Point3D(0, 10, 0))
+    room_3.properties.energy.program_type = office_program
+    program = _area_weighted_program('Unconditioned_Program', [room_2, room_3])
+    assert program.setpoint is None
+    assert abs(program.lighting.watts_per_area -
+               office_program.lighting.watts_per_area * 100 / 150) < 1e-6
+
+
+def test_model_to_inp_unknown_zoning():
+    """Test that an unrecognized zoning raises a ValueError."""
+    standard_test = './tests/assets/out_stacked_rect_from_wiz.hbjson'
+    hb_model = Model.from_file(standard_test)
+    with pytest.raises(ValueError) as error:
+        hb_model.to.inp(hb_model, zoning='CorePerim')
+    assert 'CorePerimeter' in str(error.value)
+
+
+def test_core_perimeter_rooms_room_settings():
+    """Test that core_perimeter_rooms keeps the settings of the original Rooms."""
+    room_1 = Room.from_box('Office_1', 20, 20, 3)
+    room_2 = Room.from_box('Office_2', 20, 20, 3, origin=Point3D(20, 0, 0))
+    rooms = [room_1, room_2]
+    vav = VAV('Office_VAV')
+    for room in rooms:
+        room.multiplier = 3
+        room.properties.energy.program_type = office_program
+        room.properties.energy.hvac = vav
+        room.properties.doe2.min_flow_ratio = 0.3
+        room.properties.doe2.assigned_flow = 500
+        room.user_data = {'tenant': 'A'}
+    Room.solve_adjacency(rooms, 0.01)
+    level_rooms, level_geos, level_names = group_rooms_by_doe2_level(rooms, 0.01)
+
+    cp_rooms = core_perimeter_rooms(level_rooms[0], level_geos[0], level_names[0], 5)
+    assert len(cp_rooms) == 5
+    assert abs(sum(r.properties.doe2.assigned_flow for r in cp_rooms) - 1000) < 1e-6
+    for room in cp_rooms:
+        assert room.multiplier == 3
+        assert room.properties.energy.hvac.identifier == 'Office_VAV'
+        assert room.properties.doe2.min_flow_ratio == 0.3
+        assert room.user_data == {'tenant': 'A'}
+
+    # rooms with different multipliers, HVACs or DOE-2 properties are not merged
+    room_2.multiplier = 1
+    assert core_perimeter_rooms(
+        level_rooms[0], level_geos[0], level_names[0], 5) is None
+    room_2.multiplier = 3
+    room_2.properties.energy.hvac = VAV('Other_VAV')
+    assert core_perimeter_rooms(
+        level_rooms[0], level_geos[0], level_names[0], 5) is None
+    room_2.properties.energy.hvac = vav
+    room_2.properties.doe2.min_flow_ratio = 0.5
+    assert core_perimeter_rooms(
+        level_rooms[0], level_geos[0], level_names[0], 5) is None
+
+    hb_model = Model('Offices', rooms, units='Feet', tolerance=0.01)
+    cp_model = model_to_core_perimeter(hb_model)
+    assert [room.identifier for room in cp_model.rooms] == ['Office_1', 'Office_2']